@@ -15,20 +15,105 @@ Last Updated: June 2025
 
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from scipy import stats
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 import warnings
 warnings.filterwarnings('ignore')
 
+from chart_rendering import LARGE_DATA_THRESHOLD
+from instrumentation import traced
+from single_flight import SingleFlight, frame_fingerprint
+
+# scikit-learn, scipy and plotly are imported inside the functions that need
+# them, so importing this module (and starting the dashboard) stays cheap.
+
+# Feature space shared by trend clustering and the 3D cluster views
+CLUSTER_FEATURES = ['Impact_Score', 'Market_Size_Billion', 'Adoption_Rate']
+
+CLUSTER_AXIS_LABELS = {
+    'Impact_Score': 'Impact Score',
+    'Market_Size_Billion': 'Market Size ($B)',
+    'Adoption_Rate': 'Adoption Rate (%)'
+}
+
+# 'auto' renders every point up to this many trends, centroids above it
+CLUSTER_FULL_RENDER_LIMIT = 2000
+
+CLUSTER_VIEWS = ('auto', 'full', 'centroids', 'density')
+
+# Opportunity score: weight per normalized factor, growth rate that counts as
+# the maximum, and market size (in billions) that normalizes to 1
+OPPORTUNITY_SCORE_WEIGHTS = {
+    'market': 0.3,
+    'growth': 0.25,
+    'adoption': 0.2,
+    'investment': 0.25
+}
+GROWTH_RATE_CAP = 50
+MARKET_SIZE_SCALE = 1000
+
+# Adoption assumed for every opportunity in the dashboard's scores
+DEFAULT_ADOPTION_RATE = 50
+
+# Concurrent identical clustering/visualization requests share one computation
+analytics_flight = SingleFlight()
+
+
+def market_size_billion(labels):
+    """
+    Parse 'Large ($285B+)' style labels into billions.
+
+    Args:
+        labels: Series of Market_Size_2025 labels
+
+    Returns:
+        float64 NumPy array
+    """
+    return labels.astype(str).str.extract(r'\(\$(\d+(?:\.\d+)?)B\+\)')[0].astype(float).to_numpy()
+
+
+def opportunity_score_values(market_size, growth_rate, adoption_rate, investment_focus):
+    """
+    The opportunity score formula, for scalars or arrays of any matching shape.
+
+    Args:
+        market_size: Market size in billions
+        growth_rate: CAGR percentage
+        adoption_rate: Current adoption percentage
+        investment_focus: Investment priority score (1-10)
+
+    Returns:
+        Normalized opportunity score (0-100), as a float64 scalar or array
+    """
+    market_size, growth_rate, adoption_rate, investment_focus = (
+        np.asarray(value, dtype=np.float64) for value in (market_size, growth_rate, adoption_rate, investment_focus)
+    )
+    # Log transform market size to handle large variations
+    normalized_market = np.log10(market_size + 1) / np.log10(MARKET_SIZE_SCALE)  # Normalize to 0-1
+    normalized_growth = np.minimum(growth_rate / GROWTH_RATE_CAP, 1)  # Cap at 50% growth
+    normalized_adoption = adoption_rate / 100
+    normalized_investment = investment_focus / 10
+
+    opportunity_score = (
+        normalized_market * OPPORTUNITY_SCORE_WEIGHTS['market'] +
+        normalized_growth * OPPORTUNITY_SCORE_WEIGHTS['growth'] +
+        normalized_adoption * OPPORTUNITY_SCORE_WEIGHTS['adoption'] +
+        normalized_investment * OPPORTUNITY_SCORE_WEIGHTS['investment']
+    ) * 100
+
+    return np.minimum(opportunity_score, 100)
+
 class AIMarketAnalytics:
     """Advanced analytics engine for AI market intelligence."""
     
     def __init__(self):
-        self.scaler = StandardScaler()
+        self._scaler = None
+    
+    @property
+    def scaler(self):
+        """StandardScaler used for clustering, created on first use."""
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
         
     def calculate_opportunity_score(self, market_size, growth_rate, adoption_rate, investment_focus):
         """
@@ -43,40 +128,56 @@ class AIMarketAnalytics:
         Returns:
             Normalized opportunity score (0-100)
         """
-        # Normalize inputs
-        market_weight = 0.3
-        growth_weight = 0.25
-        adoption_weight = 0.2
-        investment_weight = 0.25
-        
-        # Log transform market size to handle large variations
-        normalized_market = np.log10(market_size + 1) / np.log10(1000)  # Normalize to 0-1
-        normalized_growth = min(growth_rate / 50, 1)  # Cap at 50% growth
-        normalized_adoption = adoption_rate / 100
-        normalized_investment = investment_focus / 10
-        
-        opportunity_score = (
-            normalized_market * market_weight +
-            normalized_growth * growth_weight +
-            normalized_adoption * adoption_weight +
-            normalized_investment * investment_weight
-        ) * 100
-        
-        return min(opportunity_score, 100)
+        return float(opportunity_score_values(market_size, growth_rate, adoption_rate, investment_focus))
     
+    @traced('analytics.calculate_opportunity_scores')
+    def calculate_opportunity_scores(self, opportunities_df, adoption_rate=DEFAULT_ADOPTION_RATE):
+        """
+        Opportunity score of every opportunity in one vectorized pass.
+        
+        Args:
+            opportunities_df: DataFrame with Market_Size_2025, Growth_Rate_CAGR
+                and Investment_Focus_Score columns
+            adoption_rate: Adoption percentage assumed for every opportunity
+            
+        Returns:
+            Series of scores (0-100) indexed like opportunities_df
+        """
+        scores = opportunity_score_values(
+            market_size_billion(opportunities_df['Market_Size_2025']),
+            opportunities_df['Growth_Rate_CAGR'],
+            adoption_rate,
+            opportunities_df['Investment_Focus_Score']
+        )
+        return pd.Series(scores, index=opportunities_df.index, name='Opportunity_Score')
+    
+    @traced('analytics.perform_trend_clustering')
     def perform_trend_clustering(self, trends_df):
         """
         Perform K-means clustering on AI trends to identify strategic groups.
         
+        Concurrent calls on identical data wait for a single KMeans fit.
+        
         Args:
             trends_df: DataFrame with trend data
             
         Returns:
             DataFrame with cluster assignments and analysis
         """
+        return analytics_flight.do(
+            ('perform_trend_clustering', frame_fingerprint(trends_df)),
+            self._fit_trend_clusters,
+            trends_df,
+            share=lambda result: (result[0].copy(deep=False), result[1])
+        )
+    
+    @traced('analytics.kmeans_fit')
+    def _fit_trend_clusters(self, trends_df):
+        """Fit KMeans on the trend features and label each trend's cluster."""
+        from sklearn.cluster import KMeans
+        
         # Prepare features for clustering
-        features = ['Impact_Score', 'Market_Size_Billion', 'Adoption_Rate']
-        X = trends_df[features].fillna(0)
+        X = trends_df[CLUSTER_FEATURES].fillna(0)
         
         # Standardize features
         X_scaled = self.scaler.fit_transform(X)
@@ -85,10 +186,6 @@ class AIMarketAnalytics:
         kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
         clusters = kmeans.fit_predict(X_scaled)
         
-        # Add cluster labels
-        trends_df = trends_df.copy()
-        trends_df['Cluster'] = clusters
-        
         # Define cluster characteristics
         cluster_names = {
             0: "High Impact Leaders",
@@ -97,10 +194,13 @@ class AIMarketAnalytics:
             3: "Niche Specialists"
         }
         
-        trends_df['Cluster_Name'] = trends_df['Cluster'].map(cluster_names)
+        # Append the label columns; the input columns are shared, not copied
+        clusters = pd.Series(clusters, index=trends_df.index)
+        trends_df = trends_df.assign(Cluster=clusters, Cluster_Name=clusters.map(cluster_names))
         
         return trends_df, kmeans
     
+    @traced('analytics.calculate_market_correlations')
     def calculate_market_correlations(self, data_df):
         """
         Calculate correlations between market factors.
@@ -129,6 +229,7 @@ class AIMarketAnalytics:
         
         return correlation_matrix, pd.DataFrame(correlations)
     
+    @traced('analytics.predict_market_growth')
     def predict_market_growth(self, historical_data, periods=12):
         """
         Simple trend-based prediction for market growth.
@@ -140,6 +241,8 @@ class AIMarketAnalytics:
         Returns:
             Forecast values and confidence intervals
         """
+        from scipy import stats
+        
         # Simple linear trend extrapolation
         x = np.arange(len(historical_data))
         slope, intercept, r_value, p_value, std_err = stats.linregress(x, historical_data)
@@ -159,12 +262,15 @@ class AIMarketAnalytics:
             'trend_strength': 'Strong' if abs(r_value) > 0.8 else 'Moderate' if abs(r_value) > 0.5 else 'Weak'
         }
     
-    def calculate_investment_risk_score(self, opportunity_data):
+    @traced('analytics.calculate_investment_risk_score')
+    def calculate_investment_risk_score(self, opportunity_data, random_state=None):
         """
         Calculate investment risk scores based on multiple factors.
         
         Args:
             opportunity_data: DataFrame with opportunity information
+            random_state: Optional np.random.RandomState to draw from; by default
+                the global generator is reseeded to 42 first
             
         Returns:
             DataFrame with risk scores and classifications
@@ -178,15 +284,17 @@ class AIMarketAnalytics:
         }
         
         # Simulate risk scores (in real implementation, these would be calculated from actual data)
-        np.random.seed(42)  # For reproducible results
+        if random_state is None:
+            np.random.seed(42)  # For reproducible results
+            random_state = np.random
         
         risk_scores = []
         for _, row in opportunity_data.iterrows():
             # Base risk calculation
-            market_vol = np.random.uniform(0.2, 0.8)
-            reg_risk = 0.8 if 'Governance' in row['Opportunity_Area'] else np.random.uniform(0.1, 0.6)
+            market_vol = random_state.uniform(0.2, 0.8)
+            reg_risk = 0.8 if 'Governance' in row['Opportunity_Area'] else random_state.uniform(0.1, 0.6)
             tech_maturity = 0.3 if row['Maturity_Level'] == 'Emerging' else 0.6 if row['Maturity_Level'] == 'Early Growth' else 0.8
-            competition = np.random.uniform(0.3, 0.9)
+            competition = random_state.uniform(0.3, 0.9)
             adoption_unc = 1 - (row['Investment_Focus_Score'] / 10)
             
             total_risk = (
@@ -199,16 +307,35 @@ class AIMarketAnalytics:
             
             risk_scores.append(total_risk)
         
-        opportunity_data = opportunity_data.copy()
-        opportunity_data['Risk_Score'] = risk_scores
-        opportunity_data['Risk_Level'] = pd.cut(
-            risk_scores, 
-            bins=[0, 0.3, 0.6, 1.0], 
-            labels=['Low', 'Medium', 'High']
+        return opportunity_data.assign(
+            Risk_Score=risk_scores,
+            Risk_Level=pd.cut(
+                risk_scores, 
+                bins=[0, 0.3, 0.6, 1.0], 
+                labels=['Low', 'Medium', 'High']
+            )
         )
+    
+    def risk_random_state(self, scored_data):
+        """
+        Generator positioned where scoring ``scored_data`` left off.
+        
+        Rows scored with it get the risk scores they would have had at the end
+        of a full recompute over ``scored_data`` plus the new rows.
         
-        return opportunity_data
+        Args:
+            scored_data: Opportunities already scored, in order
+            
+        Returns:
+            np.random.RandomState
+        """
+        random_state = np.random.RandomState(42)
+        # Two draws per row, plus regulatory risk for non-governance areas
+        draws = 2 * len(scored_data) + int((~scored_data['Opportunity_Area'].str.contains('Governance', regex=False)).sum())
+        random_state.uniform(size=draws)
+        return random_state
     
+    @traced('analytics.generate_portfolio_recommendations')
     def generate_portfolio_recommendations(self, opportunities_df, risk_tolerance='medium', investment_amount=1000000):
         """
         Generate investment portfolio recommendations based on risk tolerance.
@@ -222,38 +349,29 @@ class AIMarketAnalytics:
             Portfolio allocation recommendations
         """
         # Calculate opportunity scores
-        opp_scores = []
-        for _, row in opportunities_df.iterrows():
-            score = self.calculate_opportunity_score(
-                float(row['Market_Size_2025'].replace('Large ($', '').replace('Medium ($', '').replace('B+)', '')),
-                row['Growth_Rate_CAGR'],
-                50,  # Assume 50% adoption for calculation
-                row['Investment_Focus_Score']
-            )
-            opp_scores.append(score)
-        
-        opportunities_df = opportunities_df.copy()
-        opportunities_df['Opportunity_Score'] = opp_scores
+        opp_scores = self.calculate_opportunity_scores(opportunities_df)
         
-        # Risk-based filtering
+        # Risk-based filtering, on the score series only
         if risk_tolerance == 'low':
-            filtered_opps = opportunities_df[opportunities_df['Risk_Level'] == 'Low']
+            opp_scores = opp_scores[opportunities_df['Risk_Level'] == 'Low']
             max_allocation = 0.25
         elif risk_tolerance == 'medium':
-            filtered_opps = opportunities_df[opportunities_df['Risk_Level'].isin(['Low', 'Medium'])]
+            opp_scores = opp_scores[opportunities_df['Risk_Level'].isin(['Low', 'Medium'])]
             max_allocation = 0.35
         else:  # high risk tolerance
-            filtered_opps = opportunities_df
             max_allocation = 0.50
         
         # Sort by opportunity score
-        filtered_opps = filtered_opps.sort_values('Opportunity_Score', ascending=False)
+        opp_scores = opp_scores.sort_values(ascending=False)
         
         # Allocate investment
-        total_score = filtered_opps['Opportunity_Score'].sum()
+        total_score = opp_scores.sum()
         allocations = []
         
-        for _, row in filtered_opps.head(8).iterrows():  # Top 8 opportunities
+        # Only the top 8 rows are materialized
+        top_scores = opp_scores.head(8)
+        top_opps = opportunities_df.loc[top_scores.index].assign(Opportunity_Score=top_scores)
+        for _, row in top_opps.iterrows():
             weight = min(row['Opportunity_Score'] / total_score, max_allocation)
             allocation = investment_amount * weight
             
@@ -266,42 +384,287 @@ class AIMarketAnalytics:
                 'Opportunity_Score': row['Opportunity_Score']
             })
         
-        return pd.DataFrame(allocations)
+        portfolio = pd.DataFrame(allocations)
+        if allocations:
+            # Keep the source column's (possibly compact) dtype
+            portfolio['Expected_Return'] = portfolio['Expected_Return'].astype(opportunities_df['Growth_Rate_CAGR'].dtype)
+        return portfolio
+
+def summarize_trend_clusters(clustered_trends, view='centroids', sample_per_cluster=25, voxel_bins=12, random_state=42):
+    """
+    Aggregate clustered trends server-side for the 3D cluster view.
+    
+    Args:
+        clustered_trends: Output of AIMarketAnalytics.perform_trend_clustering
+        view: 'centroids' for cluster means plus a stratified sample,
+              'density' for voxel-binned point counts
+        sample_per_cluster: Rows kept per cluster in the 'centroids' view
+        voxel_bins: Bins per axis in the 'density' view
+        random_state: Seed for the stratified sample
+        
+    Returns:
+        Tuple of (aggregate DataFrame, sample DataFrame or None)
+    """
+    if view == 'centroids':
+        centroids = clustered_trends.groupby('Cluster_Name', observed=True)[CLUSTER_FEATURES].mean()
+        centroids['Trend_Count'] = clustered_trends.groupby('Cluster_Name', observed=True).size()
+        
+        # Stratified by cluster: shuffle once, then keep the first rows of each group
+        rng = np.random.default_rng(random_state)
+        shuffled = clustered_trends.iloc[rng.permutation(len(clustered_trends))]
+        sample = shuffled.groupby('Cluster_Name', observed=True, sort=False).head(sample_per_cluster)
+        
+        return centroids.reset_index(), sample
+    
+    if view == 'density':
+        features = clustered_trends[CLUSTER_FEATURES].to_numpy(dtype=np.float64)
+        low = np.nanmin(features, axis=0)
+        span = np.nanmax(features, axis=0) - low
+        span[span == 0] = 1.0
+        voxels = np.minimum(((features - low) / span * voxel_bins).astype(np.int64), voxel_bins - 1)
+        voxel_id = (voxels[:, 0] * voxel_bins + voxels[:, 1]) * voxel_bins + voxels[:, 2]
+        
+        binned = clustered_trends[CLUSTER_FEATURES + ['Cluster_Name']].assign(Voxel=voxel_id)
+        density = binned.groupby('Voxel')[CLUSTER_FEATURES].mean()
+        density['Trend_Count'] = binned.groupby('Voxel').size()
+        # Each voxel takes the color of the cluster most of its trends belong to
+        density['Cluster_Name'] = binned.groupby('Voxel')['Cluster_Name'].agg(lambda names: names.mode().iloc[0])
+        
+        return density.reset_index(drop=True), None
+    
+    raise ValueError(f"Unknown cluster view: {view}")
+
+def nearest_centroid_model(clustered_trends):
+    """
+    Standardization and cluster centroids of a clustered trend set.
+    
+    KMeans centroids are the means of their members, so they are recovered
+    from the labels without refitting.
+    
+    Args:
+        clustered_trends: Output of perform_trend_clustering
+        
+    Returns:
+        Dictionary with mean, scale, centroids (scaled), clusters and names
+    """
+    features = clustered_trends[CLUSTER_FEATURES].fillna(0).to_numpy(dtype=np.float64)
+    mean = features.mean(axis=0)
+    # StandardScaler leaves constant features unscaled
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    scaled = pd.DataFrame((features - mean) / scale, index=clustered_trends.index)
+    centroids = scaled.groupby(clustered_trends['Cluster'].to_numpy()).mean()
+    names = clustered_trends.drop_duplicates('Cluster').set_index('Cluster')['Cluster_Name']
+    return {
+        'mean': mean,
+        'scale': scale,
+        'centroids': centroids.to_numpy(),
+        'clusters': centroids.index.to_numpy(),
+        'names': names.to_dict()
+    }
+
+
+def assign_clusters(trends_df, model):
+    """
+    Label trends with their nearest cluster centroid (no refit).
+    
+    Args:
+        trends_df: Trends to label
+        model: Output of nearest_centroid_model
+        
+    Returns:
+        trends_df with Cluster and Cluster_Name columns
+    """
+    features = trends_df[CLUSTER_FEATURES].fillna(0).to_numpy(dtype=np.float64)
+    scaled = (features - model['mean']) / model['scale']
+    distances = ((scaled[:, None, :] - model['centroids'][None, :, :]) ** 2).sum(axis=2)
+    clusters = pd.Series(model['clusters'][distances.argmin(axis=1)], index=trends_df.index)
+    return trends_df.assign(Cluster=clusters, Cluster_Name=clusters.map(model['names']))
+
+
+def extend_clusters(clustered_trends, trends_df):
+    """
+    Carry a clustering over to a trend table that has since grown.
+    
+    Rows already clustered keep their labels; rows added since are assigned to
+    the nearest centroid of the existing clusters.
+    
+    Args:
+        clustered_trends: Output of perform_trend_clustering on the earlier rows
+        trends_df: Current trends table (the earlier rows plus appended ones)
+        
+    Returns:
+        Clustered trends for every row of trends_df
+    """
+    appended = trends_df.loc[trends_df.index.difference(clustered_trends.index, sort=False)]
+    if len(appended) == 0:
+        return clustered_trends
+    return pd.concat([clustered_trends, assign_clusters(appended, nearest_centroid_model(clustered_trends))])
+
 
-def create_advanced_visualizations(trends_df, opportunities_df, analytics_engine):
+@traced('chart.cluster_figure')
+def create_cluster_figure(clustered_trends, view='auto', sample_per_cluster=25, voxel_bins=12):
+    """
+    Create the 3D trend cluster figure, aggregating large inputs server-side.
+    
+    Args:
+        clustered_trends: Output of AIMarketAnalytics.perform_trend_clustering
+        view: 'auto', 'full', 'centroids' or 'density'
+        sample_per_cluster: Rows kept per cluster in the 'centroids' view
+        voxel_bins: Bins per axis in the 'density' view
+        
+    Returns:
+        Plotly 3D figure
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    if view == 'auto':
+        view = 'full' if len(clustered_trends) <= CLUSTER_FULL_RENDER_LIMIT else 'centroids'
+    
+    if view == 'full':
+        fig = px.scatter_3d(
+            clustered_trends,
+            x='Impact_Score',
+            y='Market_Size_Billion',
+            z='Adoption_Rate',
+            color='Cluster_Name',
+            hover_name='Trend',
+            title='AI Trends Strategic Clustering (3D)',
+            labels=CLUSTER_AXIS_LABELS
+        )
+    elif view == 'centroids':
+        centroids, sample = summarize_trend_clusters(clustered_trends, 'centroids', sample_per_cluster=sample_per_cluster)
+        fig = px.scatter_3d(
+            sample,
+            x='Impact_Score',
+            y='Market_Size_Billion',
+            z='Adoption_Rate',
+            color='Cluster_Name',
+            hover_name='Trend',
+            opacity=0.5,
+            title=f'AI Trends Strategic Clustering (3D) - centroids and up to {sample_per_cluster} trends per cluster',
+            labels=CLUSTER_AXIS_LABELS
+        )
+        fig.update_traces(marker=dict(size=3))
+        fig.add_trace(go.Scatter3d(
+            x=centroids['Impact_Score'],
+            y=centroids['Market_Size_Billion'],
+            z=centroids['Adoption_Rate'],
+            mode='markers',
+            name='Cluster Centroids',
+            text=centroids['Cluster_Name'],
+            customdata=centroids['Trend_Count'],
+            hovertemplate='<b>%{text}</b><br>Trends: %{customdata:,}<extra>Centroid</extra>',
+            marker=dict(size=12, symbol='diamond', color='#2B2F36', line=dict(width=1, color='#BFA06A'))
+        ))
+    else:
+        density, _ = summarize_trend_clusters(clustered_trends, 'density', voxel_bins=voxel_bins)
+        fig = px.scatter_3d(
+            density,
+            x='Impact_Score',
+            y='Market_Size_Billion',
+            z='Adoption_Rate',
+            color='Cluster_Name',
+            size='Trend_Count',
+            hover_data={'Trend_Count': ':,'},
+            title='AI Trends Strategic Clustering (3D) - voxel density',
+            labels=CLUSTER_AXIS_LABELS
+        )
+    
+    fig.update_layout(height=600)
+    return fig
+
+@traced('chart.cluster_drilldown')
+def create_cluster_drilldown(clustered_trends, cluster_name):
+    """
+    Create a 3D figure with every trend of a single cluster.
+    
+    Args:
+        clustered_trends: Output of AIMarketAnalytics.perform_trend_clustering
+        cluster_name: Cluster_Name to drill into
+        
+    Returns:
+        Plotly 3D figure
+    """
+    import plotly.express as px
+    
+    cluster_trends = clustered_trends[clustered_trends['Cluster_Name'] == cluster_name]
+    
+    fig = px.scatter_3d(
+        cluster_trends,
+        x='Impact_Score',
+        y='Market_Size_Billion',
+        z='Adoption_Rate',
+        hover_name='Trend',
+        title=f'{cluster_name}: {len(cluster_trends):,} trends',
+        labels=CLUSTER_AXIS_LABELS
+    )
+    fig.update_layout(height=600)
+    return fig
+
+def _copy_figures(figures):
+    """Give each waiting caller its own figure objects."""
+    import plotly.graph_objects as go
+    
+    return {name: go.Figure(fig) for name, fig in figures.items()}
+
+@traced('chart.advanced_visualizations')
+def create_advanced_visualizations(trends_df, opportunities_df, analytics_engine,
+                                   scatter_threshold=LARGE_DATA_THRESHOLD, downsampling_method='lttb',
+                                   cluster_view='auto', clustered_trends=None):
     """
     Create advanced analytical visualizations.
     
+    Concurrent calls with identical data and options wait for a single build.
+    
     Args:
         trends_df: Trends data
         opportunities_df: Opportunities data
         analytics_engine: AIMarketAnalytics instance
+        scatter_threshold: Row count above which scatters use WebGL and downsampling
+        downsampling_method: 'lttb' or 'bin'
+        cluster_view: 'auto', 'full', 'centroids' or 'density' for the 3D cluster plot
+        clustered_trends: Optional precomputed perform_trend_clustering output
         
     Returns:
         Dictionary of plotly figures
     """
+    key = (
+        'create_advanced_visualizations',
+        frame_fingerprint(trends_df),
+        frame_fingerprint(opportunities_df),
+        frame_fingerprint(clustered_trends),
+        scatter_threshold,
+        downsampling_method,
+        cluster_view
+    )
+    return analytics_flight.do(
+        key,
+        _build_advanced_visualizations,
+        trends_df, opportunities_df, analytics_engine,
+        scatter_threshold, downsampling_method, cluster_view, clustered_trends,
+        share=_copy_figures
+    )
+
+def _build_advanced_visualizations(trends_df, opportunities_df, analytics_engine,
+                                   scatter_threshold, downsampling_method, cluster_view, clustered_trends):
+    """Build the figures for create_advanced_visualizations."""
+    import plotly.express as px
+    from chart_rendering import large_scatter
+    
     figures = {}
     
     # 1. Opportunity Score vs Risk Matrix
     opp_with_risk = analytics_engine.calculate_investment_risk_score(opportunities_df)
+    opp_with_risk = opp_with_risk.assign(Opportunity_Score=analytics_engine.calculate_opportunity_scores(opp_with_risk))
     
-    # Calculate opportunity scores
-    opp_scores = []
-    for _, row in opp_with_risk.iterrows():
-        score = analytics_engine.calculate_opportunity_score(
-            float(row['Market_Size_2025'].replace('Large ($', '').replace('Medium ($', '').replace('B+)', '')),
-            row['Growth_Rate_CAGR'],
-            50,  # Assume 50% adoption
-            row['Investment_Focus_Score']
-        )
-        opp_scores.append(score)
-    
-    opp_with_risk['Opportunity_Score'] = opp_scores
-    
-    fig_risk_return = px.scatter(
+    fig_risk_return = large_scatter(
         opp_with_risk,
         x='Risk_Score',
         y='Opportunity_Score',
+        threshold=scatter_threshold,
+        method=downsampling_method,
         size='Growth_Rate_CAGR',
         color='Risk_Level',
         hover_name='Opportunity_Area',
@@ -335,24 +698,10 @@ def create_advanced_visualizations(trends_df, opportunities_df, analytics_engine
     figures['growth_investment_bubble'] = fig_bubble
     
     # 3. Trend Clustering Visualization
-    clustered_trends, _ = analytics_engine.perform_trend_clustering(trends_df)
+    if clustered_trends is None:
+        clustered_trends, _ = analytics_engine.perform_trend_clustering(trends_df)
     
-    fig_clusters = px.scatter_3d(
-        clustered_trends,
-        x='Impact_Score',
-        y='Market_Size_Billion',
-        z='Adoption_Rate',
-        color='Cluster_Name',
-        hover_name='Trend',
-        title='AI Trends Strategic Clustering (3D)',
-        labels={
-            'Impact_Score': 'Impact Score',
-            'Market_Size_Billion': 'Market Size ($B)',
-            'Adoption_Rate': 'Adoption Rate (%)'
-        }
-    )
-    fig_clusters.update_layout(height=600)
-    figures['trend_clusters'] = fig_clusters
+    figures['trend_clusters'] = create_cluster_figure(clustered_trends, cluster_view)
     
     # 4. Investment Portfolio Allocation
     portfolio = analytics_engine.generate_portfolio_recommendations(opp_with_risk)
@@ -381,6 +730,7 @@ def create_advanced_visualizations(trends_df, opportunities_df, analytics_engine
     
     return figures
 
+@traced('analytics.generate_market_insights')
 def generate_market_insights(trends_df, opportunities_df):
     """
     Generate key market insights and recommendations.
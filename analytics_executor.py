@@ -0,0 +1,506 @@
+"""
+Process-Pool Execution for AI Opportunity Map Analytics
+=======================================================
+
+Runs the heavy AIMarketAnalytics work (KMeans fitting, correlations, risk
+scoring, portfolio generation, advanced figures) in worker processes so it
+neither holds the GIL nor blocks the Streamlit script thread.
+
+DataFrames are published once to shared memory: numeric, categorical and
+Arrow-backed text columns live in ``multiprocessing.shared_memory`` blocks
+that workers map zero-copy; only object columns are pickled. Every submission returns a
+``concurrent.futures.Future``, and identical submissions return the same
+future, so the UI can start heavy work early, render the light tabs, and
+collect the result afterwards.
+
+Published frames are evicted least recently used, but never while a pending
+future still needs them. The names of retired blocks travel with the next
+submissions, and workers close their attachments to them before running.
+
+Usage:
+    executor = AnalyticsExecutor(max_workers=2)
+    clusters = executor.submit('perform_trend_clustering', trends_df)
+    ...render light tabs...
+    clustered_trends, kmeans = clusters.result()
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import atexit
+import os
+import threading
+import weakref
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from metrics import record_cache
+from single_flight import frame_fingerprint
+
+# Heavy AIMarketAnalytics methods that may be submitted by name
+SUBMITTABLE_METHODS = (
+    'perform_trend_clustering',
+    'calculate_market_correlations',
+    'calculate_investment_risk_score',
+    'generate_portfolio_recommendations',
+    'predict_market_growth',
+)
+
+# Published frames and memoized futures kept per executor
+MAX_CACHED_RESULTS = 32
+
+# Retired block names sent along with each submission so workers can detach
+MAX_RETIRED_BLOCKS = 1024
+
+
+# --- Shared-memory frames ---
+
+class SharedArray:
+    """Picklable descriptor of a NumPy array stored in a shared-memory block."""
+
+    __slots__ = ('name', 'dtype', 'shape')
+
+    def __init__(self, name, dtype, shape):
+        self.name = name
+        self.dtype = dtype
+        self.shape = shape
+
+    def __getstate__(self):
+        return (self.name, self.dtype, self.shape)
+
+    def __setstate__(self, state):
+        self.name, self.dtype, self.shape = state
+
+
+def share_array(array):
+    """
+    Copy an array into a new shared-memory block.
+
+    Args:
+        array: NumPy array with a fixed-width dtype
+
+    Returns:
+        Tuple of (SharedMemory block owned by the caller, SharedArray descriptor)
+    """
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, SharedArray(block.name, array.dtype.str, array.shape)
+
+
+_attached_blocks = {}
+_tracker_lock = threading.Lock()
+
+
+def _open_block(name):
+    """
+    Attach an existing shared-memory block without registering it for cleanup.
+
+    Only the creator unlinks a block. Python < 3.13 registers attached blocks
+    with the resource tracker as well, which unlinks them when the attaching
+    process exits, so registration is suppressed while attaching.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        from multiprocessing import resource_tracker
+
+        with _tracker_lock:
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                return shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+
+def attach_array(descriptor):
+    """
+    Map a shared array into this process without copying.
+
+    Args:
+        descriptor: SharedArray from share_array
+
+    Returns:
+        Read-only NumPy array backed by the shared block
+    """
+    block = _attached_blocks.get(descriptor.name)
+    if block is None:
+        block = _open_block(descriptor.name)
+        _attached_blocks[descriptor.name] = block
+
+    array = np.ndarray(descriptor.shape, dtype=np.dtype(descriptor.dtype), buffer=block.buf)
+    array.flags.writeable = False
+    return array
+
+
+def release_blocks(names):
+    """
+    Close this process's attachments to blocks the creator has retired.
+
+    Blocks still referenced by live arrays cannot be closed yet; they stay
+    attached and are retried the next time their names are passed in.
+
+    Args:
+        names: Shared-memory block names
+    """
+    for name in names:
+        block = _attached_blocks.pop(name, None)
+        if block is None:
+            continue
+        try:
+            block.close()
+        except BufferError:
+            _attached_blocks[name] = block
+
+
+def _is_arrow_text(values):
+    """Whether a column is an Arrow-backed string column that can be shared as buffers."""
+    if not isinstance(values.dtype, pd.StringDtype) or values.dtype.storage != 'pyarrow':
+        return False
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class SharedFrame:
+    """A DataFrame published to shared memory, described by a picklable handle."""
+
+    def __init__(self, df):
+        """
+        Args:
+            df: DataFrame to publish
+        """
+        self.blocks = []
+        columns = []
+        for column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                columns.append((column, 'category', self._share(values.cat.codes.to_numpy()),
+                                values.cat.categories.tolist(), values.cat.ordered))
+            elif values.dtype.kind in 'biuf' and not pd.api.types.is_extension_array_dtype(values.dtype):
+                columns.append((column, 'array', self._share(values.to_numpy()), None, None))
+            elif _is_arrow_text(values):
+                # Arrow validity/offset/data buffers map zero-copy like numeric columns
+                import pyarrow as pa
+
+                text = pa.array(values.array, type=pa.large_string())
+                if isinstance(text, pa.ChunkedArray):
+                    # Streamed appends leave one chunk per append; the buffers need one array
+                    text = text.combine_chunks()
+                buffers = [None if buffer is None else self._share(np.frombuffer(buffer, dtype=np.uint8))
+                           for buffer in text.buffers()]
+                columns.append((column, 'text', buffers, (len(text), text.null_count), values.dtype))
+            else:
+                # Object and other extension columns travel by pickle
+                columns.append((column, 'pickled', values.to_numpy(), None, None))
+
+        self.handle = {'index': df.index, 'columns': columns}
+        self.nbytes = sum(block.size for block in self.blocks)
+
+    def _share(self, array):
+        block, descriptor = share_array(array)
+        self.blocks.append(block)
+        return descriptor
+
+    @property
+    def block_names(self):
+        """Names of the shared blocks backing this frame."""
+        return [block.name for block in self.blocks]
+
+    def close(self):
+        """Release and unlink the shared blocks."""
+        for block in self.blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = []
+
+
+def _attach_text(buffers, shape, dtype):
+    """Rebuild an Arrow string column over shared buffers."""
+    import pyarrow as pa
+
+    length, null_count = shape
+    text = pa.Array.from_buffers(
+        pa.large_string(),
+        length,
+        [None if buffer is None else pa.py_buffer(attach_array(buffer)) for buffer in buffers],
+        null_count
+    )
+    return pd.arrays.ArrowStringArray(text, dtype=dtype)
+
+
+def attach_frame(handle):
+    """
+    Rebuild a DataFrame from a SharedFrame handle; numeric, categorical and
+    Arrow text columns are zero-copy views.
+
+    Args:
+        handle: SharedFrame.handle
+
+    Returns:
+        DataFrame
+    """
+    data = {}
+    for column, kind, payload, extra, dtype in handle['columns']:
+        if kind == 'category':
+            data[column] = pd.Categorical.from_codes(attach_array(payload), categories=extra, ordered=dtype)
+        elif kind == 'array':
+            data[column] = attach_array(payload)
+        elif kind == 'text':
+            data[column] = _attach_text(payload, extra, dtype)
+        else:
+            data[column] = payload
+    return pd.DataFrame(data, index=handle['index'], copy=False)
+
+
+# Frames already backed by shared memory (e.g. the dataset store), by object id
+_published_handles = {}
+
+
+def publish_handle(df, handle):
+    """
+    Record that ``df`` is already attached from shared memory, so submissions
+    pass its handle instead of publishing a second copy.
+
+    Args:
+        df: DataFrame built by attach_frame
+        handle: The SharedFrame handle it was built from
+    """
+    key = id(df)
+    _published_handles[key] = handle
+    weakref.finalize(df, _published_handles.pop, key, None)
+
+
+# --- Worker side ---
+
+_worker_engine = None
+
+
+def _engine():
+    """One AIMarketAnalytics per worker process."""
+    global _worker_engine
+    if _worker_engine is None:
+        from advanced_analytics import AIMarketAnalytics
+        _worker_engine = AIMarketAnalytics()
+    return _worker_engine
+
+
+def _resolve(value):
+    """Turn shared-frame handles back into DataFrames."""
+    if isinstance(value, dict) and value.get('__shared_frame__'):
+        return attach_frame(value['handle'])
+    return value
+
+
+def _run_method(method, args, kwargs, retired=()):
+    """Worker entry point for AIMarketAnalytics methods."""
+    release_blocks(retired)
+    args = [_resolve(arg) for arg in args]
+    kwargs = {key: _resolve(value) for key, value in kwargs.items()}
+    return getattr(_engine(), method)(*args, **kwargs)
+
+
+def _run_visualizations(trends, opportunities, options, base_rows=None, retired=()):
+    """Worker entry point for the clustered trends plus the advanced figures."""
+    from advanced_analytics import create_advanced_visualizations, extend_clusters
+
+    release_blocks(retired)
+
+    trends_df = _resolve(trends)
+    # Same labels as the dashboard: fit the base rows, place later rows by nearest centroid
+    base_trends = trends_df if base_rows is None else trends_df.iloc[:base_rows]
+    clustered_trends, _ = _engine().perform_trend_clustering(base_trends)
+    clustered_trends = extend_clusters(clustered_trends, trends_df)
+    figures = create_advanced_visualizations(
+        trends_df,
+        _resolve(opportunities),
+        _engine(),
+        clustered_trends=clustered_trends,
+        **options
+    )
+    return clustered_trends, figures
+
+
+# --- Parent side ---
+
+class AnalyticsExecutor:
+    """Submit AIMarketAnalytics work to a process pool and get futures back."""
+
+    def __init__(self, max_workers=None, mode='process'):
+        """
+        Args:
+            max_workers: Pool size (default: min(4, CPU count))
+            mode: 'process' for a process pool, 'thread' for a thread pool
+        """
+        max_workers = max_workers or min(4, os.cpu_count() or 1)
+        if mode == 'process':
+            self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        elif mode == 'thread':
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analytics')
+        else:
+            raise ValueError(f"Unknown executor mode: {mode}")
+
+        self.mode = mode
+        # Re-entrant: a done callback runs inline when its future has already finished
+        self._lock = threading.RLock()
+        self._frames = OrderedDict()
+        self._futures = OrderedDict()
+        # Pending futures per published frame fingerprint
+        self._pending = Counter()
+        self._retired = deque(maxlen=MAX_RETIRED_BLOCKS)
+        atexit.register(self.shutdown)
+
+    def _share(self, value, pinned):
+        """
+        Publish DataFrame arguments once per content fingerprint.
+
+        Args:
+            value: Submission argument
+            pinned: List collecting the fingerprints of the frames published for
+                this submission, to pin them until its future finishes
+        """
+        if not isinstance(value, pd.DataFrame):
+            return value
+        if self.mode == 'thread':
+            return value
+
+        handle = _published_handles.get(id(value))
+        if handle is not None:
+            return {'__shared_frame__': True, 'handle': handle}
+
+        fingerprint = frame_fingerprint(value)
+        shared = self._frames.get(fingerprint)
+        if shared is None:
+            shared = SharedFrame(value)
+            self._frames[fingerprint] = shared
+        else:
+            self._frames.move_to_end(fingerprint)
+        pinned.append(fingerprint)
+        return {'__shared_frame__': True, 'handle': shared.handle}
+
+    def _pin(self, future, pinned):
+        """Keep the frames of a submission published until its future finishes."""
+        self._pending.update(pinned)
+        future.add_done_callback(lambda _: self._unpin(pinned))
+        self._evict()
+        return future
+
+    def _unpin(self, pinned):
+        with self._lock:
+            self._pending.subtract(pinned)
+            self._pending += Counter()  # drop counts that reached zero
+            self._evict()
+
+    def _evict(self):
+        """Unlink least recently used frames beyond the limit that no pending future needs."""
+        excess = len(self._frames) - MAX_CACHED_RESULTS
+        for fingerprint in list(self._frames):
+            if excess <= 0:
+                return
+            if self._pending[fingerprint]:
+                continue
+            shared = self._frames.pop(fingerprint)
+            self._retired.extend(shared.block_names)
+            shared.close()
+            excess -= 1
+
+    def _memoized(self, key, submit):
+        """Return the future for ``key``, submitting the work only once."""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and not (future.done() and future.exception() is not None):
+                self._futures.move_to_end(key)
+                record_cache(f"executor.{key[0]}", True)
+                return future
+
+            record_cache(f"executor.{key[0]}", False)
+
+            future = submit()
+            self._futures[key] = future
+            while len(self._futures) > MAX_CACHED_RESULTS:
+                self._futures.popitem(last=False)
+            return future
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Run an AIMarketAnalytics method in the pool.
+
+        Args:
+            method: Name from SUBMITTABLE_METHODS
+            *args, **kwargs: Method arguments; DataFrames go through shared memory
+
+        Returns:
+            Future resolving to the method's return value
+        """
+        if method not in SUBMITTABLE_METHODS:
+            raise ValueError(f"{method} cannot be submitted to the analytics executor")
+
+        key = (
+            method,
+            tuple(frame_fingerprint(arg) if isinstance(arg, pd.DataFrame) else repr(arg) for arg in args),
+            tuple(sorted((name, repr(value)) for name, value in kwargs.items()))
+        )
+
+        def _submit():
+            pinned = []
+            shared_args = [self._share(arg, pinned) for arg in args]
+            shared_kwargs = {name: self._share(value, pinned) for name, value in kwargs.items()}
+            future = self._pool.submit(_run_method, method, shared_args, shared_kwargs, tuple(self._retired))
+            return self._pin(future, pinned)
+
+        return self._memoized(key, _submit)
+
+    def submit_visualizations(self, trends_df, opportunities_df, base_rows=None, **options):
+        """
+        Cluster trends and build the advanced figures in the pool.
+
+        Args:
+            trends_df: Trends data
+            opportunities_df: Opportunities data
+            base_rows: Leading trend rows KMeans is fitted on; later (streamed)
+                rows are assigned to the nearest centroid. Default: all rows
+            **options: Keyword options for create_advanced_visualizations
+
+        Returns:
+            Future resolving to (clustered trends DataFrame, dictionary of figures)
+        """
+        key = (
+            'create_advanced_visualizations',
+            frame_fingerprint(trends_df),
+            frame_fingerprint(opportunities_df),
+            base_rows,
+            tuple(sorted(options.items()))
+        )
+
+        def _submit():
+            pinned = []
+            future = self._pool.submit(
+                _run_visualizations,
+                self._share(trends_df, pinned),
+                self._share(opportunities_df, pinned),
+                options,
+                base_rows,
+                tuple(self._retired)
+            )
+            return self._pin(future, pinned)
+
+        return self._memoized(key, _submit)
+
+    def shutdown(self):
+        """Stop the pool and unlink every shared block."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for shared in self._frames.values():
+                shared.close()
+            self._frames.clear()
+            self._futures.clear()
@@ -0,0 +1,484 @@
+"""
+Headless Analytics Service for AI Opportunity Map
+=================================================
+
+Pure-Python service layer behind the dashboard tabs. Every function takes
+DataFrames and plain parameters and returns DataFrames or dictionaries, so
+batch jobs, the HTTP API and the Streamlit app share one code path and the
+computations can be benchmarked without starting the UI.
+
+Usage:
+    tables = load_datasets()
+    results = run_dashboard_analysis(tables, horizon='Emerging & Growing (2025-2027)')
+
+    python analytics_service.py --risk-tolerance high --output results.json
+    python analytics_service.py --memory-report
+    python analytics_service.py --trace analysis_trace.json
+
+Set AI_MAP_DATASET_DIR to a directory written by synthetic_data.py to load
+its Parquet tables instead of the hand-written ones (tables missing from the
+directory still come from data_sources); used for load tests and benchmarks.
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_sources import (
+    load_comprehensive_trend_data,
+    load_comprehensive_opportunity_data,
+    load_regional_market_data,
+    load_industry_adoption_data,
+    load_workforce_impact_data,
+    memory_report
+)
+from advanced_analytics import AIMarketAnalytics, generate_market_insights
+from instrumentation import span, traced, start_trace, finish_trace, export_trace, TRACE_FORMATS
+
+TIME_HORIZONS = [
+    "All",
+    "Currently Dominant (2025-2026)",
+    "Emerging & Growing (2025-2027)",
+    "Future Outlook (2027-2030)"
+]
+
+MARKET_SIZE_FILTERS = ["All", "Large Markets Only", "Medium Markets Only"]
+
+DEFAULT_REGIONS = ["North America", "Europe", "Asia-Pacific"]
+
+# Investment focus at which an opportunity counts as a high-focus area
+HIGH_FOCUS_SCORE = 8
+
+_default_engine = None
+
+
+def enable_copy_on_write():
+    """
+    Turn on pandas Copy-on-Write for this process (the default from pandas 3).
+
+    Row selections and assign() then share column buffers with their source
+    instead of copying whole tables. Only entry points (the dashboard, the
+    command line) call this; importing the library leaves the option alone.
+    """
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def _engine(analytics_engine):
+    """Return the given engine or a shared default instance."""
+    global _default_engine
+    if analytics_engine is not None:
+        return analytics_engine
+    if _default_engine is None:
+        _default_engine = AIMarketAnalytics()
+    return _default_engine
+
+
+TABLE_LOADERS = {
+    'trends': load_comprehensive_trend_data,
+    'opportunities': load_comprehensive_opportunity_data,
+    'regional': load_regional_market_data,
+    'industry': load_industry_adoption_data,
+    'workforce': load_workforce_impact_data
+}
+
+
+def dataset_source():
+    """
+    Describe where the tables come from, based on AI_MAP_DATASET_DIR.
+
+    Returns:
+        'data_sources' or 'parquet:<directory>'
+    """
+    directory = os.environ.get('AI_MAP_DATASET_DIR')
+    return f"parquet:{os.path.abspath(directory)}" if directory else 'data_sources'
+
+
+def load_table(table):
+    """
+    Load one dashboard table from the configured dataset source.
+
+    Args:
+        table: Key of TABLE_LOADERS
+
+    Returns:
+        DataFrame
+    """
+    source = dataset_source()
+    with span(f"load.{table}", source=source) as attributes:
+        df = None
+        if source.startswith('parquet:'):
+            directory = source.split(':', 1)[1]
+            if os.path.exists(os.path.join(directory, f"{table}.parquet")):
+                from synthetic_data import read_dataset
+                df = read_dataset(directory, tables=[table])[table]
+        if df is None:
+            df = TABLE_LOADERS[table]()
+        attributes['rows'] = len(df)
+    return df
+
+
+def load_datasets():
+    """
+    Load the five dashboard tables.
+
+    Returns:
+        Dictionary of table name -> DataFrame
+    """
+    return {table: load_table(table) for table in TABLE_LOADERS}
+
+
+# --- Trend Analysis ---
+
+@traced('service.filter_trends')
+def filter_trends(trends_df, horizon="All", min_impact=1.0):
+    """
+    Apply the sidebar time horizon and minimum impact filters.
+
+    Args:
+        trends_df: Trends data
+        horizon: One of TIME_HORIZONS
+        min_impact: Minimum Impact_Score
+
+    Returns:
+        Filtered trends DataFrame
+    """
+    # One combined mask, so only the selected rows are materialized once
+    mask = trends_df['Impact_Score'] >= min_impact
+    if horizon != "All":
+        mask &= horizon_mask(trends_df, horizon)
+
+    return trends_df[mask]
+
+
+def horizon_mask(trends_df, horizon):
+    """Boolean mask of the trends in one TIME_HORIZONS option."""
+    if horizon == "All":
+        return pd.Series(True, index=trends_df.index)
+    return trends_df['Time_Horizon'].str.contains(horizon.split('(')[0].strip())
+
+
+def trend_metrics(filtered_trends, trends_df):
+    """
+    Compute the tab1 metric row.
+
+    Args:
+        filtered_trends: Output of filter_trends
+        trends_df: Unfiltered trends data (for the "vs all" delta)
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    avg_impact = filtered_trends['Impact_Score'].mean()
+    return {
+        'count': len(filtered_trends),
+        'total_count': len(trends_df),
+        'avg_impact': avg_impact,
+        'avg_impact_delta': avg_impact - trends_df['Impact_Score'].mean(),
+        'total_market_billion': filtered_trends['Market_Size_Billion'].sum(),
+        'avg_adoption': filtered_trends['Adoption_Rate'].mean()
+    }
+
+
+def top_trends(filtered_trends, n=5):
+    """Return the ``n`` highest-impact trends."""
+    return filtered_trends.nlargest(n, 'Impact_Score')
+
+
+# --- Opportunity Map ---
+
+@traced('service.filter_opportunities')
+def filter_opportunities(opportunities_df, min_investment=1.0, market_size="All"):
+    """
+    Apply the sidebar minimum investment focus and market size filters.
+
+    Args:
+        opportunities_df: Opportunities data
+        min_investment: Minimum Investment_Focus_Score
+        market_size: One of MARKET_SIZE_FILTERS
+
+    Returns:
+        Filtered opportunities DataFrame
+    """
+    mask = opportunities_df['Investment_Focus_Score'] >= min_investment
+    if market_size != "All":
+        mask &= market_size_mask(opportunities_df, market_size)
+
+    return opportunities_df[mask]
+
+
+def market_size_mask(opportunities_df, market_size):
+    """Boolean mask of the opportunities in one MARKET_SIZE_FILTERS option."""
+    if market_size == "Large Markets Only":
+        return opportunities_df['Market_Size_2025'].str.contains('Large')
+    if market_size == "Medium Markets Only":
+        return opportunities_df['Market_Size_2025'].str.contains('Medium')
+    return pd.Series(True, index=opportunities_df.index)
+
+
+def opportunity_metrics(filtered_opportunities, opportunities_df):
+    """
+    Compute the tab2 metric row.
+
+    Args:
+        filtered_opportunities: Output of filter_opportunities
+        opportunities_df: Unfiltered opportunities data
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    return {
+        'count': len(filtered_opportunities),
+        'total_count': len(opportunities_df),
+        'avg_investment_focus': filtered_opportunities['Investment_Focus_Score'].mean(),
+        'avg_growth_rate': filtered_opportunities['Growth_Rate_CAGR'].mean(),
+        'high_focus_count': int((filtered_opportunities['Investment_Focus_Score'] >= HIGH_FOCUS_SCORE).sum())
+    }
+
+
+def risk_return(filtered_opportunities, analytics_engine=None):
+    """
+    Score investment risk for the filtered opportunities.
+
+    Args:
+        filtered_opportunities: Output of filter_opportunities
+        analytics_engine: Optional AIMarketAnalytics instance
+
+    Returns:
+        Opportunities with Risk_Score and Risk_Level columns
+    """
+    return _engine(analytics_engine).calculate_investment_risk_score(filtered_opportunities)
+
+
+@traced('service.opportunity_scores')
+def opportunity_scores(opportunities_df, analytics_engine=None, random_state=None):
+    """
+    Score every opportunity for risk and overall attractiveness.
+
+    Args:
+        opportunities_df: Opportunities data (filtered or not)
+        analytics_engine: Optional AIMarketAnalytics instance
+        random_state: Optional generator for the risk scores (see
+            AIMarketAnalytics.risk_random_state for scoring appended rows)
+
+    Returns:
+        Opportunities with Risk_Score, Risk_Level and Opportunity_Score columns
+    """
+    engine = _engine(analytics_engine)
+    scored = engine.calculate_investment_risk_score(opportunities_df, random_state)
+    return scored.assign(Opportunity_Score=engine.calculate_opportunity_scores(scored))
+
+
+def portfolio(opportunities_with_risk, risk_tolerance='medium', investment_amount=1000000, analytics_engine=None):
+    """
+    Build the recommended portfolio allocation.
+
+    Args:
+        opportunities_with_risk: Output of risk_return
+        risk_tolerance: 'low', 'medium' or 'high'
+        investment_amount: Total investment amount in USD
+        analytics_engine: Optional AIMarketAnalytics instance
+
+    Returns:
+        Portfolio allocation DataFrame
+    """
+    return _engine(analytics_engine).generate_portfolio_recommendations(
+        opportunities_with_risk,
+        risk_tolerance.lower(),
+        investment_amount
+    )
+
+
+# --- Regional Intelligence ---
+
+@traced('service.filter_regions')
+def filter_regions(regional_df, regions):
+    """Keep the selected regions."""
+    return regional_df[regional_df['Region'].isin(regions)]
+
+
+def regional_metrics(filtered_regional):
+    """
+    Compute the tab3 metric row.
+
+    Args:
+        filtered_regional: Output of filter_regions
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    return {
+        'total_investment_billion': filtered_regional['Investment_Billion'].sum(),
+        'avg_growth_rate': filtered_regional['Growth_Rate'].mean(),
+        'combined_market_share': filtered_regional['Market_Share_Percent'].sum(),
+        'region_count': len(filtered_regional)
+    }
+
+
+# --- Workforce Impact ---
+
+def workforce_metrics(workforce_df):
+    """
+    Compute the tab4 metric row.
+
+    Args:
+        workforce_df: Workforce impact data
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    exposure = workforce_df['AI_Exposure_Level']
+    return {
+        'high_exposure_jobs': int(exposure.isin(['High', 'Very High']).sum()),
+        'total_jobs': len(workforce_df),
+        'avg_transformation': workforce_df['Job_Transformation'].mean(),
+        'high_reskill_priority': int((workforce_df['Reskilling_Priority'] >= 8.0).sum()),
+        'very_high_exposure': int((exposure == 'Very High').sum())
+    }
+
+
+def exposure_counts(workforce_df):
+    """Return job category counts per AI exposure level."""
+    return workforce_df['AI_Exposure_Level'].value_counts()
+
+
+# --- Strategic Insights ---
+
+def top_industries(industry_df, n=5):
+    """Return the ``n`` industries with the highest adoption rate."""
+    return industry_df.nlargest(n, 'Adoption_Rate')
+
+
+def market_insights(trends_df, opportunities_df):
+    """Return the strategic insights dictionary."""
+    return generate_market_insights(trends_df, opportunities_df)
+
+
+# --- Batch Entry Point ---
+
+def run_dashboard_analysis(tables, horizon="All", min_impact=1.0, min_investment=1.0, market_size="All",
+                           regions=None, risk_tolerance='medium', investment_amount=1000000,
+                           analytics_engine=None):
+    """
+    Run every tab computation for one set of filter values.
+
+    Args:
+        tables: Output of load_datasets
+        horizon: Trend time horizon filter
+        min_impact: Minimum trend Impact_Score
+        min_investment: Minimum opportunity Investment_Focus_Score
+        market_size: Opportunity market size filter
+        regions: Regions to analyze (defaults to DEFAULT_REGIONS)
+        risk_tolerance: Portfolio risk tolerance
+        investment_amount: Portfolio size in USD
+        analytics_engine: Optional AIMarketAnalytics instance
+
+    Returns:
+        Dictionary of DataFrames and metric dictionaries per tab
+    """
+    regions = DEFAULT_REGIONS if regions is None else regions
+
+    filtered_trends = filter_trends(tables['trends'], horizon, min_impact)
+    filtered_opportunities = filter_opportunities(tables['opportunities'], min_investment, market_size)
+    opportunities_with_risk = risk_return(filtered_opportunities, analytics_engine)
+    filtered_regional = filter_regions(tables['regional'], regions)
+
+    return {
+        'trends': {
+            'filtered': filtered_trends,
+            'metrics': trend_metrics(filtered_trends, tables['trends']),
+            'top': top_trends(filtered_trends)
+        },
+        'opportunities': {
+            'filtered': filtered_opportunities,
+            'metrics': opportunity_metrics(filtered_opportunities, tables['opportunities']),
+            'risk_return': opportunities_with_risk,
+            'portfolio': portfolio(opportunities_with_risk, risk_tolerance, investment_amount, analytics_engine)
+        },
+        'regional': {
+            'filtered': filtered_regional,
+            'metrics': regional_metrics(filtered_regional)
+        },
+        'workforce': {
+            'metrics': workforce_metrics(tables['workforce']),
+            'exposure_counts': exposure_counts(tables['workforce'])
+        },
+        'industry': {
+            'top': top_industries(tables['industry'])
+        },
+        'insights': market_insights(tables['trends'], tables['opportunities'])
+    }
+
+
+def to_serializable(value):
+    """Convert analysis results into JSON-friendly Python objects."""
+    if isinstance(value, pd.DataFrame):
+        # float32 columns go through their shortest repr so 8.8 stays 8.8 in JSON
+        float32_columns = value.columns[value.dtypes == np.float32]
+        if len(float32_columns):
+            value = value.astype({column: str for column in float32_columns}).astype(
+                {column: 'float64' for column in float32_columns})
+        return json.loads(value.to_json(orient='records'))
+    if isinstance(value, pd.Series):
+        return json.loads(value.to_json())
+    if isinstance(value, dict):
+        return {key: to_serializable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_serializable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.float32):
+        return float(str(value))
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the dashboard analytics without Streamlit")
+    parser.add_argument('--horizon', default="All", choices=TIME_HORIZONS)
+    parser.add_argument('--min-impact', type=float, default=1.0)
+    parser.add_argument('--min-investment', type=float, default=1.0)
+    parser.add_argument('--market-size', default="All", choices=MARKET_SIZE_FILTERS)
+    parser.add_argument('--regions', nargs='*', default=DEFAULT_REGIONS)
+    parser.add_argument('--risk-tolerance', default='medium', choices=['low', 'medium', 'high'])
+    parser.add_argument('--output', help='Write results as JSON to this path (default: stdout)')
+    parser.add_argument('--memory-report', action='store_true', help='Print memory used per table and exit')
+    parser.add_argument('--trace', help='Write a timing trace of the run to this path')
+    parser.add_argument('--trace-format', default='chrome', choices=TRACE_FORMATS)
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    if args.memory_report:
+        print(memory_report(load_datasets()).to_string(index=False))
+        return
+
+    trace = start_trace('analysis', horizon=args.horizon, risk_tolerance=args.risk_tolerance) if args.trace else None
+    results = run_dashboard_analysis(
+        load_datasets(),
+        horizon=args.horizon,
+        min_impact=args.min_impact,
+        min_investment=args.min_investment,
+        market_size=args.market_size,
+        regions=args.regions,
+        risk_tolerance=args.risk_tolerance
+    )
+    if trace is not None:
+        export_trace(finish_trace(trace), args.trace, args.trace_format)
+    payload = json.dumps(to_serializable(results), indent=2, default=str)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+HTTP API for AI Opportunity Map
+===============================
+
+Minimal ASGI application that serves analytics results to other services
+without going through the dashboard:
+- CPU-bound work (risk scoring, clustering, portfolio generation) runs in a
+  thread or process pool so the event loop keeps accepting requests
+- Identical concurrent requests are coalesced onto one in-flight computation
+- Responses are JSON, or Arrow IPC streams for tabular results when the
+  client sends ``Accept: application/vnd.apache.arrow.stream`` or ``?format=arrow``
+
+Endpoints (all GET):
+    /health
+    /metrics                Prometheus text format (see metrics.py)
+    /opportunities/scores   min_investment, market_size
+    /portfolio              risk_tolerance, amount, min_investment, market_size
+    /clusters               -
+    /insights               -
+    /forecast               series (comma-separated values), periods
+
+Run locally (uvicorn is optional and not required by the dashboard):
+    uvicorn api_server:app --port 8000
+    python api_server.py --port 8000
+
+Configuration:
+    AI_MAP_API_EXECUTOR   'thread' (default) or 'process'
+    AI_MAP_API_WORKERS    Pool size (default: CPU count)
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import pandas as pd
+
+import analytics_service as service
+import metrics
+from dataset_store import get_store
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+def _tables():
+    """Datasets from the shared-memory store, attached once per worker process."""
+    return get_store().tables
+
+
+# --- Endpoint computations (top-level so process pools can pickle them) ---
+
+def _scored_opportunities(params):
+    """Filter the store's precomputed opportunity scores (scored once when the store was built)."""
+    return service.filter_opportunities(
+        _tables()['opportunity_scores'],
+        float(params.get('min_investment', 1.0)),
+        params.get('market_size', 'All')
+    )
+
+
+def _opportunity_scores(params):
+    return _scored_opportunities(params)
+
+
+def _portfolio(params):
+    risk_tolerance = params.get('risk_tolerance', 'medium').lower()
+    if risk_tolerance not in ('low', 'medium', 'high'):
+        raise ValueError("risk_tolerance must be low, medium or high")
+    return service.portfolio(_scored_opportunities(params), risk_tolerance, float(params.get('amount', 1000000)))
+
+
+def _clusters(params):
+    clustered_trends, _ = service._engine(None).perform_trend_clustering(_tables()['trends'])
+    return clustered_trends[['Trend', 'Impact_Score', 'Market_Size_Billion', 'Adoption_Rate', 'Cluster', 'Cluster_Name']]
+
+
+def _insights(params):
+    tables = _tables()
+    return service.market_insights(tables['trends'], tables['opportunities'])
+
+
+def _forecast(params):
+    if 'series' not in params:
+        raise ValueError("series is required, e.g. series=638,720,810")
+    series = [float(value) for value in params['series'].split(',')]
+    if not all(math.isfinite(value) for value in series):
+        raise ValueError("series values must be finite numbers")
+    if len(series) < 3:
+        raise ValueError("series needs at least 3 values")
+    forecast = service._engine(None).predict_market_growth(series, int(params.get('periods', 12)))
+    return service.to_serializable(forecast)
+
+
+ROUTES = {
+    '/opportunities/scores': _opportunity_scores,
+    '/portfolio': _portfolio,
+    '/clusters': _clusters,
+    '/insights': _insights,
+    '/forecast': _forecast,
+}
+
+
+def compute(path, params):
+    """
+    Run one endpoint computation synchronously.
+
+    Args:
+        path: Route path from ROUTES
+        params: Dictionary of query parameters
+
+    Returns:
+        DataFrame or JSON-serializable dictionary
+    """
+    return ROUTES[path](params)
+
+
+class AnalyticsAPI:
+    """ASGI application over the headless analytics service."""
+
+    def __init__(self, executor=None):
+        """
+        Args:
+            executor: concurrent.futures executor; built from the environment when omitted
+        """
+        self._executor = executor
+        self._inflight = {}
+        self.coalesced_requests = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            workers = int(os.environ.get('AI_MAP_API_WORKERS', os.cpu_count() or 2))
+            if os.environ.get('AI_MAP_API_EXECUTOR', 'thread') == 'process':
+                # Publish the store from this process so workers only attach to it
+                get_store()
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analytics-api')
+        return self._executor
+
+    async def run(self, path, params):
+        """
+        Compute an endpoint result, sharing it with identical in-flight requests.
+
+        Args:
+            path: Route path
+            params: Dictionary of query parameters
+
+        Returns:
+            Endpoint result
+        """
+        key = (path, tuple(sorted(params.items())))
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_requests += 1
+            metrics.API_REQUESTS.labels(path=path, outcome='coalesced').inc()
+            return await asyncio.shield(task)
+
+        metrics.API_REQUESTS.labels(path=path, outcome='computed').inc()
+
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(loop.run_in_executor(self.executor, compute, path, params))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: a cancelled client must not cancel the result other callers wait on
+        return await asyncio.shield(task)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        # This process serves /metrics, so collect span timings from the first request
+        # (not at import, which process-pool workers also do)
+        metrics.enable_collection()
+
+        if scope['method'] != 'GET':
+            await self._send_json(send, 405, {'error': 'Only GET is supported'})
+            return
+
+        path = scope['path'].rstrip('/') or '/'
+        params = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        wants_arrow = params.pop('format', None) == 'arrow' or ARROW_MEDIA_TYPE in _header(scope, b'accept')
+
+        if path == '/health':
+            await self._send_json(send, 200, {'status': 'ok', 'routes': sorted(ROUTES)})
+            return
+        if path == '/metrics':
+            await self._send(send, 200, metrics.CONTENT_TYPE, metrics.render().encode('utf-8'))
+            return
+        if path not in ROUTES:
+            await self._send_json(send, 404, {'error': f'Unknown endpoint: {path}'})
+            return
+
+        try:
+            result = await self.run(path, params)
+        except (ValueError, KeyError) as error:
+            metrics.API_REQUESTS.labels(path=path, outcome='error').inc()
+            await self._send_json(send, 400, {'error': str(error)})
+            return
+
+        if wants_arrow:
+            if not isinstance(result, pd.DataFrame):
+                await self._send_json(send, 406, {'error': 'Arrow responses are only available for tabular endpoints'})
+                return
+            try:
+                body = dataframe_to_arrow(result)
+            except ImportError:
+                await self._send_json(send, 406, {'error': 'pyarrow is not installed'})
+                return
+            await self._send(send, 200, ARROW_MEDIA_TYPE, body)
+            return
+
+        await self._send_json(send, 200, service.to_serializable(result))
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _send_json(self, send, status, payload):
+        try:
+            body = json.dumps(payload, default=str, allow_nan=False)
+        except ValueError:
+            # NaN and Infinity are not valid JSON; fail loudly instead of sending them
+            status, body = 500, json.dumps({'error': 'Result contains non-finite numbers'})
+        await self._send(send, status, 'application/json', body.encode('utf-8'))
+
+    async def _send(self, send, status, content_type, body):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', content_type.encode('latin-1')),
+                (b'content-length', str(len(body)).encode('latin-1')),
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def _header(scope, name):
+    """Return a request header value as text ('' when missing)."""
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def dataframe_to_arrow(df):
+    """
+    Serialize a DataFrame as an Arrow IPC stream.
+
+    Args:
+        df: DataFrame to serialize
+
+    Returns:
+        Bytes of the IPC stream
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+app = AnalyticsAPI()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve AI Opportunity Map analytics over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is required to run the API server: pip install uvicorn")
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,11 +10,6 @@ warnings.filterwarnings('ignore')
 
 # Import our enhanced data sources and analytics
 from data_sources import (
-    load_comprehensive_trend_data,
-    load_comprehensive_opportunity_data,
-    load_regional_market_data,
-    load_industry_adoption_data,
-    load_workforce_impact_data,
     AI_MARKET_DATA,
     RESEARCH_SOURCES,
     get_data_freshness
@@ -22,7 +17,36 @@ from data_sources import (
 from advanced_analytics import (
     AIMarketAnalytics,
     create_advanced_visualizations,
-    generate_market_insights
+    create_cluster_drilldown,
+    CLUSTER_VIEWS,
+    OPPORTUNITY_SCORE_WEIGHTS,
+    GROWTH_RATE_CAP,
+    extend_clusters
+)
+from sensitivity import build_sensitivity, scenario_ranking, WEIGHT_NAMES
+from filter_cube import cube_from_stats, trend_cube_metrics, opportunity_cube_metrics, cube_frame
+from running_stats import RunningStats, trend_metric_row, opportunity_metric_row
+import analytics_service as service
+from analytics_executor import AnalyticsExecutor
+from dataset_store import get_store, get_text_store
+from ingestion import start_from_environment
+from chart_rendering import (
+    large_scatter,
+    compact_figure,
+    figure_payload_bytes,
+    LARGE_DATA_THRESHOLD,
+    DOWNSAMPLING_METHODS
+)
+from theme import inject_theme
+from instrumentation import begin_rerun, end_rerun, span, trace_json
+from metrics import cache_metrics, serve_metrics, metrics_served, FIGURE_PAYLOAD_BYTES
+from ui_components import (
+    render_cards,
+    OptionIndex,
+    searchable_select,
+    TREND_CARD,
+    PORTFOLIO_CARD,
+    REGION_CARD
 )
 
 # --- Configuration & Enhanced Setup ---
@@ -33,6 +57,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Row selections share column buffers with the shared tables (pandas 2 opts in)
+service.enable_copy_on_write()
+
+# Every rerun is recorded as one trace of timing spans (see instrumentation.py);
+# ?profile=<call sites>&profiler=sampling captures profiles on this session's reruns,
+# honoured only where profiling is enabled (AI_MAP_PROFILE or AI_MAP_PROFILING=1)
+rerun = begin_rerun(st.query_params.get('profile'), st.query_params.get('profiler'))
+rerun_trace = rerun.trace
+
+# Prometheus metrics on AI_MAP_METRICS_PORT, when configured (see metrics.py)
+serve_metrics()
+
 # Set Plotly defaults for Porcelain Graphite (light luxury) theme
 px.defaults.template = "plotly_white"
 px.defaults.color_discrete_sequence = ["#2B2F36", "#BFA06A", "#2EC4B6", "#64748B", "#B45309", "#1F7A5C"]
@@ -43,455 +79,83 @@ px.defaults.color_discrete_sequence = ["#2B2F36", "#BFA06A", "#2EC4B6", "#64748B
 def get_analytics_engine():
     return AIMarketAnalytics()
 
-# Enhanced data loading with caching for performance
-@st.cache_data
+# Process pool for heavy analytics, shared by all sessions
+@st.cache_resource
+def get_analytics_executor():
+    return AnalyticsExecutor()
+
+# Cluster once per dataset so the 3D view and its drill-down share one KMeans fit;
+# streamed trends are labelled from its centroids (see clustered_trends_for)
+@cache_metrics('get_clustered_trends', st.cache_data)
+def get_clustered_trends(trends_df):
+    clustered_trends, _ = get_analytics_engine().perform_trend_clustering(trends_df)
+    return clustered_trends
+
+# Score tensor over the weight grid, built once per opportunity selection and
+# shared by all sessions (cache_resource avoids copying it on every rerun)
+@cache_metrics('get_score_sensitivity', st.cache_resource)
+def get_score_sensitivity(opportunities_df):
+    return build_sensitivity(opportunities_df)
+
+# Sorted prefix sums of the filter columns, built once per base dataset and
+# kept current with streamed rows through sync (see table_stats)
+@cache_metrics('get_running_stats', st.cache_resource)
+def get_running_stats(base_version, table, _df):
+    return RunningStats(_df, table)
+
+# Counts and sums for every sidebar filter combination, built once per dataset version
+@cache_metrics('get_filter_cube', st.cache_resource)
+def get_filter_cube(dataset_version, table, _stats):
+    return cube_from_stats(_stats)
+
+def table_stats(data, table):
+    """Running statistics of a table, including rows streamed in since the store was built."""
+    base_rows = data['base_rows'][table]
+    stats = get_running_stats(data['base_version'], table, data[table].iloc[:base_rows])
+    stats.sync(data[table])
+    return stats
+
+def clustered_trends_for(data):
+    """Clustered trends: one KMeans fit of the base trends, streamed trends by nearest centroid."""
+    base_trends = data['trends'].iloc[:data['base_rows']['trends']]
+    return extend_clusters(get_clustered_trends(base_trends), data['trends'])
+
+# Labels and search matches for a detail selector, built once per dataset version
+@cache_metrics('get_option_index', st.cache_resource)
+def get_option_index(dataset_version, table, _names):
+    return OptionIndex(_names)
+
+# Tables live in a shared-memory store attached zero-copy by every session and process
+@st.cache_resource
+def get_dataset_store():
+    return get_store()
+
+# Tails AI_MAP_INGEST_FILE into the store when it is set (one poller per process)
+@st.cache_resource
+def get_ingestor():
+    return start_from_environment(get_dataset_store())
+
 def load_all_data():
-    """Load all comprehensive datasets with caching."""
+    """Collect the shared tables and dashboard metadata for this rerun."""
+    store = get_dataset_store()
+    get_ingestor()
+    tables, version = store.snapshot()
     return {
-        'trends': load_comprehensive_trend_data(),
-        'opportunities': load_comprehensive_opportunity_data(),
-        'regional': load_regional_market_data(),
-        'industry': load_industry_adoption_data(),
-        'workforce': load_workforce_impact_data(),
+        **tables,
+        'version': version,
+        'base_version': store.base_version,
+        'base_rows': store.base_rows,
         'market_data': AI_MARKET_DATA,
         'sources': RESEARCH_SOURCES,
         'freshness': get_data_freshness()
     }
 
-# Enhanced Custom CSS for modern styling
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&family=JetBrains+Mono:wght@400;500&display=swap');
-
-
-    :root {
-        --bg: #F5F6F8;
-        --surface: #FFFFFF;
-        --card: #FFFFFF;
-        --text: #2B2F36; /* Graphite */
-        --muted: #6B7280;
-        --primary: #2B2F36; /* Graphite as primary */
-        --accent: #BFA06A; /* Subtle gold accent */
-        --radius: 14px;
-        --border: #E5E7EB;
-        --shadow-1: 0 1px 2px rgba(17,24,39,0.06), 0 1px 3px rgba(17,24,39,0.10);
-        --shadow-2: 0 8px 24px rgba(17,24,39,0.08);
-    }
-
-    *:focus-visible { outline: 2px solid var(--accent); outline-offset: 2px; border-radius: 6px; }
-
-    @media (prefers-reduced-motion: reduce) {
-        * { animation: none !important; transition: none !important; }
-    }
-
-    .stApp {
-        font-family: 'Inter', sans-serif;
-        color: var(--text);
-        background: var(--bg);
-    }
-
-
-    /* Ensure high-contrast text across the app and sidebar */
-    .stApp p, .stApp li, .stApp span, .stApp label,
-    .stApp h1, .stApp h2, .stApp h3, .stApp h4, .stApp h5, .stApp h6 {
-        color: var(--text) !important;
-    }
-    section[data-testid="stSidebar"] * { color: var(--text) !important; }
-    .stMarkdown, .stMarkdown p, .stMarkdown li { color: var(--text) !important; }
-    /* Inputs/dropdowns */
-    [data-baseweb="select"] * { color: var(--text) !important; }
-    [data-baseweb="input"] input { color: var(--text) !important; }
-
-    /* Streamlit metric component: force readable values/labels */
-    [data-testid="stMetricValue"] { color: var(--text) !important; text-shadow: none !important; }
-    [data-testid="stMetricLabel"] { color: var(--muted) !important; }
-    [data-testid="stMetricDelta"] { font-weight: 600; }
-
-    /* BaseWeb selects/inputs: ensure light surfaces */
-    .stApp [data-baseweb="select"] { background: var(--surface) !important; }
-    .stApp [data-baseweb="select"] * { color: var(--text) !important; }
-    .stApp [data-baseweb="select"] > div { background: var(--surface) !important; border: 1px solid var(--border) !important; }
-    .stApp [data-baseweb="input"] input, .stApp textarea { background: var(--surface) !important; color: var(--text) !important; border: 1px solid var(--border) !important; }
-
-    /* Multiselect/Tag chips: light surface + dark text */
-    .stApp div[data-baseweb="tag"] {
-        background: var(--surface) !important;
-        color: var(--text) !important;
-        border: 1px solid var(--border) !important;
-    }
-    .stApp div[data-baseweb="tag"] svg { fill: var(--muted) !important; }
-
-    /* Selected values inside select input */
-    .stApp div[data-baseweb="select"] div[role="listbox"] * { color: var(--text) !important; }
-
-    /* Stronger overrides for select + multiselect visual tokens */
-    section[data-testid="stSidebar"] [data-baseweb="select"],
-    .stApp [data-baseweb="select"] {
-        background: var(--surface) !important;
-        border-color: var(--border) !important;
-    }
-    .stApp [data-baseweb="select"] svg { fill: var(--text) !important; }
-    .stApp [data-baseweb="select"] [role="option"][aria-selected="true"] {
-        background: rgba(191,160,106,0.12) !important;
-        color: var(--text) !important;
-    }
-
-    .stApp [data-baseweb="tag"],
-    section[data-testid="stSidebar"] [data-baseweb="tag"] {
-        background: var(--surface) !important;
-        color: var(--text) !important;
-        border: 1px solid var(--border) !important;
-    }
-    .stApp [data-baseweb="tag"] * { color: var(--text) !important; }
-    .stApp [data-baseweb="tag"] svg { fill: var(--muted) !important; }
-
-
-
-
-    .main-header {
-        font-size: 3rem;
-        font-weight: 800;
-        color: var(--text);
-        text-align: center;
-        margin-bottom: 1.5rem;
-        letter-spacing: -0.02em;
-    }
-
-    .metric-card {
-        background: var(--card);
-        padding: 1.25rem;
-        border-radius: var(--radius);
-        color: var(--text);
-        text-align: center;
-        margin: 0.5rem 0;
-        box-shadow: var(--shadow-1);
-        border: 1px solid var(--border);
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-        position: relative;
-        overflow: hidden;
-        min-height: 160px;
-        display: flex;
-        flex-direction: column;
-        justify-content: center;
-        align-items: center;
-        gap: 0.35rem;
-    }
-
-    .metric-card::before { display: none; }
-
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-2);
-    }
-
-    .metric-card h3 {
-        font-size: 3rem;
-        font-weight: 800;
-        margin: 0;
-        text-shadow: none;
-        color: var(--text);
-        font-family: 'JetBrains Mono', monospace;
-        line-height: 1;
-        white-space: nowrap;
-    }
-
-    .metric-card p {
-        font-size: 1rem;
-        font-weight: 600;
-        margin: 0.5rem 0 0 0;
-        opacity: 0.95;
-        letter-spacing: 0.5px;
-    }
-
-    .trend-card {
-        background: var(--card);
-        border-left: 4px solid var(--accent);
-        padding: 1.25rem;
-        margin: 1rem 0;
-        border-radius: var(--radius);
-        box-shadow: var(--shadow-1);
-        border: 1px solid var(--border);
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-        position: relative;
-        overflow: hidden;
-    }
-
-    .trend-card:hover {
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-2);
-        border-left-color: var(--accent);
-    }
-
-    .opportunity-highlight {
-        background: var(--card);
-        color: var(--text);
-        padding: 1.25rem;
-        border-radius: var(--radius);
-        margin: 1rem 0;
-        box-shadow: var(--shadow-1);
-        border: 1px solid var(--border);
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-        position: relative;
-        overflow: hidden;
-    }
-
-    .opportunity-highlight::before { content: ''; }
-
-    .opportunity-highlight:hover {
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-2);
-    }
-
-    .feature-highlight {
-        background: var(--surface);
-        padding: 1.25rem;
-
-    /* Ensure selectbox text is visible even when the dropdown control is dark */
-    div[data-baseweb="select"] div, div[data-baseweb="select"] span {
-        color: var(--text) !important;
-    }
-    div[data-baseweb="select"] svg { fill: var(--text) !important; }
-
-    /* Stronger contrast for secondary body text */
-    .stApp small, .stApp .small, .stApp .muted { color: var(--muted) !important; opacity: 1 !important; }
-
-        border-radius: var(--radius);
-        border: 1px solid var(--border);
-        margin: 1rem 0;
-        transition: box-shadow 0.2s ease;
-    }
-
-    .feature-highlight:hover {
-        box-shadow: var(--shadow-2);
-    }
-
-    .insight-card {
-        background: var(--surface);
-        padding: 1.25rem;
-        border-radius: var(--radius);
-        margin: 1rem 0;
-        box-shadow: var(--shadow-1);
-        border: 1px solid var(--border);
-        transition: transform 0.2s ease, box-shadow 0.2s ease;
-        position: relative;
-    }
-
-    .insight-card::before { content: ''; }
-
-    /* Improve default tab readability */
-    .stTabs [role="tab"] { color: var(--text) !important; opacity: 0.9; }
-    .stTabs [aria-selected="true"] { opacity: 1; }
-
-    /* Ensure alerts/info text is readable */
-    .stApp div[role="alert"], section[data-testid="stSidebar"] div[role="alert"] {
-        color: var(--text) !important;
-        background: rgba(191, 160, 106, 0.06) !important; /* subtle accent tint */
-        border: 1px solid var(--border) !important;
-    }
-
-    /* Sidebar control labels */
-    section[data-testid="stSidebar"] label { color: var(--text) !important; font-weight: 600; }
-
-
-    .insight-card:hover {
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-2);
-    }
-
-    /* Sidebar */
-    section[data-testid="stSidebar"] {
-        background: var(--surface);
-        border-right: 1px solid var(--border);
-    }
-
-    /* Tabs */
-    .stTabs [role="tablist"] {
-        gap: 8px;
-        background: transparent;
-        padding: 4px;
-    }
-
-    .stTabs [role="tab"] {
-        border-radius: 12px;
-        padding: 10px 18px;
-        font-weight: 600;
-        transition: background 0.2s ease, color 0.2s ease;
-        color: var(--muted);
-    }
-
-    .stTabs [aria-selected="true"] {
-        background: var(--surface);
-        color: var(--text) !important;
-        box-shadow: var(--shadow-1);
-        border: 1px solid var(--border);
-    }
-
-    /* Buttons */
-    .stButton > button {
-        background: var(--accent) !important;
-        color: #1f2937 !important;
-        border: 1px solid var(--accent) !important;
-        border-radius: 12px !important;
-        padding: 10px 18px !important;
-        font-weight: 700 !important;
-        transition: transform 0.2s ease, box-shadow 0.2s ease !important;
-        box-shadow: var(--shadow-1) !important;
-    }
-    section[data-testid="stSidebar"] .stButton > button {
-        width: 100% !important;
-        background: var(--accent) !important;
-        color: #1f2937 !important;
-        border: 1px solid var(--accent) !important;
-    }
-    section[data-testid="stSidebar"] .stButton > button:hover {
-        filter: brightness(0.95) !important;
-    }
-
-    .stButton > button:hover {
-        transform: translateY(-1px);
-        box-shadow: var(--shadow-2);
-    }
-
-    /* Loading animation */
-    @keyframes pulse {
-        0% { opacity: 1; }
-        50% { opacity: 0.5; }
-        100% { opacity: 1; }
-    }
-
-    .loading {
-        animation: pulse 1.5s ease-in-out infinite;
-    }
-
-    /* Enhanced metric animations */
-    .metric-value {
-        display: inline-block;
-        animation: countUp 2s ease-out;
-    }
-
-    @keyframes countUp {
-        from { transform: scale(0.5); opacity: 0; }
-        to { transform: scale(1); opacity: 1; }
-    }
-
-    /* Main content surface */
-    .main .block-container {
-        background: var(--surface);
-        border-radius: var(--radius);
-        border: 1px solid var(--border);
-        margin-top: 1rem;
-        padding: 1.25rem 1.25rem 2rem;
-        box-shadow: var(--shadow-1);
-    }
-
-    /* Enhanced scrollbar */
-    ::-webkit-scrollbar {
-        width: 8px;
-    }
-
-    ::-webkit-scrollbar-track {
-        background: rgba(255, 255, 255, 0.1);
-        border-radius: 4px;
-    }
-
-    ::-webkit-scrollbar-thumb {
-        background: var(--border);
-        border-radius: 4px;
-    }
-
-    ::-webkit-scrollbar-thumb:hover {
-        background: var(--muted);
-    }
-
-    /* Floating Action Button */
-    .floating-btn {
-        position: fixed;
-        bottom: 30px;
-        right: 30px;
-        width: 60px;
-        height: 60px;
-        background: var(--text);
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: white;
-        font-size: 1.5rem;
-        box-shadow: var(--shadow-2);
-        cursor: pointer;
-        transition: all 0.3s ease;
-        z-index: 1000;
-        animation: float 3s ease-in-out infinite;
-    }
-
-    .floating-btn:hover {
-        transform: scale(1.1);
-        box-shadow: var(--shadow-2);
-    }
-
-    @keyframes float {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-10px); }
-    }
-
-    /* Progress indicators */
-    .progress-ring {
-        width: 60px;
-        height: 60px;
-        transform: rotate(-90deg);
-    }
-
-    .progress-ring-circle {
-        stroke: var(--accent);
-        stroke-width: 4;
-        fill: transparent;
-        stroke-dasharray: 188.5;
-        stroke-dashoffset: 188.5;
-        animation: progress 2s ease-in-out forwards;
-    }
-
-    @keyframes progress {
-        to {
-            stroke-dashoffset: 47.1;
-        }
-    }
-
-    /* Enhanced notification styles */
-    .notification {
-        position: fixed;
-        top: 20px;
-        right: 20px;
-        background: var(--text);
-        color: white;
-        padding: 1rem 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 8px 32px rgba(17, 153, 142, 0.4);
-        z-index: 1001;
-        animation: slideIn 0.5s ease-out;
-    }
-
-    @keyframes slideIn {
-        from { transform: translateX(100%); opacity: 0; }
-        to { transform: translateX(0); opacity: 1; }
-    }
-
-    /* Interactive hover effects for charts */
-    .plotly-graph-div {
-        border-radius: 16px;
-        overflow: hidden;
-        box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-        transition: all 0.3s ease;
-    }
-
-    .plotly-graph-div:hover {
-        transform: translateY(-4px);
-        box-shadow: 0 16px 48px rgba(0,0,0,0.15);
-    }
-</style>
-""", unsafe_allow_html=True)
+# Theme CSS is served from static/theme.css (see theme.py)
+inject_theme()
 
 # Load all data
-data = load_all_data()
+with span('store.tables'):
+    data = load_all_data()
 analytics_engine = get_analytics_engine()
 
 # --- Enhanced Dashboard Layout ---
@@ -628,6 +292,20 @@ st.sidebar.markdown("### Data Management")
 st.sidebar.info(f"Data Last Updated: {data['freshness']['data_vintage']}")
 st.sidebar.markdown("<small style='opacity:0.8'>2025.08 version</small>", unsafe_allow_html=True)
 
+ingestor = get_ingestor()
+if ingestor is not None:
+    ingest_status = ingestor.status()
+    appended_trends = ingest_status['appended']['trends']
+    appended_opportunities = ingest_status['appended']['opportunities']
+    st.sidebar.caption(
+        f"Streaming: +{appended_trends} trends, +{appended_opportunities} opportunities, "
+        f"{ingest_status['rejected']} rejected"
+    )
+    if ingest_status['errors']:
+        with st.sidebar.expander("Rejected rows"):
+            for error in ingest_status['errors'][-10:]:
+                st.caption(error)
+
 update_button = st.sidebar.button(
     "Refresh Analytics",
     help="Recalculate all analytics and refresh visualizations",
@@ -638,11 +316,9 @@ update_button = st.sidebar.button(
 st.sidebar.markdown("### Advanced Filters")
 
 # Time horizon filter with updated options
-time_horizons = ["All", "Currently Dominant (2025-2026)",
-                "Emerging & Growing (2025-2027)", "Future Outlook (2027-2030)"]
 selected_horizon = st.sidebar.selectbox(
     "Time Horizon Filter:",
-    time_horizons,
+    service.TIME_HORIZONS,
     help="Filter trends by their implementation timeline"
 )
 
@@ -659,7 +335,7 @@ min_impact = st.sidebar.slider(
 # Market size filter
 market_size_filter = st.sidebar.selectbox(
     "Market Size Filter:",
-    ["All", "Large Markets Only", "Medium Markets Only"],
+    service.MARKET_SIZE_FILTERS,
     help="Filter opportunities by market size"
 )
 
@@ -691,12 +367,154 @@ chart_theme = st.sidebar.selectbox(
     index=0
 )
 
+# Large-data rendering for scatter charts
+large_data_mode = st.sidebar.checkbox(
+    "Large-data rendering (WebGL)",
+    value=True,
+    help="Render big scatter charts with WebGL and downsample points above the threshold"
+)
+large_data_threshold = st.sidebar.number_input(
+    "Large-data threshold (points):",
+    min_value=500,
+    max_value=1000000,
+    value=LARGE_DATA_THRESHOLD,
+    step=500,
+    disabled=not large_data_mode
+)
+downsampling_method = st.sidebar.selectbox(
+    "Downsampling method:",
+    list(DOWNSAMPLING_METHODS),
+    format_func=lambda method: {'lttb': 'LTTB (shape preserving)', 'bin': 'Grid binning'}[method],
+    disabled=not large_data_mode
+)
+scatter_threshold = int(large_data_threshold) if large_data_mode else None
+background_analytics = st.sidebar.checkbox(
+    "Background analytics (process pool)",
+    value=False,
+    help="Cluster trends and build advanced charts in worker processes while the other tabs render"
+)
+show_payload_sizes = st.sidebar.checkbox(
+    "Show chart payload sizes",
+    value=False,
+    help="Measure the bytes each chart sends to the browser on this rerun"
+)
+show_performance = st.sidebar.checkbox(
+    "Show performance panel",
+    value=False,
+    help="Time loaders, analytics and chart builds on this rerun and export the trace"
+)
+
+# Bytes sent per chart on this rerun, filled in by show_chart
+chart_payloads = {}
+
+def show_chart(fig, name):
+    """Compact a figure, optionally record its payload size, and render it."""
+    with span(f"render.{name}"):
+        compact_figure(fig)
+        if show_payload_sizes or metrics_served():
+            chart_payloads[name] = figure_payload_bytes(fig)
+            FIGURE_PAYLOAD_BYTES.labels(chart=name).observe(chart_payloads[name])
+        st.plotly_chart(fig, use_container_width=True)
+
+# What-if view of the sidebar filters, read from the filter cube
+def show_filter_heatmap(cube, stats, selected_group, selected_threshold, axis_title, name):
+    """Heatmap of one cube statistic over every filter group and threshold, marking the current filters."""
+    label = st.radio("Metric:", list(stats), horizontal=True, key=f"{name}_heatmap_metric")
+    stat, mean = stats[label]
+    frame = cube_frame(cube, stat, mean)
+    fig = go.Figure(go.Heatmap(
+        z=frame.to_numpy(),
+        x=frame.columns,
+        y=[group.split('(')[0].strip() for group in frame.index],
+        colorscale='Viridis',
+        colorbar={'title': label},
+        hovertemplate=f"%{{y}}<br>{axis_title} %{{x:.1f}}<br>{label}: %{{z:,.2f}}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[selected_threshold],
+        y=[selected_group.split('(')[0].strip()],
+        mode='markers',
+        marker={'symbol': 'x', 'size': 14, 'color': 'white', 'line': {'width': 2, 'color': 'black'}},
+        name='Current filters',
+        hoverinfo='skip'
+    ))
+    fig.update_layout(
+        title=f"{label} by Filter Combination",
+        xaxis_title=axis_title,
+        template=chart_theme,
+        height=350,
+        showlegend=False
+    )
+    show_chart(fig, name)
+
+# Weight sliders rerun only this fragment; every position is read from the precomputed tensor
+@st.fragment
+def score_sensitivity_section(opportunities_df):
+    st.subheader("Opportunity Score Sensitivity")
+    sensitivity = get_score_sensitivity(opportunities_df)
+    summary = sensitivity['summary']
+
+    weight_labels = {'market': "Market Size", 'growth': "Growth", 'adoption': "Adoption", 'investment': "Investment Focus"}
+    weight_grid = sensitivity['weight_grid']
+    weights = {}
+    for column, name in zip(st.columns(len(WEIGHT_NAMES)), WEIGHT_NAMES):
+        with column:
+            weights[name] = st.slider(
+                f"{weight_labels[name]} Weight",
+                float(weight_grid[0]), float(weight_grid[-1]),
+                float(OPPORTUNITY_SCORE_WEIGHTS[name]), float(weight_grid[1] - weight_grid[0]),
+                key=f"sensitivity_{name}_weight"
+            )
+    growth_cap = st.select_slider(
+        "Growth Rate Cap (% CAGR):", options=list(sensitivity['growth_caps']), value=GROWTH_RATE_CAP,
+        key='sensitivity_growth_cap', help="Growth rates at or above the cap score fully"
+    )
+
+    if sum(weights.values()) == 0:
+        st.warning("Set at least one weight above zero.")
+        return
+
+    scenario = scenario_ranking(sensitivity, weights, growth_cap)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Scenarios Evaluated", f"{summary['scenarios']:,}")
+    with col2:
+        st.metric("Mean Rank Correlation", f"{summary['mean_spearman']:.2f}", f"min {summary['min_spearman']:.2f}")
+    with col3:
+        st.metric(f"Top-{summary['top_k']} Overlap", f"{summary['mean_top_k_overlap']:.0%}")
+    with col4:
+        st.metric(f"Top-{summary['top_k']} Unchanged", f"{summary['top_k_unchanged_share']:.0%}")
+    if summary['truncated']:
+        st.caption(f"Limited to the {summary['opportunities']} opportunities with the highest default scores.")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown("**Ranking Under Selected Weights**")
+        st.dataframe(
+            scenario.head(15).style.format({'Score': '{:.1f}', 'Rank_Change': '{:+d}'}),
+            hide_index=True, use_container_width=True
+        )
+    with col2:
+        stability = sensitivity['stability'].head(15)
+        fig_stability = px.bar(
+            stability,
+            x='Top_K_Share',
+            y=stability['Opportunity'].str.slice(0, 30),
+            orientation='h',
+            title=f"Share of Scenarios in the Top {summary['top_k']}",
+            labels={'Top_K_Share': 'Share of Scenarios', 'y': ''},
+            template=chart_theme,
+            height=450
+        )
+        fig_stability.update_layout(yaxis={'autorange': 'reversed'}, xaxis_tickformat='.0%')
+        show_chart(fig_stability, 'Score Sensitivity')
+
 # Regional focus
 st.sidebar.markdown("### Regional Analysis")
 selected_regions = st.sidebar.multiselect(
     "Focus Regions:",
     data['regional']['Region'].tolist(),
-    default=["North America", "Europe", "Asia-Pacific"],
+    default=service.DEFAULT_REGIONS,
     help="Select regions for focused analysis"
 )
 
@@ -712,8 +530,22 @@ if update_button:
         st.session_state.analytics_cache.clear()
         st.session_state.last_analytics_update = datetime.now()
         st.success("Analytics refreshed successfully!")
+        # st.rerun() ends this run here, so record it first
+        end_rerun(rerun)
         st.rerun()
 
+# Start heavy analytics before the tabs render; tab5 collects the result
+advanced_future = None
+if show_advanced_analytics and background_analytics:
+    advanced_future = get_analytics_executor().submit_visualizations(
+        data['trends'],
+        data['opportunities'],
+        base_rows=data['base_rows']['trends'],
+        scatter_threshold=scatter_threshold,
+        downsampling_method=downsampling_method,
+        cluster_view=st.session_state.get('cluster_view_radio', 'auto')
+    )
+
 # --- Enhanced Main Content Area with Advanced Tabs ---
 tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "Trend Analysis",
@@ -724,39 +556,43 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "Strategic Insights"
 ])
 
-with tab1:
+with tab1, span('tab.trend_analysis'):
     st.header("AI Industry Trend Analysis")
 
-    # Apply filters to trends data
-    filtered_trends = data['trends'].copy()
-
-    # Apply time horizon filter
-    if selected_horizon != "All":
-        filtered_trends = filtered_trends[filtered_trends['Time_Horizon'].str.contains(selected_horizon.split('(')[0].strip())]
-
-    # Apply impact score filter
-    filtered_trends = filtered_trends[filtered_trends['Impact_Score'] >= min_impact]
+    # Apply time horizon and impact score filters
+    filtered_trends = service.filter_trends(data['trends'], selected_horizon, min_impact)
 
     if len(filtered_trends) == 0:
         st.warning("No trends match the current filters. Please adjust your filter settings.")
     else:
         # Enhanced metrics row
+        trend_running_stats = table_stats(data, 'trends')
+        trend_cube = get_filter_cube(data['version'], 'trends', trend_running_stats)
+        trend_stats = trend_cube_metrics(trend_cube, selected_horizon, min_impact)
+        if trend_stats is None:
+            trend_stats = trend_metric_row(
+                trend_running_stats.cell(selected_horizon, min_impact), trend_running_stats.baseline()
+            )
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Trends Analyzed", len(filtered_trends), f"of {len(data['trends'])}")
+            st.metric("Trends Analyzed", trend_stats['count'], f"of {trend_stats['total_count']}")
 
         with col2:
-            avg_impact = filtered_trends['Impact_Score'].mean()
-            st.metric("Avg Impact Score", f"{avg_impact:.1f}", f"{avg_impact - data['trends']['Impact_Score'].mean():.1f}")
+            st.metric("Avg Impact Score", f"{trend_stats['avg_impact']:.1f}", f"{trend_stats['avg_impact_delta']:.1f}")
 
         with col3:
-            total_market = filtered_trends['Market_Size_Billion'].sum()
-            st.metric("Total Market Size", f"${total_market:.0f}B")
+            st.metric("Total Market Size", f"${trend_stats['total_market_billion']:.0f}B")
 
         with col4:
-            avg_adoption = filtered_trends['Adoption_Rate'].mean()
-            st.metric("Avg Adoption Rate", f"{avg_adoption:.0f}%")
+            st.metric("Avg Adoption Rate", f"{trend_stats['avg_adoption']:.0f}%")
+
+        with st.expander("Filter Sensitivity"):
+            show_filter_heatmap(
+                trend_cube,
+                {"Trends": ('count', False), "Avg Impact": ('impact', True), "Total Market ($B)": ('market_billion', False)},
+                selected_horizon, min_impact, "Minimum Impact Score", 'Trend Filter Sensitivity'
+            )
 
         st.markdown("---")
 
@@ -765,10 +601,12 @@ with tab1:
 
         with col1:
             # Main trends chart
-            fig_trends = px.scatter(
+            fig_trends = large_scatter(
                 filtered_trends,
                 x='Market_Size_Billion',
                 y='Impact_Score',
+                threshold=scatter_threshold,
+                method=downsampling_method,
                 size='Adoption_Rate',
                 color='Time_Horizon',
                 hover_name='Trend',
@@ -781,40 +619,33 @@ with tab1:
                 template=chart_theme,
                 height=500
             )
-            st.plotly_chart(fig_trends, use_container_width=True)
+            show_chart(fig_trends, 'Trend Bubble Chart')
 
         with col2:
             # Top trends by impact
-            top_trends = filtered_trends.nlargest(5, 'Impact_Score')
             st.subheader("Top Impact Trends")
-
-            for _, trend in top_trends.iterrows():
-                st.markdown(f"""
-                <div class="trend-card">
-                    <h4>{trend['Trend']}</h4>
-                    <p><strong>Impact:</strong> {trend['Impact_Score']:.1f}/10</p>
-                    <p><strong>Market:</strong> ${trend['Market_Size_Billion']:.0f}B</p>
-                    <p><strong>Adoption:</strong> {trend['Adoption_Rate']:.0f}%</p>
-                </div>
-                """, unsafe_allow_html=True)
+            render_cards(service.top_trends(filtered_trends), TREND_CARD)
 
         # Detailed trend analysis
         st.subheader("Detailed Trend Analysis")
-        selected_trend = st.selectbox(
+        selected_trend = searchable_select(
             "Select a trend for detailed analysis:",
-            filtered_trends['Trend'].tolist(),
-            key='trend_selectbox'
+            filtered_trends['Trend'],
+            key='trend_selectbox',
+            index=get_option_index(data['version'], 'trends', data['trends']['Trend'])
         )
 
-        if selected_trend:
-            trend_info = filtered_trends[filtered_trends['Trend'] == selected_trend].iloc[0]
+        if selected_trend is not None:
+            trend_info = filtered_trends.loc[selected_trend]
+            # Prose is fetched by row id only when a detail panel is shown
+            trend_text = get_text_store().lookup('trends', trend_info)
 
             col1, col2 = st.columns([2, 1])
 
             with col1:
                 st.markdown(f"**{trend_info['Trend']}**")
-                st.markdown(f"**Description:** {trend_info['Description']}")
-                st.markdown(f"**Key Players:** {trend_info['Key_Players']}")
+                st.markdown(f"**Description:** {trend_text['Description']}")
+                st.markdown(f"**Key Players:** {trend_text['Key_Players']}")
 
             with col2:
                 st.markdown("**Key Metrics:**")
@@ -823,39 +654,44 @@ with tab1:
                 st.metric("Adoption Rate", f"{trend_info['Adoption_Rate']:.0f}%")
                 st.markdown(f"**Timeline:** {trend_info['Time_Horizon']}")
 
-with tab2:
+with tab2, span('tab.opportunity_map'):
     st.header("AI Opportunity Landscape")
 
-    # Apply filters to opportunities data
-    filtered_opportunities = data['opportunities'].copy()
-    filtered_opportunities = filtered_opportunities[filtered_opportunities['Investment_Focus_Score'] >= min_investment]
-
-    # Apply market size filter
-    if market_size_filter == "Large Markets Only":
-        filtered_opportunities = filtered_opportunities[filtered_opportunities['Market_Size_2025'].str.contains('Large')]
-    elif market_size_filter == "Medium Markets Only":
-        filtered_opportunities = filtered_opportunities[filtered_opportunities['Market_Size_2025'].str.contains('Medium')]
+    # Apply investment focus and market size filters
+    filtered_opportunities = service.filter_opportunities(data['opportunities'], min_investment, market_size_filter)
 
     if len(filtered_opportunities) == 0:
         st.warning("No opportunities match the current filters. Please adjust your filter settings.")
     else:
         # Enhanced metrics
+        opportunity_running_stats = table_stats(data, 'opportunities')
+        opportunity_cube = get_filter_cube(data['version'], 'opportunities', opportunity_running_stats)
+        opportunity_stats = opportunity_cube_metrics(opportunity_cube, market_size_filter, min_investment)
+        if opportunity_stats is None:
+            opportunity_stats = opportunity_metric_row(
+                opportunity_running_stats.cell(market_size_filter, min_investment), opportunity_running_stats.baseline()
+            )
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Opportunities", len(filtered_opportunities), f"of {len(data['opportunities'])}")
+            st.metric("Opportunities", opportunity_stats['count'], f"of {opportunity_stats['total_count']}")
 
         with col2:
-            avg_focus = filtered_opportunities['Investment_Focus_Score'].mean()
-            st.metric("Avg Investment Focus", f"{avg_focus:.1f}")
+            st.metric("Avg Investment Focus", f"{opportunity_stats['avg_investment_focus']:.1f}")
 
         with col3:
-            avg_growth = filtered_opportunities['Growth_Rate_CAGR'].mean()
-            st.metric("Avg Growth Rate", f"{avg_growth:.1f}%")
+            st.metric("Avg Growth Rate", f"{opportunity_stats['avg_growth_rate']:.1f}%")
 
         with col4:
-            high_focus_count = len(filtered_opportunities[filtered_opportunities['Investment_Focus_Score'] >= 8])
-            st.metric("High-Focus Areas", high_focus_count)
+            st.metric("High-Focus Areas", opportunity_stats['high_focus_count'])
+
+        with st.expander("Filter Sensitivity"):
+            show_filter_heatmap(
+                opportunity_cube,
+                {"Opportunities": ('count', False), "Avg Growth Rate": ('growth_rate', True),
+                 "High-Focus Areas": ('high_focus', False)},
+                market_size_filter, min_investment, "Minimum Investment Focus", 'Opportunity Filter Sensitivity'
+            )
 
         st.markdown("---")
 
@@ -863,13 +699,15 @@ with tab2:
         col1, col2 = st.columns([2, 1])
 
         with col1:
-            # Risk vs Return analysis
-            opp_with_risk = analytics_engine.calculate_investment_risk_score(filtered_opportunities)
+            # Risk vs Return analysis from the scores computed once when the store was built
+            opp_with_risk = service.filter_opportunities(data['opportunity_scores'], min_investment, market_size_filter)
 
-            fig_risk_return = px.scatter(
+            fig_risk_return = large_scatter(
                 opp_with_risk,
                 x='Risk_Score',
                 y='Growth_Rate_CAGR',
+                threshold=scatter_threshold,
+                method=downsampling_method,
                 size='Investment_Focus_Score',
                 color='Risk_Level',
                 hover_name='Opportunity_Area',
@@ -879,46 +717,41 @@ with tab2:
                 template=chart_theme,
                 height=500
             )
-            st.plotly_chart(fig_risk_return, use_container_width=True)
+            show_chart(fig_risk_return, 'Risk vs Growth')
 
         with col2:
             # Portfolio recommendations
             st.subheader("Portfolio Recommendations")
-            portfolio = analytics_engine.generate_portfolio_recommendations(
-                opp_with_risk,
-                risk_tolerance.lower(),
-                1000000
-            )
+            portfolio = service.portfolio(opp_with_risk, risk_tolerance, 1000000, analytics_engine)
 
-            for _, allocation in portfolio.head(5).iterrows():
-                st.markdown(f"""
-                <div class="opportunity-highlight">
-                    <h4>{allocation['Opportunity'][:30]}...</h4>
-                    <p><strong>Allocation:</strong> {allocation['Allocation_Percent']:.1f}%</p>
-                    <p><strong>Expected Return:</strong> {allocation['Expected_Return']:.1f}%</p>
-                    <p><strong>Risk:</strong> {allocation['Risk_Level']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            top_allocations = portfolio.head(5)
+            if len(top_allocations) > 0:
+                top_allocations = top_allocations.assign(
+                    Opportunity_Label=top_allocations['Opportunity'].str.slice(0, 30) + '...'
+                )
+            render_cards(top_allocations, PORTFOLIO_CARD)
 
         # Detailed opportunity analysis
         st.subheader("Detailed Opportunity Analysis")
-        selected_opportunity = st.selectbox(
+        selected_opportunity = searchable_select(
             "Select an opportunity for detailed analysis:",
-            filtered_opportunities['Opportunity_Area'].tolist(),
-            key='opportunity_selectbox'
+            filtered_opportunities['Opportunity_Area'],
+            key='opportunity_selectbox',
+            index=get_option_index(data['version'], 'opportunities', data['opportunities']['Opportunity_Area'])
         )
 
-        if selected_opportunity:
-            opp_info = filtered_opportunities[filtered_opportunities['Opportunity_Area'] == selected_opportunity].iloc[0]
+        if selected_opportunity is not None:
+            opp_info = filtered_opportunities.loc[selected_opportunity]
+            opp_text = get_text_store().lookup('opportunities', opp_info)
 
             col1, col2 = st.columns([2, 1])
 
             with col1:
                 st.markdown(f"**{opp_info['Opportunity_Area']}**")
                 st.markdown(f"**Market Size:** {opp_info['Market_Size_2025']}")
-                st.markdown(f"**Key Challenges:** {opp_info['Key_Challenges']}")
-                st.markdown(f"**Success Factors:** {opp_info['Success_Factors']}")
-                st.markdown(f"**Related Trends:** {opp_info['Related_Trends']}")
+                st.markdown(f"**Key Challenges:** {opp_text['Key_Challenges']}")
+                st.markdown(f"**Success Factors:** {opp_text['Success_Factors']}")
+                st.markdown(f"**Related Trends:** {opp_text['Related_Trends']}")
 
             with col2:
                 st.markdown("**Key Metrics:**")
@@ -926,29 +759,30 @@ with tab2:
                 st.metric("Growth Rate (CAGR)", f"{opp_info['Growth_Rate_CAGR']:.1f}%")
                 st.metric("Maturity Level", opp_info['Maturity_Level'])
 
-with tab3:
+        st.markdown("---")
+        score_sensitivity_section(filtered_opportunities)
+
+with tab3, span('tab.regional_intelligence'):
     st.header("Regional AI Intelligence")
 
     # Filter regional data based on selection
-    filtered_regional = data['regional'][data['regional']['Region'].isin(selected_regions)]
+    filtered_regional = service.filter_regions(data['regional'], selected_regions)
 
     # Regional overview metrics
+    regional_stats = service.regional_metrics(filtered_regional)
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        total_investment = filtered_regional['Investment_Billion'].sum()
-        st.metric("Total Investment", f"${total_investment:.1f}B")
+        st.metric("Total Investment", f"${regional_stats['total_investment_billion']:.1f}B")
 
     with col2:
-        avg_growth = filtered_regional['Growth_Rate'].mean()
-        st.metric("Avg Growth Rate", f"{avg_growth:.1f}%")
+        st.metric("Avg Growth Rate", f"{regional_stats['avg_growth_rate']:.1f}%")
 
     with col3:
-        total_market_share = filtered_regional['Market_Share_Percent'].sum()
-        st.metric("Combined Market Share", f"{total_market_share:.1f}%")
+        st.metric("Combined Market Share", f"{regional_stats['combined_market_share']:.1f}%")
 
     with col4:
-        st.metric("Regions Analyzed", len(filtered_regional))
+        st.metric("Regions Analyzed", regional_stats['region_count'])
 
     st.markdown("---")
 
@@ -964,7 +798,7 @@ with tab3:
             title='AI Market Share by Region',
             template=chart_theme
         )
-        st.plotly_chart(fig_market_share, use_container_width=True)
+        show_chart(fig_market_share, 'Regional Market Share')
 
     with col2:
         # Investment vs Growth scatter
@@ -979,42 +813,30 @@ with tab3:
             labels={'Investment_Billion': 'Investment (Billions USD)', 'Growth_Rate': 'Growth Rate (%)'},
             template=chart_theme
         )
-        st.plotly_chart(fig_investment_growth, use_container_width=True)
+        show_chart(fig_investment_growth, 'Regional Investment vs Growth')
 
     # Regional focus areas
     st.subheader("Regional Focus Areas")
-    for _, region in filtered_regional.iterrows():
-        st.markdown(f"""
-        <div class="trend-card">
-            <h4>{region['Region']}</h4>
-            <p><strong>Market Share:</strong> {region['Market_Share_Percent']:.1f}%</p>
-            <p><strong>Investment:</strong> ${region['Investment_Billion']:.1f}B</p>
-            <p><strong>Growth Rate:</strong> {region['Growth_Rate']:.1f}%</p>
-            <p><strong>Key Focus Areas:</strong> {region['Key_Focus_Areas']}</p>
-        </div>
-        """, unsafe_allow_html=True)
+    render_cards(filtered_regional, REGION_CARD, page_size=10, key='region_card_page')
 
-with tab4:
+with tab4, span('tab.workforce_impact'):
     st.header("AI Workforce Impact Analysis")
 
     # Workforce impact metrics
+    workforce_stats = service.workforce_metrics(data['workforce'])
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        high_exposure_jobs = len(data['workforce'][data['workforce']['AI_Exposure_Level'].isin(['High', 'Very High'])])
-        st.metric("High AI Exposure Jobs", high_exposure_jobs, f"of {len(data['workforce'])}")
+        st.metric("High AI Exposure Jobs", workforce_stats['high_exposure_jobs'], f"of {workforce_stats['total_jobs']}")
 
     with col2:
-        avg_transformation = data['workforce']['Job_Transformation'].mean()
-        st.metric("Avg Job Transformation", f"{avg_transformation:.0f}%")
+        st.metric("Avg Job Transformation", f"{workforce_stats['avg_transformation']:.0f}%")
 
     with col3:
-        high_reskill_priority = len(data['workforce'][data['workforce']['Reskilling_Priority'] >= 8.0])
-        st.metric("High Reskilling Priority", high_reskill_priority)
+        st.metric("High Reskilling Priority", workforce_stats['high_reskill_priority'])
 
     with col4:
-        very_high_exposure = len(data['workforce'][data['workforce']['AI_Exposure_Level'] == 'Very High'])
-        st.metric("Very High Exposure", very_high_exposure)
+        st.metric("Very High Exposure", workforce_stats['very_high_exposure'])
 
     st.markdown("---")
 
@@ -1023,7 +845,7 @@ with tab4:
 
     with col1:
         # AI exposure levels
-        exposure_counts = data['workforce']['AI_Exposure_Level'].value_counts()
+        exposure_counts = service.exposure_counts(data['workforce'])
         fig_exposure = px.bar(
             x=exposure_counts.index,
             y=exposure_counts.values,
@@ -1033,32 +855,35 @@ with tab4:
             color=exposure_counts.values,
             color_continuous_scale='Reds'
         )
-        st.plotly_chart(fig_exposure, use_container_width=True)
+        show_chart(fig_exposure, 'AI Exposure Levels')
 
     with col2:
         # Job transformation vs reskilling priority
-        fig_reskill = px.scatter(
+        fig_reskill = large_scatter(
             data['workforce'],
             x='Job_Transformation',
             y='Reskilling_Priority',
+            threshold=scatter_threshold,
+            method=downsampling_method,
             color='AI_Exposure_Level',
             hover_name='Job_Category',
             title='Job Transformation vs Reskilling Priority',
             labels={'Job_Transformation': 'Job Transformation (%)', 'Reskilling_Priority': 'Reskilling Priority (1-10)'},
             template=chart_theme
         )
-        st.plotly_chart(fig_reskill, use_container_width=True)
+        show_chart(fig_reskill, 'Transformation vs Reskilling')
 
     # Detailed workforce analysis
     st.subheader("Detailed Workforce Impact")
-    selected_job = st.selectbox(
+    selected_job = searchable_select(
         "Select a job category for detailed analysis:",
-        data['workforce']['Job_Category'].tolist(),
-        key='workforce_selectbox'
+        data['workforce']['Job_Category'],
+        key='workforce_selectbox',
+        index=get_option_index(data['version'], 'workforce', data['workforce']['Job_Category'])
     )
 
-    if selected_job:
-        job_info = data['workforce'][data['workforce']['Job_Category'] == selected_job].iloc[0]
+    if selected_job is not None:
+        job_info = data['workforce'].loc[selected_job]
 
         col1, col2 = st.columns([2, 1])
 
@@ -1071,36 +896,81 @@ with tab4:
             st.metric("Job Transformation", f"{job_info['Job_Transformation']:.0f}%")
             st.metric("Reskilling Priority", f"{job_info['Reskilling_Priority']:.1f}/10")
 
-with tab5:
+with tab5, span('tab.advanced_analytics'):
     st.header("Advanced Analytics & Insights")
 
     if show_advanced_analytics:
-        # Generate advanced visualizations
-        advanced_figures = create_advanced_visualizations(data['trends'], data['opportunities'], analytics_engine)
+        # Large trend sets are aggregated server-side before reaching the browser
+        cluster_view = st.radio(
+            "3D cluster view:",
+            list(CLUSTER_VIEWS),
+            format_func=lambda view: {
+                'auto': 'Auto',
+                'full': 'All trends',
+                'centroids': 'Centroids + sample',
+                'density': 'Voxel density'
+            }[view],
+            horizontal=True,
+            help="Centroids and density views keep the 3D plot light on large datasets",
+            key='cluster_view_radio'
+        )
+
+        advanced_figures = None
+        if advanced_future is not None:
+            try:
+                with st.spinner("Waiting for background analytics..."):
+                    clustered_trends, shared_figures = advanced_future.result()
+                # The future's result is shared across sessions; render private copies
+                advanced_figures = {name: go.Figure(fig) for name, fig in shared_figures.items()}
+            except Exception as error:  # e.g. a crashed worker breaks the pool
+                st.caption(f"Background analytics failed ({type(error).__name__}); computed in this session instead.")
+
+        if advanced_figures is None:
+            clustered_trends = clustered_trends_for(data)
+
+            # Generate advanced visualizations
+            advanced_figures = create_advanced_visualizations(
+                data['trends'],
+                data['opportunities'],
+                analytics_engine,
+                scatter_threshold=scatter_threshold,
+                downsampling_method=downsampling_method,
+                cluster_view=cluster_view,
+                clustered_trends=clustered_trends
+            )
 
         # Display advanced analytics
         col1, col2 = st.columns(2)
 
         with col1:
             st.subheader("Risk-Return Matrix")
-            st.plotly_chart(advanced_figures['risk_return_matrix'], use_container_width=True)
+            show_chart(advanced_figures['risk_return_matrix'], 'Risk-Return Matrix')
 
             st.subheader("Portfolio Allocation")
-            st.plotly_chart(advanced_figures['portfolio_allocation'], use_container_width=True)
+            show_chart(advanced_figures['portfolio_allocation'], 'Portfolio Allocation')
 
         with col2:
             st.subheader("Growth vs Investment Priority")
-            st.plotly_chart(advanced_figures['growth_investment_bubble'], use_container_width=True)
+            show_chart(advanced_figures['growth_investment_bubble'], 'Growth vs Investment Priority')
 
             st.subheader("Market Correlations")
-            st.plotly_chart(advanced_figures['correlation_heatmap'], use_container_width=True)
+            show_chart(advanced_figures['correlation_heatmap'], 'Market Correlations')
 
         # 3D Clustering visualization
         st.subheader("Strategic Trend Clustering")
-        st.plotly_chart(advanced_figures['trend_clusters'], use_container_width=True)
+        show_chart(advanced_figures['trend_clusters'], 'Trend Clusters (3D)')
+
+        # Full points of a single cluster are only sent when asked for
+        drilldown_cluster = st.selectbox(
+            "Drill into cluster:",
+            ["None"] + sorted(clustered_trends['Cluster_Name'].dropna().unique().tolist()),
+            key='cluster_drilldown_selectbox'
+        )
+        if drilldown_cluster != "None":
+            show_chart(create_cluster_drilldown(clustered_trends, drilldown_cluster), 'Cluster Drill-down')
 
         # Market insights
-        insights = generate_market_insights(data['trends'], data['opportunities'])
+        insights = service.market_insights(data['trends'], data['opportunities'])
 
         col1, col2 = st.columns(2)
 
@@ -1126,11 +996,11 @@ with tab5:
     else:
         st.info("Enable 'Show advanced analytics' in the sidebar to view detailed analytical insights.")
 
-with tab6:
+with tab6, span('tab.strategic_insights'):
     st.header("Strategic Insights & Recommendations")
 
     # Generate market insights
-    insights = generate_market_insights(data['trends'], data['opportunities'])
+    insights = service.market_insights(data['trends'], data['opportunities'])
 
     # Strategic recommendations
     st.subheader("Strategic Recommendations")
@@ -1160,7 +1030,7 @@ with tab6:
     st.subheader("Industry Adoption Insights")
 
     # Top adopting industries
-    top_industries = data['industry'].nlargest(5, 'Adoption_Rate')
+    top_industries = service.top_industries(data['industry'])
 
     col1, col2 = st.columns(2)
 
@@ -1176,13 +1046,15 @@ with tab6:
             color='ROI_Percentage',
             color_continuous_scale='Viridis'
         )
-        st.plotly_chart(fig_adoption, use_container_width=True)
+        show_chart(fig_adoption, 'Top Industries by Adoption')
 
     with col2:
-        fig_roi = px.scatter(
+        fig_roi = large_scatter(
             data['industry'],
             x='Adoption_Rate',
             y='ROI_Percentage',
+            threshold=scatter_threshold,
+            method=downsampling_method,
             size='Investment_Priority',
             color='Industry',
             hover_name='Industry',
@@ -1190,7 +1062,7 @@ with tab6:
             labels={'Adoption_Rate': 'Adoption Rate (%)', 'ROI_Percentage': 'ROI (%)'},
             template=chart_theme
         )
-        st.plotly_chart(fig_roi, use_container_width=True)
+        show_chart(fig_roi, 'Adoption vs ROI')
 
     # Key takeaways
     st.subheader("Key Takeaways")
@@ -1209,6 +1081,47 @@ with tab6:
 
 # --- Enhanced Footer Information in Sidebar ---
 st.sidebar.markdown("---")
+
+end_rerun(rerun)
+
+if rerun.profiles:
+    with st.sidebar.expander("Profiles", expanded=True):
+        for captured in rerun.profiles:
+            st.markdown(f"**{captured['site']}** · {captured['seconds'] * 1000:.0f} ms ({captured['profiler']})")
+            if captured['top']:
+                st.dataframe(
+                    pd.DataFrame(captured['top']).style.format({'Self_s': '{:.4f}', 'Cumulative_s': '{:.4f}'}),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            else:
+                st.caption("Too short to sample")
+            st.caption(f"Saved to {captured['path']}")
+
+if show_performance:
+    with st.sidebar.expander("Performance", expanded=True):
+        st.caption(f"Rerun: {rerun_trace.duration_ms:.0f} ms across {len(rerun_trace.spans)} spans")
+        span_rows = pd.DataFrame(rerun_trace.span_table())
+        if len(span_rows) > 0:
+            span_rows['Span'] = ['\u2003' * (depth - 1) + name for name, depth in zip(span_rows['Span'], span_rows['Depth'])]
+            st.dataframe(
+                span_rows[['Span', 'Duration_ms']].style.format({'Duration_ms': '{:.1f}'}),
+                hide_index=True,
+                use_container_width=True
+            )
+        st.download_button("Chrome trace (JSON)", trace_json(rerun_trace, 'chrome'),
+                           file_name=f"rerun-{rerun_trace.trace_id[:12]}.json", mime='application/json')
+        st.download_button("OpenTelemetry (OTLP JSON)", trace_json(rerun_trace, 'otel'),
+                           file_name=f"rerun-{rerun_trace.trace_id[:12]}.otlp.json", mime='application/json')
+
+if show_payload_sizes and chart_payloads:
+    with st.sidebar.expander("Chart Payloads", expanded=True):
+        payload_table = pd.DataFrame({
+            'Chart': list(chart_payloads.keys()),
+            'KB': [size / 1024 for size in chart_payloads.values()]
+        })
+        st.dataframe(payload_table.style.format({'KB': '{:.1f}'}), hide_index=True, use_container_width=True)
+        st.caption(f"Total: {sum(chart_payloads.values()) / 1024:.1f} KB per rerun")
 st.sidebar.markdown(f"""
 <div style="background: rgba(255, 255, 255, 0.05); padding: 1rem; border-radius: 10px; margin: 1rem 0;">
     <h3>Dashboard Statistics</h3>
@@ -0,0 +1,187 @@
+"""
+Analytics Benchmark for AI Opportunity Map
+==========================================
+
+Times every AIMarketAnalytics method plus create_advanced_visualizations and
+generate_market_insights on synthetic trends/opportunities tables (see
+``synthetic_data.py``) at several sizes, and records the peak memory of each
+call. Timings are the best of ``--repeats`` untraced runs; memory comes from
+one extra run under ``tracemalloc`` (plus the Arrow memory pool).
+
+A benchmark that takes longer than ``--budget`` seconds at one size is
+skipped at the larger sizes, so the 1M-row run finishes in reasonable time
+even for the row-by-row methods.
+
+Usage:
+    python benchmarks/analytics_benchmark.py --output analytics_profile.json
+    python benchmarks/analytics_benchmark.py --sizes 15 1000 --baseline analytics_profile.json
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from advanced_analytics import (  # noqa: E402
+    AIMarketAnalytics,
+    create_advanced_visualizations,
+    generate_market_insights
+)
+from memory_pipeline import measure  # noqa: E402
+from synthetic_data import generate_trends, generate_opportunities  # noqa: E402
+
+DEFAULT_SIZES = [15, 1000, 100000, 1000000]
+
+
+def _opportunity_scores(engine, trends, opportunities, with_risk):
+    sizes = opportunities['Market_Size_2025'].str.extract(r'\(\$(\d+)B\+\)')[0].astype(float)
+    return [
+        engine.calculate_opportunity_score(size, growth, 50, focus)
+        for size, growth, focus in zip(sizes, opportunities['Growth_Rate_CAGR'], opportunities['Investment_Focus_Score'])
+    ]
+
+
+# name -> function(engine, trends, opportunities, opportunities_with_risk)
+BENCHMARKS = {
+    'calculate_opportunity_score': _opportunity_scores,
+    'calculate_opportunity_scores': lambda engine, trends, opps, risk: engine.calculate_opportunity_scores(opps),
+    'perform_trend_clustering': lambda engine, trends, opps, risk: engine.perform_trend_clustering(trends),
+    'calculate_market_correlations': lambda engine, trends, opps, risk: engine.calculate_market_correlations(trends),
+    'predict_market_growth': lambda engine, trends, opps, risk: engine.predict_market_growth(
+        trends['Market_Size_Billion'].to_numpy()),
+    'calculate_investment_risk_score': lambda engine, trends, opps, risk: engine.calculate_investment_risk_score(opps),
+    'generate_portfolio_recommendations': lambda engine, trends, opps, risk: engine.generate_portfolio_recommendations(
+        risk, 'medium', 1000000),
+    'create_advanced_visualizations': lambda engine, trends, opps, risk: create_advanced_visualizations(
+        trends, opps, engine),
+    'generate_market_insights': lambda engine, trends, opps, risk: generate_market_insights(trends, opps),
+}
+
+
+def time_call(fn, repeats):
+    """Best wall-clock time of ``repeats`` calls, in seconds."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmarks(sizes, names, repeats, budget, seed):
+    """
+    Run the selected benchmarks at each size.
+
+    Args:
+        sizes: Row counts for the synthetic tables
+        names: Keys of BENCHMARKS to run
+        repeats: Timed runs per benchmark (1 above 10k rows)
+        budget: Seconds after which a benchmark is skipped at larger sizes
+        seed: Seed for the synthetic tables
+
+    Returns:
+        Dictionary of benchmark -> {size: {'status', 'seconds', 'peak_bytes'}}
+    """
+    engine = AIMarketAnalytics()
+    results = {name: {} for name in names}
+    over_budget = set()
+
+    for size in sorted(sizes):
+        trends = generate_trends(size, seed)
+        opportunities = generate_opportunities(size, seed)
+        with_risk = engine.calculate_investment_risk_score(opportunities)
+        size_repeats = repeats if size <= 10000 else 1
+
+        for name in names:
+            if name in over_budget:
+                results[name][str(size)] = {'status': 'skipped', 'seconds': None, 'peak_bytes': None}
+                continue
+
+            def call():
+                return BENCHMARKS[name](engine, trends, opportunities, with_risk)
+
+            seconds = time_call(call, size_repeats)
+            _, peak_bytes = measure(call)
+            results[name][str(size)] = {'status': 'ok', 'seconds': seconds, 'peak_bytes': peak_bytes}
+            print(f"{name:<36}{size:>9} rows {seconds * 1000:>12.1f} ms {peak_bytes / 1e6:>10.1f} MB", flush=True)
+
+            if seconds > budget:
+                over_budget.add(name)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare timings against a saved baseline.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Previously saved results
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List of human-readable regressions (empty when everything passes)
+    """
+    regressions = []
+    for name, by_size in results.items():
+        for size, measured in by_size.items():
+            previous = baseline.get('benchmarks', {}).get(name, {}).get(size)
+            if not previous or previous['status'] != 'ok' or measured['status'] != 'ok':
+                continue
+            if measured['seconds'] > previous['seconds'] * (1 + tolerance):
+                regressions.append(
+                    f"{name} @ {size} rows: {measured['seconds'] * 1000:.1f} ms "
+                    f"vs baseline {previous['seconds'] * 1000:.1f} ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='Rows per synthetic table')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='Benchmarks to run (default: all)')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark up to 10k rows')
+    parser.add_argument('--budget', type=float, default=60.0, help='Skip larger sizes after a run this slow (s)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.only or list(BENCHMARKS), args.repeats, args.budget, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'pandas': pd.__version__,
+                'numpy': np.__version__,
+                'sizes': sorted(args.sizes),
+                'benchmarks': results
+            }, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare_to_baseline(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
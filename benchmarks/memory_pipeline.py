@@ -0,0 +1,192 @@
+"""
+Per-Rerun Memory Benchmark for AI Opportunity Map
+=================================================
+
+Runs the tab pipelines (trend and opportunity filters, risk scoring,
+portfolio generation, trend clustering) on tables scaled up to ``--rows``
+and reports the peak memory each stage allocates, also as a multiple of the
+input table size. A stage that copies its input shows up as a ratio of 1.0 or
+more; selections and column appends that share buffers stay well below it.
+
+Python and NumPy allocations are measured with ``tracemalloc``; Arrow-backed
+string columns are measured through the pyarrow memory pool when available.
+
+Usage:
+    python benchmarks/memory_pipeline.py --rows 100000 --output memory_profile.json
+    python benchmarks/memory_pipeline.py --rows 100000 --baseline memory_profile.json
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import pandas as pd  # noqa: E402
+
+import analytics_service as service  # noqa: E402
+
+
+def scale_table(df, rows):
+    """Repeat a table's rows until it has ``rows`` rows."""
+    repeats = -(-rows // len(df))
+    return pd.concat([df] * repeats, ignore_index=True).head(rows)
+
+
+# Buffers allocated during a stage are released through its pool, so every
+# stage pool must outlive the benchmark
+_stage_pools = []
+
+
+def _arrow_module():
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def measure(fn, *args):
+    """
+    Run ``fn(*args)`` and record the peak memory it allocated.
+
+    Args:
+        fn: Function to run
+        *args: Arguments for ``fn``
+
+    Returns:
+        Tuple of (result, peak bytes)
+    """
+    gc.collect()
+    pa = _arrow_module()
+    if pa is not None:
+        # A proxy pool per stage gives an Arrow peak that starts from zero
+        base_pool = pa.default_memory_pool()
+        stage_pool = pa.proxy_memory_pool(base_pool)
+        _stage_pools.append(stage_pool)
+        pa.set_memory_pool(stage_pool)
+
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        if pa is not None:
+            pa.set_memory_pool(base_pool)
+
+    if pa is not None:
+        peak += stage_pool.max_memory()
+    return result, peak
+
+
+def run_pipeline(rows, horizon, risk_tolerance):
+    """
+    Measure each stage of one dashboard rerun.
+
+    Args:
+        rows: Rows per scaled table
+        horizon: Trend time horizon filter
+        risk_tolerance: Portfolio risk tolerance
+
+    Returns:
+        Dictionary of stage name -> {'peak_bytes', 'input_bytes', 'copies'}
+    """
+    tables = service.load_datasets()
+    trends = scale_table(tables['trends'], rows)
+    opportunities = scale_table(tables['opportunities'], rows)
+    engine = service._engine(None)
+
+    stages = {}
+
+    def record(name, input_df, fn, *args):
+        result, peak = measure(fn, *args)
+        input_bytes = int(input_df.memory_usage(deep=True).sum())
+        stages[name] = {
+            'peak_bytes': peak,
+            'input_bytes': input_bytes,
+            'copies': peak / input_bytes if input_bytes else 0.0
+        }
+        return result
+
+    filtered_trends = record('filter_trends', trends, service.filter_trends, trends, horizon, 5.0)
+    filtered_opportunities = record('filter_opportunities', opportunities,
+                                    service.filter_opportunities, opportunities, 5.0, 'All')
+    with_risk = record('risk_score', filtered_opportunities, engine.calculate_investment_risk_score,
+                       filtered_opportunities)
+    record('portfolio', with_risk, engine.generate_portfolio_recommendations,
+           with_risk, risk_tolerance, 1000000)
+    record('trend_clustering', filtered_trends, engine._fit_trend_clusters, filtered_trends)
+
+    return stages
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare stage peaks against a saved baseline.
+
+    Args:
+        results: Output of run_pipeline
+        baseline: Previously saved results
+        tolerance: Allowed relative growth (0.25 = 25%)
+
+    Returns:
+        List of human-readable regressions (empty when everything passes)
+    """
+    regressions = []
+    for stage, measured in results.items():
+        previous = baseline.get('stages', {}).get(stage)
+        if previous and measured['peak_bytes'] > previous['peak_bytes'] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: {measured['peak_bytes'] / 1e6:.1f} MB vs baseline {previous['peak_bytes'] / 1e6:.1f} MB"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='Rows per scaled table')
+    parser.add_argument('--horizon', default=service.TIME_HORIZONS[2], choices=service.TIME_HORIZONS)
+    parser.add_argument('--risk-tolerance', default='medium', choices=['low', 'medium', 'high'])
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed growth vs baseline')
+    args = parser.parse_args()
+    service.enable_copy_on_write()
+
+    results = run_pipeline(args.rows, args.horizon, args.risk_tolerance)
+
+    print(f"{'stage':<22}{'peak MB':>10}{'input MB':>10}{'copies':>8}")
+    for stage, measured in results.items():
+        print(f"{stage:<22}{measured['peak_bytes'] / 1e6:>10.1f}"
+              f"{measured['input_bytes'] / 1e6:>10.1f}{measured['copies']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'pandas': pd.__version__,
+                'rows': args.rows,
+                'stages': results
+            }, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare_to_baseline(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Import-Time Profile for AI Opportunity Map
+==========================================
+
+Measures how long the dashboard modules take to import, using the
+interpreter's own ``-X importtime`` instrumentation in a fresh process, and
+checks that heavy libraries stay deferred until they are needed.
+
+Usage:
+    python benchmarks/profile_imports.py --output import_profile.json
+    python benchmarks/profile_imports.py --baseline import_profile.json
+
+With ``--baseline`` the script exits non-zero when a module got slower than
+the baseline by more than ``--tolerance``, or when it loads a library listed
+in DEFERRED_IMPORTS at import time.
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ['data_sources', 'chart_rendering', 'advanced_analytics']
+
+# Libraries each module must not load at import time
+DEFERRED_IMPORTS = {
+    'chart_rendering': ['plotly.express', 'plotly.graph_objects'],
+    'advanced_analytics': ['sklearn', 'scipy', 'plotly.express', 'plotly.graph_objects'],
+}
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output.
+
+    Args:
+        stderr: Text written to stderr by the profiled interpreter
+
+    Returns:
+        List of dicts with module, self_us, cumulative_us and depth
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2
+            })
+    return entries
+
+
+def profile_module(module, repeats=3, top_n=10):
+    """
+    Import ``module`` in fresh interpreters and keep the fastest run.
+
+    Args:
+        module: Module name to import
+        repeats: Number of fresh processes to try
+        top_n: Number of heaviest dependencies to report
+
+    Returns:
+        Dictionary with total import time, heaviest dependencies and loaded packages
+    """
+    best = None
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        entries = parse_importtime(result.stderr)
+        total = next(entry['cumulative_us'] for entry in reversed(entries) if entry['module'] == module)
+        if best is None or total < best[0]:
+            best = (total, entries)
+
+    total, entries = best
+    top_level = [entry for entry in entries if entry['depth'] == 1]
+    heaviest = sorted(top_level, key=lambda entry: entry['cumulative_us'], reverse=True)[:top_n]
+    loaded = {entry['module'] for entry in entries}
+
+    return {
+        'total_ms': total / 1000,
+        'heaviest_imports': [
+            {'module': entry['module'], 'cumulative_ms': entry['cumulative_us'] / 1000}
+            for entry in heaviest
+        ],
+        'eager_heavy_imports': sorted(
+            name for name in DEFERRED_IMPORTS.get(module, [])
+            if any(loaded_name == name or loaded_name.startswith(name + '.') for loaded_name in loaded)
+        )
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare a profile against a saved baseline.
+
+    Args:
+        results: Output of profile_module per module
+        baseline: Previously saved results
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List of human-readable regressions (empty when everything passes)
+    """
+    regressions = []
+    for module, profile in results.items():
+        if profile['eager_heavy_imports']:
+            regressions.append(f"{module} imports {', '.join(profile['eager_heavy_imports'])} eagerly")
+
+        previous = baseline.get('modules', {}).get(module)
+        if previous and profile['total_ms'] > previous['total_ms'] * (1 + tolerance):
+            regressions.append(
+                f"{module}: {profile['total_ms']:.0f} ms vs baseline {previous['total_ms']:.0f} ms"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES, help='Modules to profile')
+    parser.add_argument('--repeats', type=int, default=3, help='Fresh processes per module')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline')
+    args = parser.parse_args()
+
+    results = {module: profile_module(module, args.repeats) for module in args.modules}
+
+    for module, profile in results.items():
+        print(f"{module}: {profile['total_ms']:.1f} ms")
+        for entry in profile['heaviest_imports'][:5]:
+            print(f"    {entry['module']:<30} {entry['cumulative_ms']:8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump({
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'modules': results
+            }, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare_to_baseline(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
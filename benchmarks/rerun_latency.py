@@ -0,0 +1,277 @@
+"""
+Rerun Latency Benchmark for AI Opportunity Map
+==============================================
+
+Drives ``app.py`` headlessly with Streamlit's ``AppTest`` and times full
+script reruns triggered by scripted sidebar interactions: impact and
+investment slider moves, time horizon, market size and risk tolerance
+changes, region selections and the Refresh Analytics button. Every rerun
+renders all six tabs, so the timings are end-to-end rerun latency.
+
+Each dataset size runs in its own subprocess with its own dataset store.
+``base`` uses the hand-written tables; a number replaces the trends and
+opportunities tables with synthetic Parquet fixtures of that many rows (see
+``synthetic_data.py``) loaded through ``AI_MAP_DATASET_DIR``. Nothing is
+fetched from the network: AppTest runs without a server and the theme's web
+fonts are disabled.
+
+Usage:
+    python benchmarks/rerun_latency.py --output rerun_profile.json
+    python benchmarks/rerun_latency.py --sizes base 5000 --repeats 5 --baseline rerun_profile.json
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+
+from dataset_store import _manifest_path  # noqa: E402
+
+APP_PATH = os.path.join(REPO_ROOT, 'app.py')
+
+DEFAULT_SIZES = ['base', '1000', '10000']
+
+# Tables replaced by synthetic fixtures; the rest keep their hand-written rows
+SCALED_TABLES = ('trends', 'opportunities')
+
+# Values each interaction cycles through, one per rerun
+IMPACT_VALUES = [5.0, 7.5, 3.0, 1.0]
+INVESTMENT_VALUES = [6.0, 8.0, 4.5, 1.0]
+RISK_VALUES = ['Low', 'High', 'Medium']
+
+
+def _cycle(values, step):
+    return values[step % len(values)]
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _set_slider(label, values):
+    return lambda at, step: _widget(at.sidebar.slider, label).set_value(_cycle(values, step))
+
+
+def _cycle_selectbox(label):
+    def interact(at, step):
+        selectbox = _widget(at.sidebar.selectbox, label)
+        return selectbox.set_value(_cycle(list(selectbox.options), step + 1))
+    return interact
+
+
+def _set_selectbox(label, values):
+    return lambda at, step: _widget(at.sidebar.selectbox, label).select(_cycle(values, step))
+
+
+def _toggle_regions(at, step):
+    multiselect = _widget(at.sidebar.multiselect, "Focus Regions:")
+    options = list(dict.fromkeys(multiselect.options))
+    # Alternate between a narrow and a wide selection
+    return multiselect.set_value(options[:2] if step % 2 == 0 else options[:6])
+
+
+# name -> function(app_test, step) that applies one interaction before the rerun
+INTERACTIONS = {
+    'rerun': lambda at, step: at,
+    'impact_slider': _set_slider("Minimum Impact Score:", IMPACT_VALUES),
+    'investment_slider': _set_slider("Minimum Investment Focus:", INVESTMENT_VALUES),
+    'horizon_filter': _cycle_selectbox("Time Horizon Filter:"),
+    'market_filter': _cycle_selectbox("Market Size Filter:"),
+    'risk_tolerance': _set_selectbox("Investment Risk Tolerance:", RISK_VALUES),
+    'region_multiselect': _toggle_regions,
+    'refresh_button': lambda at, step: _widget(at.sidebar.button, "Refresh Analytics").click(),
+}
+
+
+def percentiles(samples):
+    """p50/p95/mean/max of a list of seconds."""
+    values = np.asarray(samples, dtype=float)
+    return {
+        'p50': float(np.percentile(values, 50)),
+        'p95': float(np.percentile(values, 95)),
+        'mean': float(values.mean()),
+        'max': float(values.max()),
+        'runs': int(values.size)
+    }
+
+
+def run_interactions(names, repeats, timeout):
+    """
+    Time app reruns for each interaction in this process.
+
+    Args:
+        names: Keys of INTERACTIONS to run
+        repeats: Timed reruns per interaction
+        timeout: Seconds AppTest allows a single rerun
+
+    Returns:
+        Dictionary of interaction -> percentiles (plus 'first_run')
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def timed(run):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if result.exception:
+            raise RuntimeError(f"app.py raised: {[e.value for e in result.exception]}")
+        return elapsed
+
+    results = {'first_run': percentiles([timed(at.run)])}
+    for name in names:
+        interact = INTERACTIONS[name]
+        # One untimed rerun so a cold cache entry does not skew small samples
+        timed(lambda: interact(at, repeats).run())
+        samples = [timed(lambda step=step: interact(at, step).run()) for step in range(repeats)]
+        results[name] = percentiles(samples)
+    return results
+
+
+def prepare_dataset(size, directory, seed):
+    """
+    Environment overrides for one dataset size.
+
+    Args:
+        size: 'base' or a row count as a string
+        directory: Scratch directory for the fixtures
+        seed: Seed for the synthetic tables
+
+    Returns:
+        Dictionary of environment variables
+    """
+    env = {
+        'AI_MAP_FONT_SOURCE': 'none',
+        'AI_MAP_STORE_NAME': f"rerun_latency_{os.getpid()}_{size}",
+    }
+    if size != 'base':
+        from synthetic_data import write_dataset
+        fixtures = os.path.join(directory, size)
+        write_dataset(fixtures, int(size), seed, tables=SCALED_TABLES)
+        env['AI_MAP_DATASET_DIR'] = fixtures
+    return env
+
+
+def run_benchmarks(sizes, names, repeats, timeout, seed):
+    """
+    Run every interaction at each dataset size, one subprocess per size.
+
+    Args:
+        sizes: 'base' and/or row counts as strings
+        names: Keys of INTERACTIONS to run
+        repeats: Timed reruns per interaction
+        timeout: Seconds allowed per rerun
+        seed: Seed for the synthetic tables
+
+    Returns:
+        Dictionary of size -> interaction -> percentiles
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='rerun_latency_') as directory:
+        for size in sizes:
+            env = {**os.environ, **prepare_dataset(size, directory, seed)}
+            command = [sys.executable, os.path.abspath(__file__), '--worker',
+                       '--repeats', str(repeats), '--timeout', str(timeout), '--only', *names]
+            completed = subprocess.run(command, env=env, cwd=REPO_ROOT, capture_output=True, text=True)
+            # The worker's store is gone with it; drop its lock file too
+            lock_path = f"{_manifest_path(env['AI_MAP_STORE_NAME'])}.lock"
+            if os.path.exists(lock_path):
+                os.remove(lock_path)
+            if completed.returncode != 0:
+                raise RuntimeError(f"Benchmark at size {size} failed:\n{completed.stderr}")
+            results[size] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+            for name, stats in results[size].items():
+                print(f"{size:>8} {name:<20}{stats['p50'] * 1000:>10.1f} ms p50"
+                      f"{stats['p95'] * 1000:>10.1f} ms p95", flush=True)
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compare p95 latencies against a saved baseline.
+
+    Args:
+        results: Output of run_benchmarks
+        baseline: Previously saved results
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List of human-readable regressions (empty when everything passes)
+    """
+    regressions = []
+    for size, by_interaction in results.items():
+        for name, measured in by_interaction.items():
+            previous = baseline.get('latency', {}).get(size, {}).get(name)
+            if previous and measured['p95'] > previous['p95'] * (1 + tolerance):
+                regressions.append(
+                    f"{name} @ {size}: p95 {measured['p95'] * 1000:.1f} ms "
+                    f"vs baseline {previous['p95'] * 1000:.1f} ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help="'base' for the hand-written tables, or rows per synthetic table")
+    parser.add_argument('--only', nargs='+', choices=list(INTERACTIONS), help='Interactions to run (default: all)')
+    parser.add_argument('--repeats', type=int, default=10, help='Timed reruns per interaction')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Seconds allowed per rerun')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown vs baseline')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    names = args.only or list(INTERACTIONS)
+    if args.worker:
+        print(json.dumps(run_interactions(names, args.repeats, args.timeout)))
+        return
+
+    for size in args.sizes:
+        if size != 'base' and not size.isdigit():
+            parser.error(f"invalid size {size!r}: use 'base' or a row count")
+
+    results = run_benchmarks(args.sizes, names, args.repeats, args.timeout, args.seed)
+
+    if args.output:
+        import streamlit
+        with open(args.output, 'w') as handle:
+            json.dump({
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'streamlit': streamlit.__version__,
+                'repeats': args.repeats,
+                'sizes': args.sizes,
+                'latency': results
+            }, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare_to_baseline(results, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+"""
+Chart Rendering Helpers for AI Opportunity Map
+==============================================
+
+This module keeps the dashboard charts responsive on large datasets:
+- WebGL (Scattergl) rendering above a configurable point threshold
+- LTTB-style downsampling that preserves the visual shape of a series
+- Grid binning that keeps one representative point per cell
+- Compact figure payloads (narrow typed arrays, pruned templates, no
+  duplicated hover data) and payload size measurement
+
+Retained points are real rows of the input frame, so hover labels keep
+working on everything that is drawn.
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import re
+from importlib.metadata import version
+
+import numpy as np
+
+from instrumentation import traced
+
+# plotly is imported inside the functions that build or serialize figures,
+# so the downsampling helpers can be used without loading it
+
+# Above this many rows scatters switch to WebGL and are downsampled
+LARGE_DATA_THRESHOLD = 5000
+
+# Upper bound on the number of points sent to the browser in large-data mode
+MAX_RENDERED_POINTS = 4000
+
+DOWNSAMPLING_METHODS = ('lttb', 'bin')
+
+# Plotly 6+ serializes numpy arrays as base64 typed arrays ({dtype, bdata});
+# older versions write lists, where narrowing floats would only add digits
+TYPED_ARRAY_SUPPORT = int(version('plotly').split('.')[0]) >= 6
+
+# Trace attributes that carry one value per point
+_POINT_ARRAY_ATTRIBUTES = ('x', 'y', 'z', 'values', 'customdata')
+
+_CUSTOMDATA_REFERENCE = re.compile(r'%\{customdata\[(\d+)\]')
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select row positions with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x: Array of x values
+        y: Array of y values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of selected positions into the original arrays
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+
+    if n_out >= n:
+        return np.arange(n)
+
+    order = np.argsort(x, kind='stable')
+    if n_out < 3:
+        return np.sort(order[[0, n - 1][:max(n_out, 0)]])
+
+    xs = x[order]
+    ys = y[order]
+
+    # First and last points are always kept, the rest is split into buckets
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Average of the next bucket is the third triangle vertex
+        avg_x = xs[end:next_end].mean()
+        avg_y = ys[end:next_end].mean()
+
+        areas = np.abs(
+            (xs[prev] - avg_x) * (ys[start:end] - ys[prev]) -
+            (xs[prev] - xs[start:end]) * (avg_y - ys[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+
+    return np.sort(order[selected])
+
+
+def grid_bin_indices(x, y, n_out, priority=None):
+    """
+    Keep one representative point per cell of a regular 2D grid.
+
+    Args:
+        x: Array of x values
+        y: Array of y values
+        n_out: Approximate number of cells (and therefore points) to keep
+        priority: Optional array; the row with the largest value wins its cell
+
+    Returns:
+        Tuple of (selected positions, number of rows each selected point represents)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n == 0:
+        return np.arange(0), np.arange(0)
+
+    bins = max(int(np.sqrt(n_out)), 1)
+
+    def _cell(values):
+        low, high = np.nanmin(values), np.nanmax(values)
+        span = high - low if high > low else 1.0
+        return np.minimum(((values - low) / span * bins).astype(np.int64), bins - 1)
+
+    cell_ids = _cell(x) * bins + _cell(y)
+
+    # Sort so the highest-priority row comes first inside every cell
+    if priority is not None:
+        order = np.lexsort((-np.asarray(priority, dtype=np.float64), cell_ids))
+    else:
+        order = np.argsort(cell_ids, kind='stable')
+
+    _, first, counts = np.unique(cell_ids[order], return_index=True, return_counts=True)
+    return order[first], counts
+
+
+def downsample_points(df, x, y, max_points=MAX_RENDERED_POINTS, method='lttb', color=None, size=None):
+    """
+    Reduce a frame to at most ``max_points`` rows for plotting.
+
+    Each color group receives a share of the point budget proportional to its
+    size (at least one point), so no category disappears from the legend.
+
+    Args:
+        df: DataFrame to reduce
+        x: Column used for the x axis
+        y: Column used for the y axis
+        max_points: Point budget
+        method: 'lttb' or 'bin'
+        color: Optional grouping column
+        size: Optional column used as the bin representative priority
+
+    Returns:
+        DataFrame with the retained rows; 'bin' adds a Points_Represented column
+    """
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    if len(df) <= max_points:
+        return df
+
+    if color:
+        # Missing colors form their own group; groupby(...).indices drops them
+        # for categorical columns even with dropna=False
+        codes, _ = df[color].factorize(use_na_sentinel=False)
+        order = np.argsort(codes, kind='stable')
+        groups = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+    else:
+        groups = [np.arange(len(df))]
+
+    positions = []
+    represented = []
+    for group_positions in groups:
+        budget = max(int(round(max_points * len(group_positions) / len(df))), 1)
+        group_x = df[x].to_numpy()[group_positions]
+        group_y = df[y].to_numpy()[group_positions]
+
+        if method == 'lttb':
+            keep = lttb_indices(group_x, group_y, budget)
+            positions.append(group_positions[keep])
+        else:
+            priority = df[size].to_numpy()[group_positions] if size else None
+            keep, counts = grid_bin_indices(group_x, group_y, budget, priority)
+            positions.append(group_positions[keep])
+            represented.append(counts)
+
+    positions = np.concatenate(positions)
+    sampled = df.iloc[positions]
+    if method == 'bin':
+        sampled = sampled.assign(Points_Represented=np.concatenate(represented))
+    return sampled
+
+
+def _column_name(value):
+    """Return ``value`` if it names a column, None for arrays and lists."""
+    return value if isinstance(value, str) else None
+
+
+@traced('chart.large_scatter')
+def large_scatter(df, x, y, threshold=LARGE_DATA_THRESHOLD, max_points=MAX_RENDERED_POINTS,
+                  method='lttb', **px_kwargs):
+    """
+    Drop-in replacement for ``px.scatter`` with a large-data mode.
+
+    At or below ``threshold`` rows this is exactly ``px.scatter``. Above it the
+    frame is downsampled, rendered with WebGL and the title notes how many
+    points are shown.
+
+    Args:
+        df: DataFrame to plot
+        x: Column used for the x axis
+        y: Column used for the y axis
+        threshold: Row count that switches on large-data mode (None disables it)
+        max_points: Point budget in large-data mode
+        method: 'lttb' or 'bin'
+        **px_kwargs: Passed through to ``px.scatter``
+
+    Returns:
+        Plotly figure
+    """
+    import plotly.express as px
+
+    if threshold is None or len(df) <= threshold:
+        return px.scatter(df, x=x, y=y, **px_kwargs)
+
+    sampled = downsample_points(
+        df, x, y,
+        max_points=max_points,
+        method=method,
+        color=_column_name(px_kwargs.get('color')),
+        size=_column_name(px_kwargs.get('size'))
+    )
+
+    if 'Points_Represented' in sampled.columns:
+        hover_data = px_kwargs.get('hover_data')
+        if isinstance(hover_data, dict):
+            px_kwargs['hover_data'] = {**hover_data, 'Points_Represented': True}
+        else:
+            px_kwargs['hover_data'] = list(hover_data or []) + ['Points_Represented']
+
+    title = px_kwargs.pop('title', None)
+    note = f"showing {len(sampled):,} of {len(df):,} points"
+    px_kwargs['title'] = f"{title} ({note})" if title else note
+
+    return px.scatter(sampled, x=x, y=y, render_mode='webgl', **px_kwargs)
+
+
+def _compact_array(values):
+    """Return a numeric array in the narrowest dtype that keeps it plottable."""
+    if values is None or isinstance(values, (str, dict)):
+        return values
+
+    array = np.asarray(values)
+    if array.dtype.kind == 'f' and array.dtype.itemsize > 4:
+        return array.astype(np.float32)
+    if array.dtype.kind in 'iu' and array.size:
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if array.min() >= info.min and array.max() <= info.max:
+                return array.astype(dtype)
+    if array.dtype.kind == 'b':
+        return array.astype(np.int8)
+    return values
+
+
+def _numeric_view(values):
+    """Return ``values`` as a float array, or None when they are not numeric."""
+    if values is None or isinstance(values, (str, dict)):
+        return None
+    array = np.asarray(values)
+    return array.astype(np.float64) if array.dtype.kind in 'iufb' else None
+
+
+def _dedupe_hover(trace):
+    """Drop hover columns that repeat data the trace already carries."""
+    hovertext = getattr(trace, 'hovertext', None)
+    text = getattr(trace, 'text', None)
+    template = trace.hovertemplate if 'hovertemplate' in trace else None
+
+    if (hovertext is not None and text is not None and not isinstance(hovertext, str)
+            and len(hovertext) == len(text) and list(hovertext) == list(text)):
+        trace.hovertext = None
+        if template:
+            template = template.replace('%{hovertext}', '%{text}')
+
+    customdata = getattr(trace, 'customdata', None)
+    if customdata is not None and template:
+        customdata = np.asarray(customdata)
+        if customdata.ndim == 2 and customdata.shape[1] > 0:
+            # Columns identical to an existing per-point attribute are referenced directly
+            candidates = {attr: _numeric_view(trace[attr]) for attr in ('x', 'y', 'z') if attr in trace}
+            marker_size = getattr(trace.marker, 'size', None) if 'marker' in trace else None
+            if marker_size is not None:
+                candidates['marker.size'] = _numeric_view(marker_size)
+
+            replacement = {}
+            for column in range(customdata.shape[1]):
+                column_values = _numeric_view(customdata[:, column])
+                if column_values is None:
+                    continue
+                for attr, attr_values in candidates.items():
+                    if attr_values is not None and attr_values.shape == column_values.shape \
+                            and np.array_equal(attr_values, column_values):
+                        replacement[column] = attr
+                        break
+
+            if replacement:
+                kept = [column for column in range(customdata.shape[1]) if column not in replacement]
+                renumber = {old: new for new, old in enumerate(kept)}
+
+                def _rewrite(match):
+                    column = int(match.group(1))
+                    if column in replacement:
+                        return '%{' + replacement[column]
+                    return '%{customdata[' + str(renumber[column]) + ']'
+
+                template = _CUSTOMDATA_REFERENCE.sub(_rewrite, template)
+                trace.customdata = customdata[:, kept] if kept else None
+
+    if template:
+        trace.hovertemplate = template
+
+
+@traced('chart.compact_figure')
+def compact_figure(fig):
+    """
+    Shrink the JSON a figure serializes to before it is sent to the browser.
+
+    - Numeric per-point arrays are narrowed (float64 to float32, ints to the
+      smallest fitting width) so they ship as compact base64 typed arrays
+    - The layout template keeps only the trace types the figure uses
+    - Hover columns that repeat x/y/z/size values or the text labels are dropped
+
+    Args:
+        fig: Plotly figure (modified in place)
+
+    Returns:
+        The same figure, for chaining
+    """
+    import plotly.graph_objects as go
+
+    for trace in fig.data:
+        _dedupe_hover(trace)
+
+        if TYPED_ARRAY_SUPPORT:
+            for attr in _POINT_ARRAY_ATTRIBUTES:
+                if attr in trace and trace[attr] is not None:
+                    trace[attr] = _compact_array(trace[attr])
+            marker_size = getattr(trace.marker, 'size', None) if 'marker' in trace else None
+            if marker_size is not None and not np.isscalar(marker_size):
+                trace.marker.size = _compact_array(marker_size)
+
+    template = fig.layout.template
+    if template is not None and template.data is not None:
+        used_types = {trace.type for trace in fig.data}
+        fig.layout.template = go.layout.Template(
+            layout=template.layout,
+            data={trace_type: template.data[trace_type] for trace_type in used_types
+                  if template.data[trace_type]}
+        )
+
+    return fig
+
+
+@traced('chart.payload_bytes')
+def figure_payload_bytes(fig):
+    """
+    Measure the size of the JSON spec a figure sends to the browser.
+
+    Args:
+        fig: Plotly figure
+
+    Returns:
+        Payload size in bytes
+    """
+    import plotly.io as pio
+
+    return len(pio.to_json(fig, validate=False).encode('utf-8'))
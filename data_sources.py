@@ -16,6 +16,7 @@ Sources:
 Last Updated: June 2025
 """
 
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -30,6 +31,109 @@ AI_MARKET_DATA = {
     'wearable_ai_market_2025': 180,  # Billion USD
 }
 
+# Compact column dtypes applied by every loader. Low-cardinality labels become
+# categoricals (ordered where the labels have a natural order), bounded scores
+# and percentages use 32-bit floats or 16-bit integers, and free text uses
+# Arrow-backed strings when pyarrow is installed.
+CATEGORICAL_COLUMNS = {
+    'Time_Horizon': None,
+    'Maturity_Level': None,
+    'Region': None,
+    'AI_Exposure_Level': ['Low', 'Medium', 'High', 'Very High'],
+}
+
+FLOAT32_COLUMNS = [
+    'Impact_Score', 'Growth_Rate_CAGR', 'Investment_Focus_Score', 'Market_Share_Percent',
+    'Growth_Rate', 'Investment_Priority', 'Reskilling_Priority'
+]
+
+INT16_COLUMNS = ['Adoption_Rate', 'ROI_Percentage', 'Job_Transformation']
+
+TEXT_COLUMNS = [
+    'Trend', 'Description', 'Key_Players', 'Opportunity_Area', 'Market_Size_2025', 'Key_Challenges',
+    'Success_Factors', 'Related_Trends', 'Key_Focus_Areas', 'Industry', 'Primary_Use_Cases',
+    'Job_Category', 'Skill_Demand_Change'
+]
+
+# Long prose shown only in the detail panels; kept out of the hot frames used
+# for filtering and charts when the dataset store runs in split mode
+DETAIL_TEXT_COLUMNS = {
+    'trends': ['Description', 'Key_Players'],
+    'opportunities': ['Key_Challenges', 'Success_Factors', 'Related_Trends'],
+}
+
+# Set AI_MAP_ARROW_STRINGS=0 to keep text columns as Python objects
+USE_ARROW_STRINGS = os.environ.get('AI_MAP_ARROW_STRINGS', '1') != '0'
+
+def _arrow_strings_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return USE_ARROW_STRINGS
+
+def dtype_mode():
+    """
+    Describe the settings that decide which dtypes compact_dtypes produces.
+    
+    Returns:
+        String naming the text storage and pandas' default string dtype
+    """
+    text = 'arrow' if _arrow_strings_available() else 'object'
+    return f"{text}-{pd.Series(['']).dtype}"
+
+def compact_dtypes(df):
+    """
+    Convert a table's columns to the compact dtypes declared above.
+    
+    Args:
+        df: Table with default dtypes
+        
+    Returns:
+        DataFrame with categorical, 32/16-bit numeric and Arrow string columns
+    """
+    dtypes = {}
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            categories = CATEGORICAL_COLUMNS[column]
+            dtypes[column] = pd.CategoricalDtype(categories, ordered=categories is not None)
+        elif column in FLOAT32_COLUMNS:
+            dtypes[column] = 'float32'
+        elif column in INT16_COLUMNS:
+            dtypes[column] = 'int16'
+        elif column in TEXT_COLUMNS and df[column].dtype == object and _arrow_strings_available():
+            # pandas 3 already stores text as Arrow strings; pandas 2 uses objects
+            dtypes[column] = 'string[pyarrow]'
+    return df.astype(dtypes)
+
+def memory_report(tables):
+    """
+    Report how much memory each table takes, against 64-bit numbers and
+    Python object strings.
+    
+    Args:
+        tables: Dictionary of table name -> DataFrame
+        
+    Returns:
+        DataFrame with Table, Rows, Bytes, Default_Bytes and Savings_Percent columns
+    """
+    rows = []
+    for name, df in tables.items():
+        default = df.astype({
+            column: 'float64' if df[column].dtype.kind == 'f' else 'int64' if df[column].dtype.kind in 'iu' else object
+            for column in df.columns
+        })
+        compact_bytes = int(df.memory_usage(deep=True).sum())
+        default_bytes = int(default.memory_usage(deep=True).sum())
+        rows.append({
+            'Table': name,
+            'Rows': len(df),
+            'Bytes': compact_bytes,
+            'Default_Bytes': default_bytes,
+            'Savings_Percent': 100 * (1 - compact_bytes / default_bytes) if default_bytes else 0.0
+        })
+    return pd.DataFrame(rows)
+
 def load_comprehensive_trend_data():
     """
     Loads comprehensive AI trend data based on June 2025 research.
@@ -138,7 +242,7 @@ def load_comprehensive_trend_data():
             "Salesforce, Adobe, HubSpot, Zendesk"
         ]
     }
-    return pd.DataFrame(data)
+    return compact_dtypes(pd.DataFrame(data))
 
 def load_comprehensive_opportunity_data():
     """
@@ -246,7 +350,7 @@ def load_comprehensive_opportunity_data():
             "Personalized AI Assistants, AI-Enhanced Customer Experience"
         ]
     }
-    return pd.DataFrame(data)
+    return compact_dtypes(pd.DataFrame(data))
 
 def load_regional_market_data():
     """
@@ -273,7 +377,7 @@ def load_regional_market_data():
             "Mining AI, Agricultural AI, Financial AI"
         ]
     }
-    return pd.DataFrame(data)
+    return compact_dtypes(pd.DataFrame(data))
 
 def load_industry_adoption_data():
     """
@@ -307,7 +411,7 @@ def load_industry_adoption_data():
         ],
         'Investment_Priority': [9.1, 8.8, 8.6, 8.4, 8.2, 7.9, 7.7, 8.1, 7.8, 7.5, 7.2, 6.9, 7.3, 6.8, 7.1]
     }
-    return pd.DataFrame(data)
+    return compact_dtypes(pd.DataFrame(data))
 
 def load_workforce_impact_data():
     """
@@ -344,7 +448,7 @@ def load_workforce_impact_data():
         ],
         'Reskilling_Priority': [9.2, 9.5, 8.7, 8.4, 8.6, 8.1, 7.8, 7.9, 8.2, 7.6, 8.0, 7.3, 8.5, 9.1, 7.4]
     }
-    return pd.DataFrame(data)
+    return compact_dtypes(pd.DataFrame(data))
 
 # Research methodology and data sources
 RESEARCH_SOURCES = {
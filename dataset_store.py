@@ -0,0 +1,467 @@
+"""
+Shared-Memory Dataset Store for AI Opportunity Map
+==================================================
+
+One read-only, columnar copy of the dashboard tables per machine:
+- The first process to ask builds the five tables plus the derived
+  opportunity scores and publishes them to shared memory
+- Every other Streamlit server process, API worker and analytics worker
+  attaches to the same blocks zero-copy, so memory stays flat as sessions
+  and processes are added
+- Attached columns are read-only; derive new frames instead of mutating them
+- In split mode (the default) the long prose columns listed in
+  ``data_sources.DETAIL_TEXT_COLUMNS`` are left out of the shared tables and
+  served by DetailTextStore, which loads them per table, keyed by row id,
+  the first time a detail panel asks for them
+- Streamed rows (see ``ingestion.py``) are appended per process on top of
+  the shared base tables; the base blocks themselves never change
+
+The store is found through a small manifest file in the temp directory. It is
+rebuilt when ``data_sources.py``, the scoring code (``advanced_analytics.py``,
+``analytics_service.py``), ``AI_MAP_DATASET_DIR``, the dtype settings
+(``AI_MAP_ARROW_STRINGS``, pyarrow availability, pandas' default string dtype)
+change or when the owning process has exited.
+When shared memory is unavailable the tables are simply held in-process.
+
+Configuration:
+    AI_MAP_STORE_NAME   Store name (default: ai_opportunity_map); use distinct
+                        names for unrelated deployments on one machine
+    AI_MAP_SPLIT_TEXT   '1' (default) to serve detail text lazily, '0' to keep
+                        it in the shared tables
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import atexit
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+import analytics_service as service
+from analytics_executor import SharedFrame, attach_frame, publish_handle
+from data_sources import DETAIL_TEXT_COLUMNS, dtype_mode
+
+DEFAULT_STORE_NAME = 'ai_opportunity_map'
+
+# Base tables from data_sources plus derived tables computed once at build time
+STORE_TABLES = ('trends', 'opportunities', 'regional', 'industry', 'workforce')
+DERIVED_TABLES = ('opportunity_scores',)
+
+# Tables whose detail text lives in another table's columns
+DETAIL_TEXT_SOURCE_TABLE = {'opportunity_scores': 'opportunities'}
+
+# Loaders the detail text store reads prose from, per table
+DETAIL_TEXT_LOADERS = {
+    'trends': lambda: service.load_table('trends'),
+    'opportunities': lambda: service.load_table('opportunities'),
+}
+
+SPLIT_TEXT = os.environ.get('AI_MAP_SPLIT_TEXT', '1') != '0'
+
+# Code the stored tables are built from: the base data and the derived score computations
+_SOURCE_PATHS = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), module)
+    for module in ('data_sources.py', 'advanced_analytics.py', 'analytics_service.py')
+)
+
+_store = None
+_text_store = None
+_store_lock = threading.Lock()
+
+
+def detail_text_columns(table):
+    """Detail-only text columns of a store table."""
+    return DETAIL_TEXT_COLUMNS.get(DETAIL_TEXT_SOURCE_TABLE.get(table, table), [])
+
+
+def build_tables(split_text=None):
+    """
+    Load the base tables and compute the derived ones.
+
+    Args:
+        split_text: Leave detail text columns out (default: SPLIT_TEXT)
+
+    Returns:
+        Dictionary of table name -> DataFrame
+    """
+    split_text = SPLIT_TEXT if split_text is None else split_text
+    tables = service.load_datasets()
+    tables['opportunity_scores'] = service.opportunity_scores(tables['opportunities'])
+    if split_text:
+        tables = {name: df.drop(columns=detail_text_columns(name)) for name, df in tables.items()}
+    return tables
+
+
+def source_stamp():
+    """Identifies the data and scoring code, dataset source, dtype settings and storage mode the store was built from."""
+    code = '-'.join(f"{stat.st_mtime_ns}-{stat.st_size}" for stat in map(os.stat, _SOURCE_PATHS))
+    return f"{code}-{service.dataset_source()}-{dtype_mode()}-{'split' if SPLIT_TEXT else 'full'}"
+
+
+def table_version(tables):
+    """
+    Content hash of a set of tables.
+
+    Args:
+        tables: Dictionary of table name -> DataFrame
+
+    Returns:
+        Short hex digest
+    """
+    digest = hashlib.blake2b(digest_size=6)
+    for name in sorted(tables):
+        digest.update(name.encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(tables[name]).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _chained_version(version, table, rows):
+    """Version after appending ``rows`` to ``table``, from the previous version."""
+    digest = hashlib.blake2b(version.encode('utf-8'), digest_size=6)
+    digest.update(table.encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(rows).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _manifest_path(name):
+    return os.path.join(tempfile.gettempdir(), f"{name}.store")
+
+
+class DatasetStore:
+    """Read-only dashboard tables, shared across processes when possible."""
+
+    def __init__(self, name, tables, version, shared_frames=None, handles=None):
+        """
+        Args:
+            name: Store name
+            tables: Dictionary of table name -> DataFrame
+            version: Content hash of the tables
+            shared_frames: SharedFrame objects this process owns (creator only)
+            handles: Dictionary of table name -> SharedFrame handle (None if not shared)
+        """
+        self.name = name
+        self.tables = tables
+        self.version = version
+        self.base_version = version
+        self.base_rows = {table: len(df) for table, df in tables.items()}
+        self.handles = handles or {}
+        self._shared_frames = shared_frames or []
+        self._lock = threading.Lock()
+
+    @property
+    def owner(self):
+        """Whether this process created (and will unlink) the shared blocks."""
+        return bool(self._shared_frames)
+
+    @property
+    def shared(self):
+        return bool(self.handles)
+
+    @classmethod
+    def create(cls, name=DEFAULT_STORE_NAME):
+        """
+        Build the tables, publish them to shared memory and write the manifest.
+
+        Args:
+            name: Store name
+
+        Returns:
+            DatasetStore owned by this process
+        """
+        built = build_tables()
+        version = table_version(built)
+
+        shared_frames, handles, tables = [], {}, {}
+        try:
+            for table, df in built.items():
+                shared = SharedFrame(df)
+                shared_frames.append(shared)
+                handles[table] = shared.handle
+                tables[table] = attach_frame(shared.handle)
+                publish_handle(tables[table], shared.handle)
+        except OSError:
+            for shared in shared_frames:
+                shared.close()
+            raise
+
+        store = cls(name, tables, version, shared_frames, handles)
+
+        manifest = {'pid': os.getpid(), 'stamp': source_stamp(), 'version': version, 'handles': handles}
+        temporary = f"{_manifest_path(name)}.{os.getpid()}"
+        with open(temporary, 'wb') as handle:
+            pickle.dump(manifest, handle)
+        os.replace(temporary, _manifest_path(name))
+
+        atexit.register(store.close)
+        return store
+
+    @classmethod
+    def attach(cls, name=DEFAULT_STORE_NAME):
+        """
+        Attach to a store published by another process.
+
+        Args:
+            name: Store name
+
+        Returns:
+            DatasetStore, or None when no current store exists
+        """
+        try:
+            with open(_manifest_path(name), 'rb') as handle:
+                manifest = pickle.load(handle)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if manifest['stamp'] != source_stamp() or not _process_alive(manifest['pid']):
+            return None
+
+        try:
+            tables = {table: attach_frame(handle) for table, handle in manifest['handles'].items()}
+        except FileNotFoundError:
+            # The owner unlinked its blocks after the manifest was read
+            return None
+
+        for table, df in tables.items():
+            publish_handle(df, manifest['handles'][table])
+        return cls(name, tables, manifest['version'], handles=manifest['handles'])
+
+    @classmethod
+    def local(cls, name=DEFAULT_STORE_NAME):
+        """Hold the tables in this process only (no shared memory)."""
+        tables = build_tables()
+        return cls(name, tables, table_version(tables))
+
+    def snapshot(self):
+        """
+        Tables and version as of now, consistent with each other.
+
+        Returns:
+            Tuple (tables, version)
+        """
+        with self._lock:
+            return self.tables, self.version
+
+    def appended_rows(self):
+        """Rows appended to each table since the store was built."""
+        tables, _ = self.snapshot()
+        return {table: len(df) - self.base_rows[table] for table, df in tables.items()}
+
+    def append(self, table, rows):
+        """
+        Append rows to one table of this process's view.
+
+        The shared base blocks are not modified: the table becomes a private
+        concatenation of the base rows and everything appended since, and the
+        version is chained from the previous one instead of rehashing the
+        tables. Processes that should agree must append the same rows in the
+        same order (see ingestion.py). Detail text columns go to the text
+        store in split mode.
+
+        Args:
+            table: Store table name
+            rows: DataFrame with the table's columns (extra columns are dropped)
+
+        Returns:
+            The appended rows as stored, indexed by their new row ids
+        """
+        with self._lock:
+            current = self.tables[table]
+            start = len(current)
+            rows = rows.set_axis(pd.RangeIndex(start, start + len(rows)))
+
+            text_columns = [column for column in detail_text_columns(table) if column in rows.columns]
+            if text_columns and table not in DETAIL_TEXT_SOURCE_TABLE and text_columns[0] not in current.columns:
+                get_text_store().append(table, rows[text_columns])
+
+            stored = rows[list(current.columns)]
+            # Readers holding the previous dictionary keep a consistent view
+            self.tables = {**self.tables, table: pd.concat([current, stored])}
+            self.version = _chained_version(self.version, table, stored)
+            return stored
+
+    def memory_report(self):
+        """
+        Summarize the size of each table.
+
+        Returns:
+            DataFrame with Table, Rows, Columns and Shared_Bytes columns
+        """
+        rows = []
+        for table, df in self.tables.items():
+            handle = self.handles.get(table)
+            shared_bytes = 0
+            if handle is not None:
+                shared_bytes = sum(_descriptor_bytes(kind, payload) for _, kind, payload, _, _ in handle['columns'])
+            rows.append({'Table': table, 'Rows': len(df), 'Columns': df.shape[1], 'Shared_Bytes': shared_bytes})
+        return pd.DataFrame(rows)
+
+    def close(self):
+        """Unlink owned blocks and remove the manifest if it still points at them."""
+        if not self.owner:
+            return
+        try:
+            with open(_manifest_path(self.name), 'rb') as handle:
+                if pickle.load(handle)['pid'] == os.getpid():
+                    os.remove(_manifest_path(self.name))
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            pass
+        for shared in self._shared_frames:
+            shared.close()
+        self._shared_frames = []
+
+
+class DetailTextStore:
+    """Detail-panel prose, loaded per table on first use and looked up by row id."""
+
+    def __init__(self, loaders=None):
+        """
+        Args:
+            loaders: Dictionary of table name -> function returning the full table
+                     (default: DETAIL_TEXT_LOADERS)
+        """
+        self._loaders = loaders or DETAIL_TEXT_LOADERS
+        self._tables = {}
+        self._appended = {}
+        self._lock = threading.Lock()
+
+    def loaded_tables(self):
+        """Names of the tables whose text has been fetched so far."""
+        return sorted(self._tables)
+
+    def _text_table(self, table):
+        source = DETAIL_TEXT_SOURCE_TABLE.get(table, table)
+        with self._lock:
+            if source not in self._tables:
+                self._tables[source] = pd.concat(
+                    [self._loaders[source]()[DETAIL_TEXT_COLUMNS[source]], *self._appended.get(source, [])]
+                )
+            return self._tables[source]
+
+    def append(self, table, text_df):
+        """
+        Add the detail text of rows appended to a store table.
+
+        Args:
+            table: Source table name (e.g. 'trends')
+            text_df: Detail text columns, indexed by the rows' store ids
+        """
+        with self._lock:
+            self._appended.setdefault(table, []).append(text_df)
+            if table in self._tables:
+                self._tables[table] = pd.concat([self._tables[table], text_df])
+
+    def get(self, table, row_id):
+        """
+        Fetch the detail text of one row.
+
+        Args:
+            table: Store table name
+            row_id: Row index label (kept by filtered frames)
+
+        Returns:
+            Dictionary of column -> text
+        """
+        if not detail_text_columns(table):
+            return {}
+        return self._text_table(table).loc[row_id].to_dict()
+
+    def lookup(self, table, row):
+        """
+        Detail text for a row of a hot frame, fetching only what the row lacks.
+
+        Args:
+            table: Store table name
+            row: Row Series from a store table (its name is the row id)
+
+        Returns:
+            Dictionary of column -> text
+        """
+        columns = detail_text_columns(table)
+        if all(column in row.index for column in columns):
+            return {column: row[column] for column in columns}
+        return self.get(table, row.name)
+
+
+def get_text_store():
+    """Return this process's DetailTextStore."""
+    global _text_store
+    with _store_lock:
+        if _text_store is None:
+            _text_store = DetailTextStore()
+        return _text_store
+
+
+def _descriptor_bytes(kind, payload):
+    if kind in ('array', 'category'):
+        return int(np.prod(payload.shape)) * np.dtype(payload.dtype).itemsize
+    if kind == 'text':
+        return sum(_descriptor_bytes('array', buffer) for buffer in payload if buffer is not None)
+    return 0
+
+
+def _process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        # os.kill cannot probe processes on this platform; trust the manifest
+        return True
+    return True
+
+
+def _creation_lock(name):
+    """Exclusive lock so concurrent processes build the store once."""
+    try:
+        import fcntl
+    except ImportError:
+        return None
+
+    handle = open(f"{_manifest_path(name)}.lock", 'w')
+    fcntl.flock(handle, fcntl.LOCK_EX)
+    return handle
+
+
+def get_store(name=None):
+    """
+    Return this process's view of the shared dataset store, creating it if needed.
+
+    Args:
+        name: Store name (default: AI_MAP_STORE_NAME or DEFAULT_STORE_NAME)
+
+    Returns:
+        DatasetStore
+    """
+    global _store
+    with _store_lock:
+        if _store is not None:
+            return _store
+
+        name = name or os.environ.get('AI_MAP_STORE_NAME', DEFAULT_STORE_NAME)
+        store = DatasetStore.attach(name)
+        if store is None:
+            lock = _creation_lock(name)
+            try:
+                # Another process may have finished building while we waited
+                store = DatasetStore.attach(name)
+                if store is None:
+                    try:
+                        store = DatasetStore.create(name)
+                    except OSError:
+                        store = DatasetStore.local(name)
+            finally:
+                if lock is not None:
+                    lock.close()
+
+        _store = store
+        return _store
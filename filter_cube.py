@@ -0,0 +1,152 @@
+"""
+Filter Cubes for AI Opportunity Map
+===================================
+
+Precomputed what-if answers for the sidebar filters, built once per dataset
+version:
+- A cube holds the row count and column sums of a table for every
+  combination of one categorical filter (time horizon, market size) and every
+  value of a threshold slider (minimum impact, minimum investment focus) on
+  the slider's own 0.1 grid
+- Cubes are evaluated from the sorted prefix sums in ``running_stats.py``,
+  one binary search per threshold, and can be re-evaluated after rows are
+  appended without re-sorting the table
+- The tab1 and tab2 metric rows and the filter sensitivity heatmaps read the
+  cube instead of re-filtering the frames; means are sums over counts
+
+Cube answers match the filtered frames. Values off the grid return None;
+callers then ask the running statistics directly.
+
+Usage:
+    cube = build_cube(tables['trends'], 'trends')
+    trend_cube_metrics(cube, 'Future Outlook (2027-2030)', 8.5)
+    cube_frame(cube, 'impact', mean=True)
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import traced
+from running_stats import RunningStats, trend_metric_row, opportunity_metric_row
+
+# Slider range and step shared by the minimum impact and investment filters
+THRESHOLD_MIN = 1.0
+THRESHOLD_MAX = 10.0
+THRESHOLD_STEP = 0.1
+
+
+def threshold_grid(start=THRESHOLD_MIN, stop=THRESHOLD_MAX, step=THRESHOLD_STEP):
+    """Slider values covered by a cube."""
+    return np.round(np.arange(start, stop + step / 2, step), 1)
+
+
+@traced('analytics.build_filter_cube')
+def cube_from_stats(stats, thresholds=None):
+    """
+    Evaluate running statistics at every filter group and threshold.
+
+    Args:
+        stats: RunningStats of the table
+        thresholds: Threshold values (default: threshold_grid())
+
+    Returns:
+        Dictionary with table, groups, thresholds, count and sums (arrays of
+        shape (groups, thresholds)) and total (whole-table count and sums)
+    """
+    thresholds = threshold_grid() if thresholds is None else np.asarray(thresholds)
+    rows = [stats.query(group, thresholds) for group in stats.groups]
+    return {
+        'table': stats.table,
+        'groups': list(stats.groups),
+        'thresholds': thresholds,
+        'count': np.stack([row['count'] for row in rows]),
+        'sums': {name: np.stack([row['sums'][name] for row in rows]) for name in rows[0]['sums']},
+        'total': stats.baseline()
+    }
+
+
+def build_cube(df, table, thresholds=None):
+    """
+    Count and sum a table for every filter group and threshold.
+
+    Args:
+        df: Table data
+        table: Key of running_stats.STATS_SPECS
+        thresholds: Threshold values (default: threshold_grid())
+
+    Returns:
+        Cube dictionary (see cube_from_stats)
+    """
+    return cube_from_stats(RunningStats(df, table), thresholds)
+
+
+def cube_cell(cube, group, threshold):
+    """
+    Count and sums of one filter combination.
+
+    Args:
+        cube: Output of build_cube
+        group: Categorical filter option
+        threshold: Threshold slider value
+
+    Returns:
+        Dictionary with count and sums, or None when the combination is not in the cube
+    """
+    if group not in cube['groups']:
+        return None
+    thresholds = cube['thresholds']
+    column = int(np.searchsorted(thresholds, threshold - THRESHOLD_STEP / 2))
+    if column >= len(thresholds) or not np.isclose(thresholds[column], threshold, rtol=0, atol=1e-9):
+        return None
+    row = cube['groups'].index(group)
+    return {
+        'count': int(cube['count'][row, column]),
+        'sums': {name: float(values[row, column]) for name, values in cube['sums'].items()}
+    }
+
+
+def trend_cube_metrics(cube, horizon="All", min_impact=1.0):
+    """
+    The tab1 metric row (same keys as service.trend_metrics) from a trends cube.
+
+    Returns:
+        Dictionary of metric name -> value, or None when off the grid
+    """
+    cell = cube_cell(cube, horizon, min_impact)
+    return trend_metric_row(cell, cube['total']) if cell else None
+
+
+def opportunity_cube_metrics(cube, market_size="All", min_investment=1.0):
+    """
+    The tab2 metric row (same keys as service.opportunity_metrics) from an opportunities cube.
+
+    Returns:
+        Dictionary of metric name -> value, or None when off the grid
+    """
+    cell = cube_cell(cube, market_size, min_investment)
+    return opportunity_metric_row(cell, cube['total']) if cell else None
+
+
+def cube_frame(cube, stat='count', mean=False):
+    """
+    One statistic over every filter combination, for heatmaps.
+
+    Args:
+        cube: Output of build_cube
+        stat: 'count' or a sum name from running_stats.STATS_SPECS
+        mean: Divide the sum by the count (empty cells become NaN)
+
+    Returns:
+        DataFrame indexed by group with one column per threshold
+    """
+    if stat == 'count':
+        values = cube['count']
+    else:
+        values = cube['sums'][stat]
+        if mean:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = np.where(cube['count'] > 0, values / cube['count'], np.nan)
+    return pd.DataFrame(values, index=cube['groups'], columns=cube['thresholds'])
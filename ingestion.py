@@ -0,0 +1,415 @@
+"""
+Streaming Ingestion for AI Opportunity Map
+==========================================
+
+Appends new trends and opportunities as they arrive, without editing
+``data_sources.py`` or rebuilding the dataset store:
+- Sources are polled for new records: a local JSON Lines file read from where
+  the last poll stopped, or an in-process queue standing in for a message
+  queue. Each record is one row plus a ``table`` key
+- Records are validated against SCHEMAS (required columns, numeric ranges,
+  known categories, market size labels) and cast to the store's dtypes;
+  rejected records are counted and their reasons kept for display
+- Valid rows are appended to the store table, and the derived opportunity
+  scores (risk score, risk level, opportunity score) are computed for the new
+  rows only, continuing the risk generator where the base rows left it, so
+  they equal what a full recompute would produce
+- Cluster labels for appended trends come from the nearest centroid of the
+  existing fit (``advanced_analytics.extend_clusters``), and the tab metric
+  rows pick up appended rows through ``RunningStats.sync``
+
+Appends are per process. Every process that tails the same file appends the
+same rows in the same order, so all of them converge on the same tables and
+version; the file is also what restores appended rows after a restart.
+
+Configuration:
+    AI_MAP_INGEST_FILE       JSON Lines file the dashboard tails for new rows
+    AI_MAP_INGEST_INTERVAL   Seconds between polls (default: 5)
+
+Usage:
+    echo '{"table": "trends", "Trend": "AI Chips", "Impact_Score": 8.1, ...}' >> new_rows.jsonl
+    AI_MAP_INGEST_FILE=new_rows.jsonl streamlit run app.py
+
+    python ingestion.py new_rows.jsonl    # validate a file without ingesting it
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import warnings
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import analytics_service as service
+from instrumentation import span
+from metrics import INGESTED_ROWS
+
+# Columns of each ingestible table. kind: 'text', 'number', 'integer' or
+# 'category' (categories come from the store table); optional bounds and pattern
+SCHEMAS = {
+    'trends': {
+        'Trend': {'kind': 'text'},
+        'Impact_Score': {'kind': 'number', 'min': 1, 'max': 10},
+        'Time_Horizon': {'kind': 'category'},
+        'Market_Size_Billion': {'kind': 'number', 'min': 0},
+        'Adoption_Rate': {'kind': 'integer', 'min': 0, 'max': 100},
+        'Description': {'kind': 'text'},
+        'Key_Players': {'kind': 'text'}
+    },
+    'opportunities': {
+        'Opportunity_Area': {'kind': 'text'},
+        'Market_Size_2025': {'kind': 'text', 'pattern': r'(Large|Medium) \(\$\d+B\+\)'},
+        'Growth_Rate_CAGR': {'kind': 'number', 'min': 0},
+        'Investment_Focus_Score': {'kind': 'number', 'min': 1, 'max': 10},
+        'Maturity_Level': {'kind': 'category'},
+        'Key_Challenges': {'kind': 'text'},
+        'Success_Factors': {'kind': 'text'},
+        'Related_Trends': {'kind': 'text'}
+    }
+}
+
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Rejection reasons kept for display (newest last)
+MAX_RECENT_ERRORS = 50
+
+
+class JsonLinesSource:
+    """Records appended to a local JSON Lines file, read from where the last poll stopped."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: File to tail; it may not exist yet and must only be appended to
+        """
+        self.path = path
+        self.offset = 0
+        self.line = 0
+
+    def poll(self):
+        """
+        Read the complete lines added since the last poll.
+
+        Returns:
+            List of record dictionaries (unparseable lines carry an '_error' key)
+        """
+        try:
+            with open(self.path, 'rb') as handle:
+                handle.seek(self.offset)
+                data = handle.read()
+        except FileNotFoundError:
+            return []
+
+        # A line still being written is left for the next poll
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+        records = []
+        for line in data[:end].splitlines():
+            self.line += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as error:
+                record = {'_error': f"line {self.line}: invalid JSON ({error.msg})"}
+            if not isinstance(record, dict):
+                record = {'_error': f"line {self.line}: expected a JSON object"}
+            records.append(record)
+        return records
+
+
+class QueueSource:
+    """Records put on an in-process queue, standing in for a message queue."""
+
+    def __init__(self, records=None):
+        """
+        Args:
+            records: queue.Queue to drain (default: a new one)
+        """
+        self.records = records or queue.Queue()
+
+    def put(self, table, row):
+        """Enqueue one row for ``table``."""
+        self.records.put({'table': table, **row})
+
+    def poll(self):
+        """
+        Take every record queued so far.
+
+        Returns:
+            List of record dictionaries
+        """
+        records = []
+        while True:
+            try:
+                records.append(self.records.get_nowait())
+            except queue.Empty:
+                return records
+
+
+def _record_problems(schema, record, reference):
+    """Reasons a record does not fit the schema (empty when it does)."""
+    problems = []
+    unknown = sorted(set(record) - set(schema))
+    if unknown:
+        problems.append(f"unknown columns {unknown}")
+
+    for column, rule in schema.items():
+        value = record.get(column)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            problems.append(f"missing {column}")
+            continue
+
+        kind = rule['kind']
+        if kind in ('number', 'integer'):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                problems.append(f"{column} must be a number")
+                continue
+            # NaN passes every range check and would poison the running totals
+            if not math.isfinite(value):
+                problems.append(f"{column} must be a finite number")
+                continue
+            # Appending casts to the stored dtype, which would wrap or truncate silently
+            dtype = reference[column].dtype
+            if (kind == 'integer' or dtype.kind in 'iu') and not float(value).is_integer():
+                problems.append(f"{column} must be a whole number")
+            if dtype.kind in 'iu':
+                bounds = np.iinfo(dtype)
+                if not bounds.min <= value <= bounds.max:
+                    problems.append(f"{column} is out of range")
+            elif abs(value) > np.finfo(dtype).max:
+                problems.append(f"{column} is out of range")
+            if 'min' in rule and value < rule['min']:
+                problems.append(f"{column} below {rule['min']}")
+            if 'max' in rule and value > rule['max']:
+                problems.append(f"{column} above {rule['max']}")
+        elif kind == 'category':
+            categories = reference[column].cat.categories
+            if not isinstance(value, str) or value not in categories:
+                problems.append(f"{column} must be one of {list(categories)}")
+        elif not isinstance(value, str):
+            problems.append(f"{column} must be text")
+        elif 'pattern' in rule and not re.fullmatch(rule['pattern'], value):
+            problems.append(f"{column} must look like 'Large ($285B+)'")
+    return problems
+
+
+def route_records(records):
+    """
+    Split records by their 'table' key.
+
+    Args:
+        records: List of record dictionaries
+
+    Returns:
+        Tuple (dictionary of table -> rows without the 'table' key, list of error strings)
+    """
+    by_table = {table: [] for table in SCHEMAS}
+    errors = []
+    for record in records:
+        table = record.get('table')
+        if '_error' in record:
+            errors.append(record['_error'])
+        elif not isinstance(table, str) or table not in SCHEMAS:
+            errors.append(f"unknown table {table!r}; expected one of {list(SCHEMAS)}")
+        else:
+            by_table[table].append({key: value for key, value in record.items() if key != 'table'})
+    return by_table, errors
+
+
+def validate_rows(table, records, reference):
+    """
+    Check records against a table's schema and cast the valid ones.
+
+    Args:
+        table: Key of SCHEMAS
+        records: List of row dictionaries (without the 'table' key)
+        reference: Current store table, for dtypes and categories
+
+    Returns:
+        Tuple (DataFrame of valid rows in the store's dtypes, list of error strings)
+    """
+    schema = SCHEMAS[table]
+    valid, errors = [], []
+    for position, record in enumerate(records):
+        try:
+            problems = _record_problems(schema, record, reference)
+        except (TypeError, ValueError, OverflowError) as error:
+            # One malformed record must not cost the rest of the batch
+            problems = [f"could not be validated ({error})"]
+        if problems:
+            name = record.get(next(iter(schema)))
+            if not isinstance(name, str) or not name:
+                name = f"record {position + 1}"
+            errors.append(f"{table} '{name}': {'; '.join(problems)}")
+        else:
+            valid.append(record)
+
+    rows = pd.DataFrame(valid, columns=list(schema))
+    dtypes = {column: reference[column].dtype for column in schema if column in reference.columns}
+    return rows.astype(dtypes), errors
+
+
+class StreamIngestor:
+    """Polls sources and appends validated rows to a dataset store."""
+
+    def __init__(self, store, sources, analytics_engine=None):
+        """
+        Args:
+            store: DatasetStore to append to
+            sources: Objects with a poll() method returning record dictionaries
+            analytics_engine: Optional AIMarketAnalytics instance for derived scores
+        """
+        self.store = store
+        self.sources = list(sources)
+        self.engine = service._engine(analytics_engine)
+        self.appended = {table: 0 for table in SCHEMAS}
+        self.rejected = 0
+        self.errors = deque(maxlen=MAX_RECENT_ERRORS)
+        self.last_poll = None
+        self._risk_state = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _reject(self, table, errors):
+        self.rejected += len(errors)
+        self.errors.extend(errors)
+        if errors:
+            INGESTED_ROWS.labels(table=table, outcome='rejected').inc(len(errors))
+
+    def _append_scores(self, opportunities):
+        """Score appended opportunities and append them to the derived scores table."""
+        if self._risk_state is None:
+            # Continue the risk generator after the rows scored when the store was built
+            self._risk_state = self.engine.risk_random_state(self.store.tables['opportunity_scores'])
+        scores = service.opportunity_scores(opportunities, self.engine, self._risk_state)
+        self.store.append('opportunity_scores', scores)
+
+    def ingest(self, records):
+        """
+        Validate records and append the valid ones.
+
+        Args:
+            records: List of record dictionaries, each with a 'table' key
+
+        Returns:
+            Dictionary with appended (rows per table) and rejected (count)
+        """
+        by_table, unroutable = route_records(records)
+        appended = {}
+        with self._lock, span('store.ingest', records=len(records)):
+            self._reject('unknown', unroutable)
+            for table, table_records in by_table.items():
+                if not table_records:
+                    continue
+                rows, errors = validate_rows(table, table_records, self.store.tables[table])
+                self._reject(table, errors)
+                if len(rows):
+                    stored = self.store.append(table, rows)
+                    if table == 'opportunities':
+                        self._append_scores(stored)
+                    self.appended[table] += len(rows)
+                    appended[table] = len(rows)
+                    INGESTED_ROWS.labels(table=table, outcome='appended').inc(len(rows))
+        return {'appended': appended, 'rejected': len(records) - sum(appended.values())}
+
+    def poll(self):
+        """
+        Read every source once and ingest what arrived.
+
+        Returns:
+            Output of ingest
+        """
+        records = []
+        for source in self.sources:
+            records.extend(source.poll())
+        self.last_poll = time.time()
+        return self.ingest(records) if records else {'appended': {}, 'rejected': 0}
+
+    def _run(self, interval):
+        while True:
+            try:
+                self.poll()
+            except Exception as error:  # keep polling after a bad batch
+                warnings.warn(f"Ingestion poll failed: {error}")
+            if self._stop.wait(interval):
+                return
+
+    def start(self, interval=DEFAULT_POLL_INTERVAL):
+        """Poll the sources from a background thread every ``interval`` seconds."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='ai-map-ingest', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def status(self):
+        """
+        Ingestion totals for display.
+
+        Returns:
+            Dictionary with appended (rows per table), rejected, errors (recent) and last_poll
+        """
+        return {
+            'appended': dict(self.appended),
+            'rejected': self.rejected,
+            'errors': list(self.errors),
+            'last_poll': self.last_poll
+        }
+
+
+def start_from_environment(store):
+    """
+    Tail AI_MAP_INGEST_FILE into ``store`` when it is set.
+
+    Args:
+        store: DatasetStore to append to
+
+    Returns:
+        Running StreamIngestor, or None when ingestion is not configured
+    """
+    path = os.environ.get('AI_MAP_INGEST_FILE')
+    if not path:
+        return None
+    interval = float(os.environ.get('AI_MAP_INGEST_INTERVAL', DEFAULT_POLL_INTERVAL))
+    return StreamIngestor(store, [JsonLinesSource(path)]).start(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate a JSON Lines file of new rows against the schemas')
+    parser.add_argument('path', help='JSON Lines file, one row per line with a "table" key')
+    args = parser.parse_args()
+
+    references = {table: service.load_table(table) for table in SCHEMAS}
+    by_table, errors = route_records(JsonLinesSource(args.path).poll())
+
+    for table, records in by_table.items():
+        rows, table_errors = validate_rows(table, records, references[table])
+        errors.extend(table_errors)
+        print(f"{table}: {len(rows)} valid, {len(table_errors)} rejected")
+    for error in errors:
+        print(f"  {error}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
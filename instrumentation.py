@@ -0,0 +1,450 @@
+"""
+Timing Spans for AI Opportunity Map
+===================================
+
+Lightweight instrumentation for the dashboard hot paths:
+- ``span(name)`` times a block and ``traced(name)`` times a function; both
+  record into the trace active in the current thread (or context) and cost
+  almost nothing when no trace is active
+- Spans nest: each one records its parent, so a rerun trace shows loaders,
+  filters, analytics methods and chart builds inside the tab that ran them
+- A finished trace exports to Chrome trace JSON (chrome://tracing, Perfetto)
+  or OpenTelemetry OTLP/JSON, and the app keeps one trace per rerun
+
+Span names are dotted by area: ``load.*``, ``store.*``, ``service.*``,
+``analytics.*``, ``chart.*``, ``render.*`` and ``tab.*``.
+
+Configuration:
+    AI_MAP_TRACE_DIR      Write every finished trace to this directory
+    AI_MAP_TRACE_FORMAT   'chrome' (default) or 'otel'
+
+Dashboard reruns go through ``begin_rerun``/``end_rerun``, which also start
+and stop the rerun profile when profiling is enabled.
+
+Usage:
+    trace = start_trace('rerun')
+    with span('load.trends', rows=15):
+        ...
+    finish_trace(trace)
+    export_trace(trace, 'rerun.json')
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_FORMATS = ('chrome', 'otel')
+
+# Finished traces kept in memory for inspection (newest last)
+MAX_RECENT_TRACES = 20
+
+SERVICE_NAME = 'ai-opportunity-map'
+
+_current_trace = contextvars.ContextVar('ai_map_trace', default=None)
+_current_span = contextvars.ContextVar('ai_map_span', default=None)
+
+recent_traces = deque(maxlen=MAX_RECENT_TRACES)
+
+# Functions of a span name returning a context manager to run around the span
+# (or None); profiling.py registers one to capture profiles per call site
+_span_hooks = []
+
+# Functions called with the trace of every finished rerun (see end_rerun);
+# metrics.py registers one to export rerun durations
+_rerun_hooks = []
+
+
+class Trace:
+    """Spans recorded for one unit of work, such as one dashboard rerun."""
+
+    def __init__(self, name, attributes=None):
+        """
+        Args:
+            name: Trace name, also recorded as the root span
+            attributes: Optional dictionary of attributes for the root span
+        """
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.attributes = dict(attributes or {})
+        self.spans = []
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._origin = time.perf_counter_ns()
+        self.root_id = os.urandom(8).hex()
+        self.thread = threading.get_ident()
+
+    def _now(self):
+        # Monotonic offsets anchored to the wall-clock start of the trace
+        return self.start_ns + (time.perf_counter_ns() - self._origin)
+
+    @property
+    def duration_ms(self):
+        end_ns = self.end_ns if self.end_ns is not None else self._now()
+        return (end_ns - self.start_ns) / 1e6
+
+    def span_table(self):
+        """
+        Flatten the spans for display.
+
+        Returns:
+            List of dictionaries with Span, Depth, Start_ms and Duration_ms, in start order
+        """
+        depth = {self.root_id: 0}
+        rows = []
+        for record in sorted(self.spans, key=lambda record: record['start_ns']):
+            depth[record['span_id']] = depth.get(record['parent_id'], 0) + 1
+            rows.append({
+                'Span': record['name'],
+                'Depth': depth[record['span_id']],
+                'Start_ms': (record['start_ns'] - self.start_ns) / 1e6,
+                'Duration_ms': (record['end_ns'] - record['start_ns']) / 1e6
+            })
+        return rows
+
+    def totals(self):
+        """
+        Total time and call count per span name.
+
+        Returns:
+            Dictionary of span name -> {'calls', 'total_ms'}
+        """
+        totals = {}
+        for record in self.spans:
+            entry = totals.setdefault(record['name'], {'calls': 0, 'total_ms': 0.0})
+            entry['calls'] += 1
+            entry['total_ms'] += (record['end_ns'] - record['start_ns']) / 1e6
+        return totals
+
+
+def start_trace(name, **attributes):
+    """
+    Start a trace and make it current for this thread or context.
+
+    Args:
+        name: Trace name
+        **attributes: Attributes recorded on the root span
+
+    Returns:
+        Trace
+    """
+    trace = Trace(name, attributes)
+    _current_trace.set(trace)
+    _current_span.set(trace.root_id)
+    return trace
+
+
+def finish_trace(trace):
+    """
+    End a trace, keep it in recent_traces and export it if AI_MAP_TRACE_DIR is set.
+
+    Args:
+        trace: Trace from start_trace
+
+    Returns:
+        The trace
+    """
+    if trace.end_ns is None:
+        trace.end_ns = trace._now()
+        recent_traces.append(trace)
+
+        directory = os.environ.get('AI_MAP_TRACE_DIR')
+        if directory:
+            trace_format = os.environ.get('AI_MAP_TRACE_FORMAT', 'chrome')
+            os.makedirs(directory, exist_ok=True)
+            export_trace(trace, os.path.join(directory, f"{trace.name}-{trace.trace_id[:16]}.json"), trace_format)
+
+    if _current_trace.get() is trace:
+        _current_trace.set(None)
+        _current_span.set(None)
+    return trace
+
+
+class Rerun:
+    """Trace and requested profiles of one dashboard script run (see begin_rerun)."""
+
+    def __init__(self, trace, profiles, profile):
+        self.trace = trace
+        # Captures requested for this run, filled in as profiles stop
+        self.profiles = profiles
+        self._profile = profile
+        self.finished = False
+
+
+def begin_rerun(profile=None, profiler=None):
+    """
+    Start the trace of one dashboard rerun, and its profiles when profiling is enabled.
+
+    Args:
+        profile: Call sites to profile on this rerun (the ``?profile=`` query parameter)
+        profiler: 'cprofile' or 'sampling' (the ``?profiler=`` query parameter)
+
+    Returns:
+        Rerun to pass to end_rerun
+    """
+    trace = start_trace('rerun')
+    profiles = []
+    handle = None
+    # Query parameters are ignored unless profiling is enabled for the process
+    if PROFILING_ENABLED:
+        profiles = profiling.request_profiles(profile, profiler if profiler in profiling.PROFILERS else None)
+        handle = profiling.start_profile('rerun') if profiling.wants('rerun') else None
+    return Rerun(trace, profiles, handle)
+
+
+def end_rerun(rerun):
+    """
+    Stop the rerun profile, finish the trace and run the rerun hooks, once.
+
+    Call it at the end of the script and before ``st.rerun()``; later calls
+    do nothing.
+
+    Args:
+        rerun: Rerun from begin_rerun
+
+    Returns:
+        The rerun's trace
+    """
+    if not rerun.finished:
+        rerun.finished = True
+        if rerun._profile is not None:
+            profiling.stop_profile(rerun._profile)
+        finish_trace(rerun.trace)
+        for hook in _rerun_hooks:
+            hook(rerun.trace)
+    return rerun.trace
+
+
+def add_rerun_hook(hook):
+    """
+    Call a function with the trace of every rerun finished by end_rerun.
+
+    Args:
+        hook: Function of the finished Trace
+    """
+    _rerun_hooks.append(hook)
+
+
+def current_trace():
+    """Return the active trace, or None."""
+    return _current_trace.get()
+
+
+def add_span_hook(hook):
+    """
+    Run extra context managers around spans, with or without an active trace.
+
+    Args:
+        hook: Function of the span name returning a context manager or None
+    """
+    _span_hooks.append(hook)
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Time a block as a child of the current span.
+
+    Args:
+        name: Span name, e.g. 'analytics.perform_trend_clustering'
+        **attributes: Attributes recorded with the span (numbers and strings)
+
+    Yields:
+        Dictionary of attributes; add entries to record values known only at the end
+    """
+    with contextlib.ExitStack() as hooks:
+        for hook in _span_hooks:
+            context = hook(name)
+            if context is not None:
+                hooks.enter_context(context)
+        with _record_span(name, attributes):
+            yield attributes
+
+
+@contextlib.contextmanager
+def _record_span(name, attributes):
+    trace = _current_trace.get()
+    if trace is None or trace.end_ns is not None:
+        yield
+        return
+
+    span_id = os.urandom(8).hex()
+    parent_id = _current_span.get()
+    token = _current_span.set(span_id)
+    start_ns = trace._now()
+    error = None
+    try:
+        yield
+    except BaseException as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        end_ns = trace._now()
+        _current_span.reset(token)
+        if error is not None:
+            attributes['error'] = error
+        trace.spans.append({
+            'name': name,
+            'span_id': span_id,
+            'parent_id': parent_id,
+            'start_ns': start_ns,
+            'end_ns': end_ns,
+            'thread': threading.get_ident(),
+            'attributes': attributes
+        })
+
+
+def traced(name):
+    """
+    Decorator that records each call of a function as a span.
+
+    Args:
+        name: Span name
+
+    Returns:
+        Decorator
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None and not _span_hooks:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def to_chrome_trace(trace):
+    """
+    Convert a trace to the Chrome trace event format.
+
+    Args:
+        trace: Finished Trace
+
+    Returns:
+        Dictionary with 'traceEvents' (complete 'X' events, microseconds)
+    """
+    pid = os.getpid()
+    end_ns = trace.end_ns if trace.end_ns is not None else trace._now()
+    events = [{
+        'name': trace.name, 'cat': 'trace', 'ph': 'X', 'pid': pid, 'tid': trace.thread,
+        'ts': trace.start_ns / 1e3, 'dur': (end_ns - trace.start_ns) / 1e3,
+        'args': {**trace.attributes, 'trace_id': trace.trace_id}
+    }]
+    for record in trace.spans:
+        events.append({
+            'name': record['name'],
+            'cat': record['name'].split('.', 1)[0],
+            'ph': 'X',
+            'pid': pid,
+            'tid': record['thread'],
+            'ts': record['start_ns'] / 1e3,
+            'dur': (record['end_ns'] - record['start_ns']) / 1e3,
+            'args': record['attributes']
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def _otel_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otel_attributes(attributes):
+    return [{'key': key, 'value': _otel_value(value)} for key, value in attributes.items()]
+
+
+def to_otel_json(trace):
+    """
+    Convert a trace to OpenTelemetry OTLP/JSON (the body of a /v1/traces export).
+
+    Args:
+        trace: Finished Trace
+
+    Returns:
+        Dictionary with 'resourceSpans'
+    """
+    end_ns = trace.end_ns if trace.end_ns is not None else trace._now()
+    spans = [{
+        'traceId': trace.trace_id,
+        'spanId': trace.root_id,
+        'name': trace.name,
+        'kind': 1,
+        'startTimeUnixNano': str(trace.start_ns),
+        'endTimeUnixNano': str(end_ns),
+        'attributes': _otel_attributes(trace.attributes)
+    }]
+    for record in trace.spans:
+        spans.append({
+            'traceId': trace.trace_id,
+            'spanId': record['span_id'],
+            'parentSpanId': record['parent_id'],
+            'name': record['name'],
+            'kind': 1,
+            'startTimeUnixNano': str(record['start_ns']),
+            'endTimeUnixNano': str(record['end_ns']),
+            'attributes': _otel_attributes({**record['attributes'], 'thread.id': record['thread']}),
+            'status': {'code': 2, 'message': record['attributes']['error']} if 'error' in record['attributes'] else {}
+        })
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otel_attributes({'service.name': SERVICE_NAME, 'process.pid': os.getpid()})},
+            'scopeSpans': [{'scope': {'name': 'instrumentation'}, 'spans': spans}]
+        }]
+    }
+
+
+def trace_json(trace, format='chrome'):
+    """
+    Serialize a trace.
+
+    Args:
+        trace: Trace
+        format: 'chrome' or 'otel'
+
+    Returns:
+        JSON string
+    """
+    if format not in TRACE_FORMATS:
+        raise ValueError(f"Unknown trace format {format!r}; expected one of {TRACE_FORMATS}")
+    payload = to_chrome_trace(trace) if format == 'chrome' else to_otel_json(trace)
+    return json.dumps(payload, default=str)
+
+
+def export_trace(trace, path, format='chrome'):
+    """
+    Write a trace to a local JSON file.
+
+    Args:
+        trace: Trace
+        path: Output file path
+        format: 'chrome' or 'otel'
+
+    Returns:
+        The path
+    """
+    with open(path, 'w') as handle:
+        handle.write(trace_json(trace, format))
+    return path
+
+
+# Profiling is opt-in per process: AI_MAP_PROFILE names call sites to profile,
+# AI_MAP_PROFILING=1 only lets dashboard sessions ask for captures with ?profile=
+PROFILING_ENABLED = bool(os.environ.get('AI_MAP_PROFILE')) or os.environ.get('AI_MAP_PROFILING') == '1'
+
+# Profiling hooks into the spans only when enabled
+if PROFILING_ENABLED:
+    import profiling  # noqa: E402,F401
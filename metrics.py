@@ -0,0 +1,390 @@
+"""
+Prometheus Metrics for AI Opportunity Map
+=========================================
+
+Process-wide counters and histograms that show whether caching and
+coalescing work under real load, exposed in the Prometheus text format:
+- Cache hits and misses per cached function (Streamlit caches, the analytics
+  executor's result memo) and single-flight leaders vs shared callers
+- KMeans fit counts and durations, loader durations, analytics durations
+- Dashboard reruns, renders and time per tab, and figure payload sizes
+- API requests per endpoint, computed vs coalesced
+- Streamed rows appended or rejected per table
+
+Durations come from the timing spans in ``instrumentation.py``: once a
+process exports metrics (``enable_collection``), this module hooks into every
+span, so no call site is timed twice. Metrics are per process; scrape each
+Streamlit or API process separately.
+
+Serving:
+    AI_MAP_METRICS_PORT   When set, the dashboard serves /metrics on this port
+                          (AI_MAP_METRICS_HOST, default 127.0.0.1)
+    api_server.py         Always serves /metrics next to its other endpoints
+
+Usage:
+    CACHE_REQUESTS.labels(function='get_clustered_trends', result='hit').inc()
+    print(render())
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import contextlib
+import functools
+import os
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import add_rerun_hook, add_span_hook
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base for labelled metrics; one child per combination of label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def labels(self, **labels):
+        """Return the child for one combination of label values."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _unlabelled(self):
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = sorted(self._children.items())
+        for key, child in children:
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._unlabelled().inc(amount)
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_number(child.value)}"]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[index] += 1
+                    break
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        """
+        Args:
+            name: Metric name
+            documentation: HELP text
+            labelnames: Names of the labels every sample carries
+            buckets: Upper bounds of the buckets (+Inf is added)
+        """
+        self.buckets = tuple(buckets) + (float('inf'),)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._unlabelled().observe(value)
+
+    def _samples(self, key, child):
+        with child._lock:
+            counts, count, total = list(child.counts), child.count, child.sum
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _label_text(self.labelnames, key, [('le', _number(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _label_text(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_number(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# --- Dashboard metrics ---
+
+CACHE_REQUESTS = Counter(
+    'ai_map_cache_requests_total', 'Cached function calls by result (hit or miss)', ('function', 'result'))
+SINGLE_FLIGHT_CALLS = Counter(
+    'ai_map_single_flight_calls_total', 'Coalesced computations by role (leader computes, shared waits)',
+    ('function', 'role'))
+KMEANS_FITS = Counter('ai_map_kmeans_fits_total', 'KMeans fits performed')
+KMEANS_SECONDS = Histogram('ai_map_kmeans_fit_seconds', 'Duration of each KMeans fit')
+LOADER_SECONDS = Histogram('ai_map_loader_seconds', 'Duration of each table load', ('table',))
+ANALYTICS_SECONDS = Histogram(
+    'ai_map_analytics_seconds', 'Duration of analytics and service calls', ('function',))
+CHART_SECONDS = Histogram('ai_map_chart_seconds', 'Duration of chart builds and renders', ('chart',))
+RERUNS = Counter('ai_map_reruns_total', 'Dashboard script reruns')
+RERUN_SECONDS = Histogram('ai_map_rerun_seconds', 'Duration of each dashboard rerun')
+TAB_RENDERS = Counter('ai_map_tab_renders_total', 'Dashboard tab renders', ('tab',))
+TAB_SECONDS = Histogram('ai_map_tab_seconds', 'Time spent rendering each tab', ('tab',))
+FIGURE_PAYLOAD_BYTES = Histogram(
+    'ai_map_figure_payload_bytes', 'Serialized size of each chart sent to the browser', ('chart',), BYTE_BUCKETS)
+API_REQUESTS = Counter(
+    'ai_map_api_requests_total', 'API requests by endpoint and outcome (computed, coalesced, error)',
+    ('path', 'outcome'))
+INGESTED_ROWS = Counter(
+    'ai_map_ingested_rows_total', 'Streamed rows by table and outcome (appended or rejected)', ('table', 'outcome'))
+
+
+def render():
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Returns:
+        Exposition text
+    """
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def record_cache(function, hit):
+    """Count one call of a cached function."""
+    CACHE_REQUESTS.labels(function=function, result='hit' if hit else 'miss').inc()
+
+
+def cache_metrics(function, cache_decorator):
+    """
+    Apply a caching decorator and count its hits and misses.
+
+    The wrapped function only runs on a miss, so a call that returns without
+    running it was a hit. Works with ``st.cache_data``, ``st.cache_resource``
+    and ``functools.lru_cache``.
+
+    Args:
+        function: Name reported in the ``function`` label
+        cache_decorator: Decorator that adds the cache
+
+    Returns:
+        Decorator
+    """
+    def decorator(fn):
+        state = threading.local()
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            state.missed = True
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            state.missed = False
+            result = cached(*args, **kwargs)
+            record_cache(function, not state.missed)
+            return result
+
+        wrapper.clear = getattr(cached, 'clear', None)
+        return wrapper
+    return decorator
+
+
+def record_rerun(trace):
+    """Count a finished dashboard rerun and observe its duration."""
+    RERUNS.inc()
+    RERUN_SECONDS.observe(trace.duration_ms / 1000)
+
+
+@contextlib.contextmanager
+def _timed(observe):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(time.perf_counter() - start)
+
+
+def _kmeans_fit(seconds):
+    KMEANS_FITS.inc()
+    KMEANS_SECONDS.observe(seconds)
+
+
+def _tab(tab, seconds):
+    TAB_RENDERS.labels(tab=tab).inc()
+    TAB_SECONDS.labels(tab=tab).observe(seconds)
+
+
+def _span_hook(name):
+    area, _, rest = name.partition('.')
+    if name == 'analytics.kmeans_fit':
+        return _timed(_kmeans_fit)
+    if area == 'load':
+        return _timed(LOADER_SECONDS.labels(table=rest).observe)
+    if area in ('analytics', 'service'):
+        return _timed(ANALYTICS_SECONDS.labels(function=rest).observe)
+    if area in ('chart', 'render'):
+        return _timed(CHART_SECONDS.labels(chart=name).observe)
+    if area == 'tab':
+        return _timed(functools.partial(_tab, rest))
+    return None
+
+
+add_rerun_hook(record_rerun)
+
+_collecting = False
+_collecting_lock = threading.Lock()
+
+
+def enable_collection():
+    """
+    Time spans for the loader, analytics, chart and tab metrics from now on.
+
+    Only processes that export metrics turn this on (serve_metrics and the
+    HTTP API), so elsewhere ``traced`` functions keep their fast path when no
+    trace is active. Safe to call more than once.
+    """
+    global _collecting
+    if _collecting:
+        return
+    with _collecting_lock:
+        if not _collecting:
+            _collecting = True
+            add_span_hook(_span_hook)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0].rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_error = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port=None, host=None):
+    """
+    Serve /metrics from a background thread, once per process.
+
+    Args:
+        port: TCP port (default: AI_MAP_METRICS_PORT)
+        host: Bind address (default: AI_MAP_METRICS_HOST or 127.0.0.1)
+
+    Returns:
+        The HTTP server, or None when no port is configured or it cannot be bound
+    """
+    global _server, _server_error
+    with _server_lock:
+        if _server is not None or _server_error is not None:
+            return _server
+        port = port or os.environ.get('AI_MAP_METRICS_PORT')
+        if not port:
+            return None
+        host = host or os.environ.get('AI_MAP_METRICS_HOST', '127.0.0.1')
+        try:
+            _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+        except OSError as error:
+            # Another process already serves this port; keep the dashboard running
+            _server_error = error
+            warnings.warn(f"Metrics endpoint not started on {host}:{port}: {error}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name='ai-map-metrics', daemon=True).start()
+        enable_collection()
+        return _server
+
+
+def metrics_served():
+    """Whether this process serves /metrics (so per-rerun extras are worth measuring)."""
+    return _server is not None
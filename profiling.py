@@ -0,0 +1,349 @@
+"""
+Opt-In Profiling for AI Opportunity Map
+=======================================
+
+Captures a cProfile or sampling profile of one call site on demand, without
+code changes:
+- Call sites are the timing spans from ``instrumentation.py`` (for example
+  ``analytics.perform_trend_clustering`` or ``chart.*``) plus ``rerun`` for a
+  whole dashboard rerun; targets are matched as shell-style patterns
+- Targets come from the ``AI_MAP_PROFILE`` environment variable for every
+  call in the process, or from the ``?profile=`` query parameter for the
+  reruns of one browser session. The dashboard only honours the query
+  parameter, and only imports this module, when profiling is enabled
+  (``instrumentation.PROFILING_ENABLED``)
+- Each capture is saved under ``<profile dir>/<call site>/`` (``.prof`` files
+  load in pstats and snakeviz, ``.folded`` files in flame graph tools) and its
+  top-N functions by cumulative time are kept for display in the app
+- Nested targets are skipped while a profile is running, so one capture
+  never disturbs another. Only one cProfile capture runs per process at a
+  time (Python 3.12+ refuses a second one); concurrent sessions fall back to
+  the sampling profiler
+
+Configuration:
+    AI_MAP_PROFILE       Comma-separated call sites to profile, e.g.
+                         'analytics.calculate_investment_risk_score,rerun'
+    AI_MAP_PROFILING     '1' to allow ?profile= in the dashboard without
+                         profiling anything process-wide
+    AI_MAP_PROFILER      'cprofile' (default) or 'sampling'
+    AI_MAP_PROFILE_DIR   Where captures are saved (default: <tmp>/ai_map_profiles)
+    AI_MAP_PROFILE_TOP   Functions kept per capture (default: 20)
+
+Usage:
+    http://localhost:8501/?profile=rerun
+    http://localhost:8501/?profile=analytics.*&profiler=sampling
+
+    with profile_site('batch.scoring'):
+        ...
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import contextlib
+import contextvars
+import fnmatch
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from instrumentation import add_span_hook
+
+PROFILERS = ('cprofile', 'sampling')
+
+DEFAULT_TOP_N = 20
+
+# Seconds between stack samples in sampling mode
+SAMPLE_INTERVAL = 0.005
+
+# Captures kept in memory across all sessions (newest last)
+MAX_RECENT_PROFILES = 50
+
+# Span and profiler plumbing is left out of the top-N tables
+_PLUMBING_FILES = ('instrumentation.py', 'profiling.py', 'contextlib.py')
+
+_request = contextvars.ContextVar('ai_map_profile_request', default=None)
+_active = contextvars.ContextVar('ai_map_profile_active', default=None)
+
+recent_profiles = deque(maxlen=MAX_RECENT_PROFILES)
+
+# cProfile is process-wide on Python 3.12+ (sys.monitoring), so captures take turns
+_cprofile_lock = threading.Lock()
+
+
+def _split_targets(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [target.strip() for target in value if target and target.strip()]
+
+
+def profile_directory():
+    """Directory captures are saved under."""
+    return os.environ.get('AI_MAP_PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'ai_map_profiles')
+
+
+def request_profiles(targets=None, profiler=None):
+    """
+    Set the call sites to profile in this thread or context (e.g. one rerun).
+
+    Targets from AI_MAP_PROFILE always apply; ``targets`` adds to them.
+
+    Args:
+        targets: Call site patterns, as a list or comma-separated string
+        profiler: 'cprofile' or 'sampling' (default: AI_MAP_PROFILER)
+
+    Returns:
+        List that receives a result dictionary for every capture made in this context
+    """
+    profiler = profiler or os.environ.get('AI_MAP_PROFILER', 'cprofile')
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}; expected one of {PROFILERS}")
+
+    # A capture left running by an interrupted request (e.g. st.rerun) is dropped
+    abandoned = _active.get()
+    if abandoned is not None:
+        _disable(abandoned)
+        _active.set(None)
+
+    request = {
+        'targets': _split_targets(os.environ.get('AI_MAP_PROFILE')) + _split_targets(targets),
+        'profiler': profiler,
+        'results': []
+    }
+    _request.set(request)
+    return request['results']
+
+
+def _current_request():
+    request = _request.get()
+    if request is None:
+        # Outside an explicit request only the environment applies
+        request = {
+            'targets': _split_targets(os.environ.get('AI_MAP_PROFILE')),
+            'profiler': os.environ.get('AI_MAP_PROFILER', 'cprofile'),
+            'results': None
+        }
+    return request
+
+
+def wants(site):
+    """Whether ``site`` is currently a profiling target."""
+    targets = _current_request()['targets']
+    return any(fnmatch.fnmatchcase(site, target) for target in targets)
+
+
+class _Sampler:
+    """Samples one thread's Python stack on a background thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        # Frames already on the stack when sampling starts are cut from every
+        # sample; holding them keeps their ids from being reused meanwhile
+        self._outer_frames = []
+        self._outer_ids = set()
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='ai-map-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and id(frame) not in self._outer_ids:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def enable(self):
+        frame = sys._getframe()
+        while frame is not None:
+            self._outer_frames.append(frame)
+            frame = frame.f_back
+        self._outer_ids = {id(frame) for frame in self._outer_frames}
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+        self._outer_frames = []
+
+
+def _is_plumbing(function):
+    return os.path.basename(function[0]) in _PLUMBING_FILES
+
+
+def _function_label(filename, line, name):
+    if filename == '~':
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def _cprofile_top(profile, top_n):
+    import pstats
+
+    stats = pstats.Stats(profile).stats
+    entries = sorted(
+        ((function, entry) for function, entry in stats.items() if not _is_plumbing(function)),
+        key=lambda item: item[1][3],
+        reverse=True
+    )[:top_n]
+    return [{
+        'Function': _function_label(*function),
+        'Calls': int(calls),
+        'Self_s': float(own_time),
+        'Cumulative_s': float(cumulative)
+    } for function, (_, calls, own_time, cumulative, _) in entries]
+
+
+def _sampling_top(sampler, top_n):
+    cumulative, own = Counter(), Counter()
+    for stack, count in sampler.stacks.items():
+        for function in set(stack):
+            cumulative[function] += count
+        own[stack[-1]] += count
+    return [{
+        'Function': _function_label(*function),
+        'Samples': count,
+        'Self_s': own[function] * sampler.interval,
+        'Cumulative_s': count * sampler.interval
+    } for function, count in cumulative.most_common() if not _is_plumbing(function)][:top_n]
+
+
+def _save(site, profiler, collector):
+    directory = os.path.join(profile_directory(), re.sub(r'[^\w.\-]+', '_', site))
+    os.makedirs(directory, exist_ok=True)
+    stem = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}"
+
+    if profiler == 'cprofile':
+        path = os.path.join(directory, f"{stem}.prof")
+        collector.dump_stats(path)
+    else:
+        # Collapsed stacks: 'outer;inner;leaf <count>' per line
+        path = os.path.join(directory, f"{stem}.folded")
+        with open(path, 'w') as handle:
+            for stack, count in collector.stacks.items():
+                handle.write(';'.join(_function_label(*function) for function in stack) + f" {count}\n")
+    return path
+
+
+def _start_cprofile():
+    """An enabled cProfile collector, or None when another capture holds the profiler."""
+    import cProfile
+
+    if not _cprofile_lock.acquire(blocking=False):
+        return None
+    collector = cProfile.Profile()
+    try:
+        collector.enable()
+    except ValueError:
+        # Another tool (a debugger, coverage) already owns the profiling hook
+        _cprofile_lock.release()
+        return None
+    return collector
+
+
+def _disable(handle):
+    handle['collector'].disable()
+    if handle['profiler'] == 'cprofile':
+        _cprofile_lock.release()
+
+
+def start_profile(site, profiler=None):
+    """
+    Begin profiling the current thread for ``site``.
+
+    Args:
+        site: Call site name the capture is saved under
+        profiler: 'cprofile' or 'sampling' (default: the current request's);
+            cprofile falls back to sampling while another cProfile capture runs
+
+    Returns:
+        Handle for stop_profile, or None if a profile is already running here
+    """
+    if _active.get():
+        return None
+    profiler = profiler or _current_request()['profiler']
+
+    collector = _start_cprofile() if profiler == 'cprofile' else None
+    if collector is None:
+        profiler = 'sampling'
+        collector = _Sampler(threading.get_ident())
+        collector.enable()
+
+    handle = {'site': site, 'profiler': profiler, 'collector': collector}
+    handle['token'] = _active.set(handle)
+    handle['start'] = time.perf_counter()
+    return handle
+
+
+def stop_profile(handle, top_n=None):
+    """
+    Finish a capture, save it and record its top functions.
+
+    Args:
+        handle: Return value of start_profile (None is ignored)
+        top_n: Functions to keep (default: AI_MAP_PROFILE_TOP or DEFAULT_TOP_N)
+
+    Returns:
+        Dictionary with site, profiler, seconds, path and top, or None
+    """
+    if handle is None:
+        return None
+    collector = handle['collector']
+    _disable(handle)
+    seconds = time.perf_counter() - handle['start']
+    _active.reset(handle['token'])
+
+    top_n = top_n or int(os.environ.get('AI_MAP_PROFILE_TOP', DEFAULT_TOP_N))
+    top = _cprofile_top(collector, top_n) if handle['profiler'] == 'cprofile' else _sampling_top(collector, top_n)
+    result = {
+        'site': handle['site'],
+        'profiler': handle['profiler'],
+        'seconds': seconds,
+        'path': _save(handle['site'], handle['profiler'], collector),
+        'top': top
+    }
+
+    recent_profiles.append(result)
+    results = _current_request()['results']
+    if results is not None:
+        results.append(result)
+    return result
+
+
+@contextlib.contextmanager
+def profile_site(site, profiler=None):
+    """
+    Profile a block as call site ``site``.
+
+    Args:
+        site: Call site name
+        profiler: 'cprofile' or 'sampling'
+
+    Yields:
+        The handle (None when another profile is already running)
+    """
+    handle = start_profile(site, profiler)
+    try:
+        yield handle
+    finally:
+        stop_profile(handle)
+
+
+def _span_hook(name):
+    if _active.get() or not wants(name):
+        return None
+    return profile_site(name)
+
+
+add_span_hook(_span_hook)
@@ -0,0 +1,262 @@
+"""
+Running Statistics for AI Opportunity Map
+=========================================
+
+Filtered counts, sums and means without filtering, for the tab metric rows:
+- Each filter group (time horizon, market size) keeps its rows sorted by the
+  threshold column (minimum impact, minimum investment focus) with prefix
+  sums of the summed columns, so count, sum and mean above any threshold take
+  one binary search: O(log n)
+- Whole-table baselines (the "vs all" averages) are kept as running totals
+  and never recomputed from the frame
+- Appended rows go to a small sorted delta block per group and the totals are
+  updated in place; the delta is merged into the main block once it exceeds
+  MERGE_FRACTION of it, so appends cost amortized O(k log n) and queries
+  search both blocks
+
+Thresholds are compared in the column's own dtype, exactly as the filters in
+``analytics_service.py`` compare them, so answers match the filtered frames.
+
+Usage:
+    stats = RunningStats(tables['trends'], 'trends')
+    trend_metric_row(stats.cell('All', 8.25), stats.baseline())
+    stats.append(new_trends)
+    stats.sync(tables['trends'])    # append whatever the table gained since
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import threading
+
+import numpy as np
+
+import analytics_service as service
+
+# table -> threshold column, categorical filter options and their masks, and
+# the sums kept per row (name -> column, or function of the table)
+STATS_SPECS = {
+    'trends': {
+        'threshold_column': 'Impact_Score',
+        'groups': service.TIME_HORIZONS,
+        'group_mask': service.horizon_mask,
+        'sums': {
+            'impact': 'Impact_Score',
+            'market_billion': 'Market_Size_Billion',
+            'adoption': 'Adoption_Rate'
+        }
+    },
+    'opportunities': {
+        'threshold_column': 'Investment_Focus_Score',
+        'groups': service.MARKET_SIZE_FILTERS,
+        'group_mask': service.market_size_mask,
+        'sums': {
+            'investment_focus': 'Investment_Focus_Score',
+            'growth_rate': 'Growth_Rate_CAGR',
+            'high_focus': lambda df: df['Investment_Focus_Score'] >= service.HIGH_FOCUS_SCORE
+        }
+    }
+}
+
+# The delta block is merged into the main block once it holds this share of its rows
+MERGE_FRACTION = 0.1
+
+# ...or at least this many rows, so small tables do not merge on every append
+MIN_MERGE_ROWS = 256
+
+
+def _block(values, columns):
+    """Rows sorted by threshold value, with prefix sums of every summed column."""
+    order = np.argsort(values, kind='stable')
+    columns = {name: column[order] for name, column in columns.items()}
+    return {
+        'values': values[order],
+        'columns': columns,
+        'prefix': {name: np.concatenate(([0.0], np.cumsum(column))) for name, column in columns.items()}
+    }
+
+
+def _block_query(block, cutoffs):
+    """Count and sums of the block's rows at or above each cutoff."""
+    first = np.searchsorted(block['values'], cutoffs, side='left')
+    count = len(block['values']) - first
+    sums = {name: prefix[-1] - prefix[first] for name, prefix in block['prefix'].items()}
+    return count, sums
+
+
+class RunningStats:
+    """Threshold-filtered counts and sums of one table, per filter group, with appends."""
+
+    def __init__(self, df, table):
+        """
+        Args:
+            df: Table data
+            table: Key of STATS_SPECS
+        """
+        self.table = table
+        self.spec = STATS_SPECS[table]
+        self.groups = list(self.spec['groups'])
+        values, columns = self._columns(df)
+        self.dtype = values.dtype
+        self._lock = threading.Lock()
+        self._main = {}
+        self._delta = {}
+        for group, in_group in self._group_masks(df):
+            self._main[group] = _block(values[in_group], {name: column[in_group] for name, column in columns.items()})
+            self._delta[group] = _block(values[:0], {name: column[:0] for name, column in columns.items()})
+        self._total = {'count': len(df), 'sums': {name: float(column.sum()) for name, column in columns.items()}}
+        self.appended_rows = 0
+
+    def _columns(self, df):
+        values = df[self.spec['threshold_column']].to_numpy()
+        columns = {}
+        for name, source in self.spec['sums'].items():
+            column = source(df) if callable(source) else df[source]
+            columns[name] = np.asarray(column, dtype=np.float64)
+        return values, columns
+
+    def _group_masks(self, df):
+        for group in self.groups:
+            yield group, np.asarray(self.spec['group_mask'](df, group), dtype=bool)
+
+    def append(self, rows_df):
+        """
+        Add rows without rebuilding the sorted blocks.
+
+        Args:
+            rows_df: New rows with at least the threshold and summed columns
+
+        Returns:
+            Number of rows appended
+        """
+        with self._lock:
+            return self._append(rows_df)
+
+    def sync(self, df):
+        """
+        Append the rows ``df`` has beyond those already counted.
+
+        Args:
+            df: The table these statistics were built from, possibly grown since
+
+        Returns:
+            Number of rows appended
+        """
+        with self._lock:
+            return self._append(df.iloc[self._total['count']:])
+
+    def _append(self, rows_df):
+        if len(rows_df) == 0:
+            return 0
+        values, columns = self._columns(rows_df)
+        values = values.astype(self.dtype)
+        for group, in_group in self._group_masks(rows_df):
+            if not in_group.any():
+                continue
+            delta_values, delta_columns = self._delta[group]['values'], self._delta[group]['columns']
+            delta_values = np.concatenate((delta_values, values[in_group]))
+            delta_columns = {
+                name: np.concatenate((delta_columns[name], column[in_group])) for name, column in columns.items()
+            }
+            main_rows = len(self._main[group]['values'])
+            if len(delta_values) > max(MIN_MERGE_ROWS, MERGE_FRACTION * main_rows):
+                main_values, main_columns = self._main[group]['values'], self._main[group]['columns']
+                self._main[group] = _block(
+                    np.concatenate((main_values, delta_values)),
+                    {name: np.concatenate((main_columns[name], delta_columns[name])) for name in columns}
+                )
+                delta_values = delta_values[:0]
+                delta_columns = {name: column[:0] for name, column in delta_columns.items()}
+            self._delta[group] = _block(delta_values, delta_columns)
+
+        self._total['count'] += len(rows_df)
+        for name, column in columns.items():
+            self._total['sums'][name] += float(column.sum())
+        self.appended_rows += len(rows_df)
+        return len(rows_df)
+
+    def query(self, group, thresholds):
+        """
+        Count and sums of a group's rows at or above each threshold.
+
+        Args:
+            group: Categorical filter option
+            thresholds: Array of threshold values
+
+        Returns:
+            Dictionary with count (int array) and sums (name -> float array)
+        """
+        cutoffs = np.asarray(thresholds).astype(self.dtype)
+        with self._lock:
+            count, sums = _block_query(self._main[group], cutoffs)
+            delta_count, delta_sums = _block_query(self._delta[group], cutoffs)
+        return {
+            'count': count + delta_count,
+            'sums': {name: sums[name] + delta_sums[name] for name in sums}
+        }
+
+    def cell(self, group, threshold):
+        """
+        Count and sums of one filter combination.
+
+        Returns:
+            Dictionary with count and sums, or None for an unknown group
+        """
+        if group not in self._main:
+            return None
+        result = self.query(group, [threshold])
+        return {
+            'count': int(result['count'][0]),
+            'sums': {name: float(values[0]) for name, values in result['sums'].items()}
+        }
+
+    def baseline(self):
+        """Whole-table count and sums (kept up to date on append)."""
+        with self._lock:
+            return {'count': self._total['count'], 'sums': dict(self._total['sums'])}
+
+
+def _mean(total, count):
+    return total / count if count else float('nan')
+
+
+def trend_metric_row(cell, total):
+    """
+    The tab1 metric row (same keys as service.trend_metrics).
+
+    Args:
+        cell: Count and sums of the filtered trends
+        total: Count and sums of all trends
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    avg_impact = _mean(cell['sums']['impact'], cell['count'])
+    return {
+        'count': cell['count'],
+        'total_count': total['count'],
+        'avg_impact': avg_impact,
+        'avg_impact_delta': avg_impact - _mean(total['sums']['impact'], total['count']),
+        'total_market_billion': cell['sums']['market_billion'],
+        'avg_adoption': _mean(cell['sums']['adoption'], cell['count'])
+    }
+
+
+def opportunity_metric_row(cell, total):
+    """
+    The tab2 metric row (same keys as service.opportunity_metrics).
+
+    Args:
+        cell: Count and sums of the filtered opportunities
+        total: Count and sums of all opportunities
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    return {
+        'count': cell['count'],
+        'total_count': total['count'],
+        'avg_investment_focus': _mean(cell['sums']['investment_focus'], cell['count']),
+        'avg_growth_rate': _mean(cell['sums']['growth_rate'], cell['count']),
+        'high_focus_count': int(round(cell['sums']['high_focus']))
+    }
@@ -0,0 +1,276 @@
+"""
+Opportunity Score Sensitivity for AI Opportunity Map
+====================================================
+
+Evaluates the opportunity score for every opportunity under every scenario of
+a weight grid at once, as one broadcasted NumPy operation:
+- Each of the four factor weights (market size, growth, adoption, investment
+  focus) takes every value of WEIGHT_GRID independently, and the growth-rate
+  cap every value of GROWTH_CAPS
+- Weights are normalized by their sum, so the default weights reproduce
+  ``AIMarketAnalytics.calculate_opportunity_score`` exactly and scores stay
+  on the 0-100 scale
+- The result is a tensor of shape (caps, market, growth, adoption,
+  investment, opportunities) plus the rank of each opportunity per scenario,
+  so any slider position is answered by indexing, not recomputing
+- Rank stability summarizes how far each opportunity's rank moves across all
+  scenarios and how closely each scenario's ranking follows the default one
+
+Usage:
+    sensitivity = build_sensitivity(opportunities_df)
+    scenario = scenario_ranking(sensitivity, {'market': 0.1, 'growth': 0.5}, growth_cap=75)
+    sensitivity['stability']
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+from advanced_analytics import (
+    OPPORTUNITY_SCORE_WEIGHTS,
+    GROWTH_RATE_CAP,
+    MARKET_SIZE_SCALE,
+    DEFAULT_ADOPTION_RATE,
+    market_size_billion,
+    opportunity_score_values
+)
+from instrumentation import traced
+
+WEIGHT_NAMES = tuple(OPPORTUNITY_SCORE_WEIGHTS)
+
+# Values every weight can take; the defaults must lie on the grid
+WEIGHT_STEP = 0.05
+WEIGHT_GRID = np.round(np.arange(0.0, 0.5 + WEIGHT_STEP / 2, WEIGHT_STEP), 2)
+
+GROWTH_CAPS = (25, 50, 75, 100)
+
+# Larger selections keep this many opportunities with the highest default scores
+MAX_OPPORTUNITIES = 100
+
+TOP_K = 5
+
+
+def score_components(opportunities_df, adoption_rate=DEFAULT_ADOPTION_RATE):
+    """
+    Normalized score factors of each opportunity (the growth cap is applied later).
+
+    Args:
+        opportunities_df: Opportunities data
+        adoption_rate: Adoption percentage assumed for every opportunity
+
+    Returns:
+        Dictionary of factor -> float64 array (growth is the raw CAGR)
+    """
+    rows = len(opportunities_df)
+    return {
+        'market': np.log10(market_size_billion(opportunities_df['Market_Size_2025']) + 1) / np.log10(MARKET_SIZE_SCALE),
+        'growth': opportunities_df['Growth_Rate_CAGR'].to_numpy('float64'),
+        'adoption': np.full(rows, adoption_rate / 100),
+        'investment': opportunities_df['Investment_Focus_Score'].to_numpy('float64') / 10
+    }
+
+
+def score_tensor(components, weight_grid=WEIGHT_GRID, growth_caps=GROWTH_CAPS):
+    """
+    Opportunity scores for every weight and growth-cap scenario.
+
+    Args:
+        components: Output of score_components
+        weight_grid: Values each weight takes
+        growth_caps: Growth rates treated as the maximum
+
+    Returns:
+        float32 array of shape (caps, market, growth, adoption, investment, opportunities);
+        the all-zero weight scenario is NaN
+    """
+    grid = np.asarray(weight_grid, dtype=np.float32)
+    size = len(grid)
+    caps = np.asarray(growth_caps, dtype=np.float32)
+
+    def weight_axis(position):
+        shape = [1] * 6
+        shape[position] = size
+        return grid.reshape(shape)
+
+    market_weight, growth_weight, adoption_weight, investment_weight = (weight_axis(axis) for axis in range(1, 5))
+    market = components['market'].astype(np.float32)
+    growth = np.minimum(components['growth'].astype(np.float32) / caps[:, None], 1).reshape(len(caps), 1, 1, 1, 1, -1)
+    adoption = components['adoption'].astype(np.float32)
+    investment = components['investment'].astype(np.float32)
+
+    total_weight = market_weight + growth_weight + adoption_weight + investment_weight
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = (
+            market_weight * market +
+            growth_weight * growth +
+            adoption_weight * adoption +
+            investment_weight * investment
+        ) * (100 / total_weight)
+    return np.minimum(scores, 100)
+
+
+def default_scores(opportunities_df, adoption_rate=DEFAULT_ADOPTION_RATE):
+    """
+    Scores under the default weights and growth cap (no scenario grid).
+
+    Args:
+        opportunities_df: Opportunities data
+        adoption_rate: Adoption percentage assumed for every opportunity
+
+    Returns:
+        float64 array, one score per opportunity (as AIMarketAnalytics.calculate_opportunity_scores)
+    """
+    return opportunity_score_values(
+        market_size_billion(opportunities_df['Market_Size_2025']),
+        opportunities_df['Growth_Rate_CAGR'],
+        adoption_rate,
+        opportunities_df['Investment_Focus_Score']
+    )
+
+
+def rank_scores(scores):
+    """
+    Rank opportunities within each scenario (1 = highest score).
+
+    Args:
+        scores: Array whose last axis is opportunities
+
+    Returns:
+        int32 array of the same shape
+    """
+    order = np.argsort(-scores, axis=-1, kind='stable')
+    ranks = np.empty_like(order, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[-1] + 1, dtype=np.int32), axis=-1)
+    return ranks
+
+
+def _grid_index(value, grid):
+    return int(np.abs(np.asarray(grid) - value).argmin())
+
+
+def scenario_index(weights=None, growth_cap=GROWTH_RATE_CAP, weight_grid=WEIGHT_GRID, growth_caps=GROWTH_CAPS):
+    """
+    Tensor index of the grid scenario nearest to the given weights and cap.
+
+    Args:
+        weights: Dictionary of factor -> weight; missing factors use the defaults
+        growth_cap: Growth rate treated as the maximum
+        weight_grid: Values each weight takes
+        growth_caps: Growth caps in the tensor
+
+    Returns:
+        Tuple (cap, market, growth, adoption, investment) of indices
+    """
+    weights = {**OPPORTUNITY_SCORE_WEIGHTS, **(weights or {})}
+    return (_grid_index(growth_cap, growth_caps),) + tuple(
+        _grid_index(weights[name], weight_grid) for name in WEIGHT_NAMES
+    )
+
+
+def _spearman(ranks, base_ranks):
+    """Spearman correlation of every scenario's ranking with the base ranking."""
+    n = ranks.shape[-1]
+    if n < 2:
+        return np.ones(ranks.shape[0])
+    squared = ((ranks - base_ranks).astype(np.float64) ** 2).sum(axis=-1)
+    return 1 - 6 * squared / (n * (n ** 2 - 1))
+
+
+@traced('analytics.score_sensitivity')
+def build_sensitivity(opportunities_df, weight_grid=WEIGHT_GRID, growth_caps=GROWTH_CAPS,
+                      max_opportunities=MAX_OPPORTUNITIES, top_k=TOP_K):
+    """
+    Precompute scores, ranks and rank stability over the scenario grid.
+
+    Args:
+        opportunities_df: Opportunities data (filtered or not)
+        weight_grid: Values each weight takes
+        growth_caps: Growth caps to evaluate
+        max_opportunities: Opportunities kept (highest default scores first)
+        top_k: Size of the leading group tracked by Top_K_Share
+
+    Returns:
+        Dictionary with names, scores, ranks, base_index, weight_grid,
+        growth_caps, stability (DataFrame) and summary (dictionary)
+    """
+    components = score_components(opportunities_df)
+    names = opportunities_df['Opportunity_Area'].astype(str).to_numpy()
+
+    base_index = scenario_index(None, GROWTH_RATE_CAP, weight_grid, growth_caps)
+    truncated = len(names) > max_opportunities
+    if truncated:
+        keep = np.argsort(-default_scores(opportunities_df), kind='stable')[:max_opportunities]
+        components = {factor: values[keep] for factor, values in components.items()}
+        names = names[keep]
+
+    scores = score_tensor(components, weight_grid, growth_caps)
+    ranks = rank_scores(np.nan_to_num(scores, nan=-np.inf))
+
+    # Every scenario except the all-zero weights, flattened to (scenario, opportunity)
+    flat_scores = scores.reshape(-1, len(names))
+    valid = ~np.isnan(flat_scores[:, 0]) if len(names) else np.zeros(0, dtype=bool)
+    flat_ranks = ranks.reshape(-1, len(names))[valid]
+    base_ranks = ranks[base_index]
+
+    k = min(top_k, len(names))
+    in_top = flat_ranks <= k
+    stability = pd.DataFrame({
+        'Opportunity': names,
+        'Base_Score': scores[base_index],
+        'Base_Rank': base_ranks,
+        'Mean_Rank': flat_ranks.mean(axis=0),
+        'Rank_Std': flat_ranks.std(axis=0),
+        'Best_Rank': flat_ranks.min(axis=0),
+        'Worst_Rank': flat_ranks.max(axis=0),
+        'Top_K_Share': in_top.mean(axis=0)
+    }).sort_values('Base_Rank', ignore_index=True)
+
+    base_top = base_ranks <= k
+    spearman = _spearman(flat_ranks, base_ranks)
+    summary = {
+        'scenarios': int(valid.sum()),
+        'opportunities': len(names),
+        'truncated': truncated,
+        'top_k': k,
+        'mean_spearman': float(spearman.mean()) if len(spearman) else 1.0,
+        'min_spearman': float(spearman.min()) if len(spearman) else 1.0,
+        'mean_top_k_overlap': float((in_top & base_top).sum(axis=1).mean() / k) if k else 1.0,
+        'top_k_unchanged_share': float((in_top == base_top).all(axis=1).mean()) if k else 1.0
+    }
+
+    return {
+        'names': names,
+        'scores': scores,
+        'ranks': ranks,
+        'base_index': base_index,
+        'weight_grid': np.asarray(weight_grid),
+        'growth_caps': tuple(growth_caps),
+        'stability': stability,
+        'summary': summary
+    }
+
+
+def scenario_ranking(sensitivity, weights=None, growth_cap=GROWTH_RATE_CAP):
+    """
+    Scores and ranks under one scenario, read from the precomputed tensor.
+
+    Args:
+        sensitivity: Output of build_sensitivity
+        weights: Dictionary of factor -> weight (snapped to the grid)
+        growth_cap: Growth cap (snapped to the evaluated caps)
+
+    Returns:
+        DataFrame with Opportunity, Score, Rank, Base_Rank and Rank_Change, best first
+    """
+    index = scenario_index(weights, growth_cap, sensitivity['weight_grid'], sensitivity['growth_caps'])
+    base_ranks = sensitivity['ranks'][sensitivity['base_index']]
+    ranks = sensitivity['ranks'][index]
+    return pd.DataFrame({
+        'Opportunity': sensitivity['names'],
+        'Score': sensitivity['scores'][index],
+        'Rank': ranks,
+        'Base_Rank': base_ranks,
+        'Rank_Change': base_ranks - ranks
+    }).sort_values('Rank', ignore_index=True)
@@ -0,0 +1,112 @@
+"""
+Request Coalescing for AI Opportunity Map
+=========================================
+
+Single-flight execution for expensive analytics: when several threads (for
+example Streamlit sessions after a data refresh) ask for the same result at
+the same time, one of them computes it and the others wait for and share that
+result instead of repeating the work.
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import hashlib
+import threading
+
+import pandas as pd
+
+from metrics import SINGLE_FLIGHT_CALLS
+
+
+class _Call:
+    """One in-flight computation and the callers waiting on it."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time and share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, share=None, **kwargs):
+        """
+        Call ``fn(*args, **kwargs)`` unless an identical call is already running.
+
+        Args:
+            key: Hashable identity of the computation
+            fn: Function to call
+            share: Optional function applied to the result handed to waiting
+                   callers (e.g. a copy), so they do not mutate the leader's object
+            *args, **kwargs: Passed to ``fn``
+
+        Returns:
+            Result of the computation; waiters re-raise the leader's exception
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.shared += 1
+        SINGLE_FLIGHT_CALLS.labels(function=_function_name(key), role='leader' if leader else 'shared').inc()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return share(call.result) if share else call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        """Number of computations currently running."""
+        with self._lock:
+            return len(self._calls)
+
+
+def _function_name(key):
+    """Metric label for a key: its leading name when it has one."""
+    if isinstance(key, tuple) and key and isinstance(key[0], str):
+        return key[0]
+    return 'other'
+
+
+def frame_fingerprint(df):
+    """
+    Content hash of a DataFrame, used to recognize identical requests.
+
+    Args:
+        df: DataFrame (or None)
+
+    Returns:
+        Hex digest that changes whenever values, index or columns change
+    """
+    if df is None:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
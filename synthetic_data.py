@@ -0,0 +1,277 @@
+"""
+Synthetic Datasets for AI Opportunity Map
+=========================================
+
+Generates the five dashboard tables at any scale with the same columns and
+dtypes as the ``data_sources`` loaders, for benchmarks and load tests:
+- Rows are resampled from the hand-written tables, so categories, text and
+  the relationships between columns stay realistic, and numeric columns are
+  jittered within their valid ranges so every row is distinct
+- Name columns get a ``#<row>`` suffix to stay unique; Region keeps the real
+  region names so the dashboard's region filter still applies
+- Tables are produced in chunks seeded from (seed, table, first row), so the
+  same seed and chunk size always give the same data, and write_dataset
+  streams them to Parquet without holding a whole table in memory
+
+Usage:
+    trends = generate_trends(100000, seed=7)
+    paths = write_dataset('fixtures/10m', rows=10_000_000, seed=7)
+
+    python synthetic_data.py --rows 10000000 --output fixtures/10m
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_sources import (
+    load_comprehensive_trend_data,
+    load_comprehensive_opportunity_data,
+    load_regional_market_data,
+    load_industry_adoption_data,
+    load_workforce_impact_data,
+    compact_dtypes
+)
+
+# Per table: source loader, name column made unique per row (or None), and
+# numeric columns as (low, high, decimals) -- decimals=0 keeps integers
+TABLE_SPECS = {
+    'trends': {
+        'loader': load_comprehensive_trend_data,
+        'name_column': 'Trend',
+        'numeric': {
+            'Impact_Score': (1.0, 10.0, 1),
+            'Market_Size_Billion': (0.5, 1000.0, 1),
+            'Adoption_Rate': (0, 100, 0),
+        },
+    },
+    'opportunities': {
+        'loader': load_comprehensive_opportunity_data,
+        'name_column': 'Opportunity_Area',
+        'numeric': {
+            'Growth_Rate_CAGR': (0.0, 80.0, 1),
+            'Investment_Focus_Score': (1.0, 10.0, 1),
+        },
+    },
+    'regional': {
+        'loader': load_regional_market_data,
+        'name_column': None,
+        'numeric': {
+            'Market_Share_Percent': (0.1, 100.0, 1),
+            'Growth_Rate': (0.0, 100.0, 1),
+            'Investment_Billion': (0.1, 1000.0, 1),
+        },
+    },
+    'industry': {
+        'loader': load_industry_adoption_data,
+        'name_column': 'Industry',
+        'numeric': {
+            'Adoption_Rate': (0, 100, 0),
+            'ROI_Percentage': (0, 400, 0),
+            'Investment_Priority': (1.0, 10.0, 1),
+        },
+    },
+    'workforce': {
+        'loader': load_workforce_impact_data,
+        'name_column': 'Job_Category',
+        'numeric': {
+            'Job_Transformation': (0, 100, 0),
+            'Reskilling_Priority': (1.0, 10.0, 1),
+        },
+    },
+}
+
+TABLES = tuple(TABLE_SPECS)
+
+# Jitter as a fraction of each numeric column's standard deviation
+JITTER_SCALE = 0.35
+
+DEFAULT_CHUNK_ROWS = 250000
+
+
+def _generate_chunk(table, base, start, rows, seed):
+    """Generate rows ``start`` to ``start + rows`` of a synthetic table."""
+    spec = TABLE_SPECS[table]
+    rng = np.random.default_rng([seed, TABLES.index(table), start])
+
+    picks = rng.integers(0, len(base), rows)
+    data = {}
+    for column in base.columns:
+        # take() keeps categorical and Arrow string columns in their compact form
+        values = base[column].take(picks).reset_index(drop=True)
+        if column in spec['numeric']:
+            low, high, decimals = spec['numeric'][column]
+            std = float(base[column].std()) or 1.0
+            values = values.to_numpy('float64') + rng.normal(0.0, std * JITTER_SCALE, rows)
+            values = np.clip(np.round(values, decimals), low, high)
+        elif column == spec['name_column']:
+            row_ids = pd.Series(np.arange(start, start + rows).astype(str))
+            values = values.astype(str).str.cat(row_ids, sep=' #')
+        data[column] = values
+
+    df = pd.DataFrame(data)
+    if table == 'opportunities':
+        df['Market_Size_2025'] = market_size_labels(rng, base, rows)
+
+    # Every chunk keeps the source's dtypes, including its category sets
+    df = compact_dtypes(df).astype(base.dtypes.to_dict())
+    df.index = pd.RangeIndex(start, start + rows)
+    return df
+
+
+def iter_chunks(table, rows, seed=42, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Yield a synthetic table in chunks.
+
+    Args:
+        table: Key of TABLE_SPECS
+        rows: Total number of rows
+        seed: Random seed
+        chunk_rows: Rows per chunk
+
+    Yields:
+        DataFrames of at most ``chunk_rows`` rows, indexed by global row number
+    """
+    base = TABLE_SPECS[table]['loader']()
+    for start in range(0, rows, chunk_rows):
+        yield _generate_chunk(table, base, start, min(chunk_rows, rows - start), seed)
+
+
+def generate_table(table, rows, seed=42, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Generate a synthetic version of a data_sources table in memory.
+
+    Args:
+        table: Key of TABLE_SPECS
+        rows: Number of rows to generate
+        seed: Random seed; the same seed always yields the same table
+        chunk_rows: Rows generated per step
+
+    Returns:
+        DataFrame with the loader's columns and compact dtypes
+    """
+    chunks = list(iter_chunks(table, rows, seed, chunk_rows))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+
+
+def market_size_labels(rng, base, rows):
+    """
+    Draw 'Large ($285B+)' style market size labels around the base sizes.
+
+    Args:
+        rng: NumPy random generator
+        base: Hand-written opportunities table
+        rows: Number of labels
+
+    Returns:
+        Array of label strings
+    """
+    sizes = base['Market_Size_2025'].str.extract(r'\(\$(\d+)B\+\)')[0].astype(float).to_numpy()
+    drawn = np.clip(rng.choice(sizes, rows) * rng.lognormal(0.0, 0.25, rows), 10, 990).round().astype(int)
+    prefix = np.where(drawn >= 100, 'Large', 'Medium')
+    return pd.Series(prefix).str.cat(pd.Series(drawn.astype(str)), sep=' ($').add('B+)').to_numpy()
+
+
+def generate_trends(rows, seed=42):
+    """Synthetic trends table (see generate_table)."""
+    return generate_table('trends', rows, seed)
+
+
+def generate_opportunities(rows, seed=42):
+    """Synthetic opportunities table (see generate_table)."""
+    return generate_table('opportunities', rows, seed)
+
+
+def generate_datasets(rows, seed=42):
+    """
+    Generate all five tables in memory.
+
+    Args:
+        rows: Rows per table
+        seed: Random seed
+
+    Returns:
+        Dictionary of table name -> DataFrame, like analytics_service.load_datasets
+    """
+    return {table: generate_table(table, rows, seed) for table in TABLES}
+
+
+def write_dataset(directory, rows, seed=42, chunk_rows=DEFAULT_CHUNK_ROWS, tables=TABLES):
+    """
+    Stream synthetic tables to ``<directory>/<table>.parquet`` chunk by chunk.
+
+    Only one chunk is held in memory at a time, so fixtures far larger than
+    RAM can be written.
+
+    Args:
+        directory: Output directory (created if missing)
+        rows: Rows per table
+        seed: Random seed
+        chunk_rows: Rows per chunk and Parquet row group
+        tables: Tables to write
+
+    Returns:
+        Dictionary of table name -> file path
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow is required to write synthetic datasets: pip install pyarrow")
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for table in tables:
+        path = os.path.join(directory, f"{table}.parquet")
+        writer = None
+        try:
+            for chunk in iter_chunks(table, rows, seed, chunk_rows):
+                batch = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, batch.schema)
+                writer.write_table(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+        paths[table] = path
+    return paths
+
+
+def read_dataset(directory, tables=TABLES):
+    """
+    Load tables written by write_dataset.
+
+    Args:
+        directory: Directory passed to write_dataset
+        tables: Tables to read
+
+    Returns:
+        Dictionary of table name -> DataFrame with compact dtypes
+    """
+    return {
+        table: compact_dtypes(pd.read_parquet(os.path.join(directory, f"{table}.parquet")))
+        for table in tables
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic AI Opportunity Map tables to Parquet")
+    parser.add_argument('--rows', type=int, required=True, help='Rows per table')
+    parser.add_argument('--output', required=True, help='Output directory')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--tables', nargs='+', choices=TABLES, default=list(TABLES))
+    args = parser.parse_args()
+
+    paths = write_dataset(args.output, args.rows, args.seed, args.chunk_rows, args.tables)
+    for table, path in paths.items():
+        print(f"{table:<15}{os.path.getsize(path) / 1e6:>10.1f} MB  {path}")
+
+
+if __name__ == '__main__':
+    main()
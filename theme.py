@@ -0,0 +1,105 @@
+"""
+Theme Assets for AI Opportunity Map
+===================================
+
+Loads the dashboard CSS from ``static/theme.css`` instead of an inline string:
+- The theme is injected with ``st.html`` as a single ``<style>`` block, which
+  Streamlit keeps (its sanitizer drops ``<link>`` tags) and renders without
+  taking up layout space
+- With Streamlit static serving on, the block only ``@import``s
+  ``app/static/theme.css?v=<content hash>``, so the browser downloads the
+  stylesheet once and caches it until the file changes
+- Without static serving, the file is read and hashed once per process and
+  inlined into the block
+- Web fonts are opt-in and self-hostable; by default the theme uses system
+  fonts and makes no third-party requests
+
+Font source is chosen with the ``AI_MAP_FONT_SOURCE`` environment variable:
+    system   Use system fonts only (default; 'none' is accepted too)
+    google   Load Inter and JetBrains Mono from Google Fonts
+    <url>    Import a self-hosted stylesheet, e.g. app/static/fonts/fonts.css
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import functools
+import hashlib
+import os
+
+import streamlit as st
+
+THEME_CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'theme.css')
+
+# URL Streamlit serves files in ./static under when server.enableStaticServing is on
+STATIC_URL_PREFIX = 'app/static'
+
+GOOGLE_FONTS_URL = (
+    'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800'
+    '&family=JetBrains+Mono:wght@400;500&display=swap'
+)
+
+
+@functools.lru_cache(maxsize=1)
+def load_theme_css():
+    """
+    Read the theme stylesheet once per process.
+
+    Returns:
+        Tuple of (css text, short content hash)
+    """
+    with open(THEME_CSS_PATH, encoding='utf-8') as handle:
+        css = handle.read()
+    return css, hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+
+
+def font_stylesheet_url(source=None):
+    """
+    Resolve the web font stylesheet to import.
+
+    Args:
+        source: 'system', 'google' or a stylesheet URL; defaults to AI_MAP_FONT_SOURCE
+
+    Returns:
+        Stylesheet URL, or None when system fonts should be used
+    """
+    source = (source or os.environ.get('AI_MAP_FONT_SOURCE', 'system')).strip()
+    if source.lower() in ('system', 'none', ''):
+        return None
+    if source.lower() == 'google':
+        return GOOGLE_FONTS_URL
+    return source
+
+
+def theme_markup(static_serving, font_source=None):
+    """
+    Build the HTML that applies the theme.
+
+    Args:
+        static_serving: Whether Streamlit serves ./static at app/static
+        font_source: Optional font source override (see module docstring)
+
+    Returns:
+        A single ``<style>`` element for st.html
+    """
+    css, content_hash = load_theme_css()
+    # @import rules must precede every other rule in the block
+    rules = []
+
+    font_url = font_stylesheet_url(font_source)
+    if font_url:
+        rules.append(f'@import url("{font_url}");')
+
+    if static_serving:
+        rules.append(f'@import url("{STATIC_URL_PREFIX}/theme.css?v={content_hash}");')
+    else:
+        rules.append(css)
+
+    body = '\n'.join(rules)
+    return f'<style data-theme-hash="{content_hash}">\n{body}\n</style>'
+
+
+def inject_theme():
+    """Apply the dashboard theme to the current page."""
+    static_serving = bool(st.get_option('server.enableStaticServing'))
+    st.html(theme_markup(static_serving))
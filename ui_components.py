@@ -0,0 +1,248 @@
+"""
+UI Components for AI Opportunity Map
+====================================
+
+Reusable Streamlit building blocks for the dashboard:
+- Precompiled HTML card templates rendered for a whole frame at once
+- Paged card lists emitted as a single markdown element
+- A searchable, paged select over row ids for detail panels
+
+Author: Easin Arafat (@mrx-arafat)
+Last Updated: June 2025
+"""
+
+import functools
+import math
+import re
+import string
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Simple float/int format specs that numpy can apply to a whole array
+_ARRAY_FORMAT_SPEC = re.compile(r'^(\.\d+)?[fde]$')
+
+# Options shipped to a detail selectbox at once
+SELECT_PAGE_SIZE = 50
+
+# Search queries remembered per option index
+SEARCH_CACHE_SIZE = 64
+
+_HTML_ESCAPES = (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ('$', '&#36;'))
+
+
+class CardTemplate:
+    """HTML card template compiled once and rendered for many rows per call."""
+
+    def __init__(self, template):
+        """
+        Parse a ``str.format`` style template into literals and fields.
+
+        Args:
+            template: HTML with ``{Column}`` or ``{Column:.1f}`` placeholders
+        """
+        self.template = template
+        self.parts = []
+        for literal, field, spec, _ in string.Formatter().parse(template):
+            if literal:
+                self.parts.append((literal, None))
+            if field is not None:
+                self.parts.append((field, spec or ''))
+
+        self.columns = [part for part, spec in self.parts if spec is not None]
+
+    def _format_column(self, values, spec):
+        """Format one column for every row, escaping text for HTML."""
+        array = values.to_numpy()
+
+        if array.dtype.kind in 'iuf' and _ARRAY_FORMAT_SPEC.match(spec):
+            return pd.Series(np.char.mod('%' + spec, array), index=values.index, dtype=object)
+
+        if spec:
+            formatted = pd.Series([format(value, spec) for value in array], index=values.index, dtype=object)
+        else:
+            formatted = values.astype(str).astype(object)
+
+        # Escape markup and '$' (Streamlit markdown reads '$...$' as LaTeX)
+        for char, entity in _HTML_ESCAPES:
+            formatted = formatted.str.replace(char, entity, regex=False)
+        return formatted
+
+    def render(self, df):
+        """
+        Render the template for every row of ``df`` in one pass over the columns.
+
+        Args:
+            df: DataFrame holding every column the template references
+
+        Returns:
+            Concatenated HTML for all rows
+        """
+        if len(df) == 0:
+            return ''
+
+        pieces = []
+        for part, spec in self.parts:
+            if spec is None:
+                pieces.append(pd.Series(part, index=df.index, dtype=object))
+            else:
+                pieces.append(self._format_column(df[part], spec))
+
+        cards = pieces[0].str.cat(pieces[1:], sep='') if len(pieces) > 1 else pieces[0]
+        return ''.join(cards.tolist())
+
+
+# Card templates used across the dashboard tabs
+TREND_CARD = CardTemplate(
+    '<div class="trend-card">'
+    '<h4>{Trend}</h4>'
+    '<p><strong>Impact:</strong> {Impact_Score:.1f}/10</p>'
+    '<p><strong>Market:</strong> &#36;{Market_Size_Billion:.0f}B</p>'
+    '<p><strong>Adoption:</strong> {Adoption_Rate:.0f}%</p>'
+    '</div>'
+)
+
+PORTFOLIO_CARD = CardTemplate(
+    '<div class="opportunity-highlight">'
+    '<h4>{Opportunity_Label}</h4>'
+    '<p><strong>Allocation:</strong> {Allocation_Percent:.1f}%</p>'
+    '<p><strong>Expected Return:</strong> {Expected_Return:.1f}%</p>'
+    '<p><strong>Risk:</strong> {Risk_Level}</p>'
+    '</div>'
+)
+
+REGION_CARD = CardTemplate(
+    '<div class="trend-card">'
+    '<h4>{Region}</h4>'
+    '<p><strong>Market Share:</strong> {Market_Share_Percent:.1f}%</p>'
+    '<p><strong>Investment:</strong> &#36;{Investment_Billion:.1f}B</p>'
+    '<p><strong>Growth Rate:</strong> {Growth_Rate:.1f}%</p>'
+    '<p><strong>Key Focus Areas:</strong> {Key_Focus_Areas}</p>'
+    '</div>'
+)
+
+
+def render_cards(df, template, page_size=None, key=None):
+    """
+    Render a list of cards as a single Streamlit element, paged when long.
+
+    Args:
+        df: DataFrame with one row per card
+        template: CardTemplate to render
+        page_size: Cards per page (None shows every card)
+        key: Widget key for the page selector, required when paging
+
+    Returns:
+        Number of cards rendered on this page
+    """
+    total = len(df)
+    if page_size and total > page_size:
+        page_count = math.ceil(total / page_size)
+        page = st.number_input(
+            f"Page (1-{page_count}):",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key=key
+        )
+        start = (int(page) - 1) * page_size
+        df = df.iloc[start:start + page_size]
+        st.caption(f"Showing {start + 1}-{start + len(df)} of {total}")
+
+    st.markdown(f'<div class="card-list">{template.render(df)}</div>', unsafe_allow_html=True)
+    return len(df)
+
+
+def option_labels(names):
+    """
+    Display label for every row id, suffixing names that occur more than once.
+
+    Args:
+        names: Series of display names indexed by row id
+
+    Returns:
+        Dictionary of row id -> label
+    """
+    repeated = names.duplicated(keep=False).to_numpy()
+    labels = names.astype(str).to_numpy().astype(object)
+    ids = names.index.to_numpy()
+    labels[repeated] = [f"{label} (#{row_id})" for label, row_id in zip(labels[repeated], ids[repeated])]
+    return dict(zip(ids.tolist(), labels.tolist()))
+
+
+class OptionIndex:
+    """Option labels and name search for one selectable column, built once per dataset version."""
+
+    def __init__(self, names):
+        """
+        Args:
+            names: Full column of display names indexed by row id
+        """
+        self.labels = option_labels(names)
+        self._lowered = names.astype(str).str.lower()
+        # Repeated searches (every rerun while a query is typed in) are dictionary hits
+        self.matches = functools.lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._matches)
+
+    def _matches(self, query):
+        """Row ids whose name contains ``query``, ignoring case."""
+        return self._lowered.index[self._lowered.str.contains(query.lower(), regex=False).to_numpy()]
+
+
+def searchable_select(label, names, key, index=None, page_size=SELECT_PAGE_SIZE):
+    """
+    Selectbox over rows that only ships one page of options to the browser.
+
+    Options are row ids, so rows sharing a name stay selectable and the
+    choice always refers to a row of the frame ``names`` came from. Short
+    lists render as a plain selectbox. Longer lists get a search box and a
+    page selector, and the selectbox holds the matching page only. Labels
+    and search matches come from ``index``, so a rerun only slices the page
+    it shows.
+
+    Args:
+        label: Selectbox label
+        names: Series of selectable names indexed by row id, in display order
+        key: Widget key for the selectbox (search and page keys derive from it)
+        index: OptionIndex over the full column (built from ``names`` when omitted)
+        page_size: Options per page
+
+    Returns:
+        Selected row id (look it up with ``.loc``), or None when nothing matches
+    """
+    index = index or OptionIndex(names)
+    ids = names.index
+    if len(ids) <= page_size:
+        return st.selectbox(label, ids.tolist(), format_func=index.labels.get, key=key)
+
+    query = st.text_input(
+        f"Search ({len(ids):,} available):",
+        key=f"{key}_search",
+        placeholder="Type to filter by name"
+    )
+    if query:
+        ids = ids[ids.isin(index.matches(query))]
+
+    if len(ids) == 0:
+        st.info("No matches for this search.")
+        return None
+
+    page_count = math.ceil(len(ids) / page_size)
+    page = 1
+    if page_count > 1:
+        # A narrower search can leave the stored page past the last one
+        page_key = f"{key}_page"
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        page = st.number_input(
+            f"Results page (1-{page_count}):",
+            min_value=1,
+            max_value=page_count,
+            value=1,
+            step=1,
+            key=page_key
+        )
+    start = (int(page) - 1) * page_size
+    options = ids[start:start + page_size].tolist()
+    return st.selectbox(label, options, format_func=index.labels.get, key=key)